@@ -5,445 +5,510 @@
    high as possible without falling off the clouds or touching the monster.
 '''
 
-import pygame, mySprites, time
-pygame.init() 
-screen = pygame.display.set_mode((420, 640))
+# Imported first so that startup is timed from here
+import myTiming
+import pygame, mySprites, myAssets, myBackground, myDisplay, myRender, \
+       myScenes, myScores, mySounds, myText, myWorld, sys
+
+# The display and the surface the game area is drawn on (created by main(),
+# so importing this module has no side effects)
+display = None
+screen = None
+
+# Repaint only the changed regions of the screen during the game
+# (the whole screen is still flipped on frames where it scrolls)
+DIRTY_RECTS = "--dirty-rects" in sys.argv
+
+# Seed given as --seed=<seed> for a deterministic game (the same seed and
+# key presses on the same ticks always play out the same way; read by
+# main())
+SEED = None
+
+# Print how long each phase of startup took
+STARTUP_REPORT = "--startup-report" in sys.argv
+
+# Frames drawn per second during the game, given as --fps=<rate> (e.g. 60,
+# 120 or 144 for high refresh rate displays). The world is always simulated
+# at myWorld.TICK_RATE ticks per second; the frames in between ticks are
+# drawn interpolated (read by main())
+FPS = myWorld.TICK_RATE
+# Milliseconds of play simulated by one tick
+TICK_TIME = 1000.0 / myWorld.TICK_RATE
+# Most ticks simulated before a frame is drawn when the game falls behind
+# (past that the game slows down instead of skipping more frames)
+MAX_TICKS_PER_FRAME = 5
+# Milliseconds the game over image is shown for before the scores
+GAMEOVER_TIME = 2000
+
+# Scale of the window, given as --scale=<factor> (e.g. 1.6875 for a 1080p
+# screen) or --scale=fit for the largest window that fits the desktop (read
+# by main()), and --textures to draw with hardware textures (scaling the
+# window for free) instead of surfaces
+SCALE = 1.0
+TEXTURES = "--textures" in sys.argv
+
+# Time the phases of every frame of the game (F3 shows or hides the
+# overlay of frame timings; --profile shows it from the start and
+# --profile-out=<file.csv or file.jsonl> writes every frame to a file;
+# made by main(), once the frame rate is known)
+profiler = None
+PROFILE = "--profile" in sys.argv
+PROFILE_OUT = None
+for argument in sys.argv:
+    if argument.startswith("--profile-out="):
+        PROFILE_OUT = argument[len("--profile-out="):]
+
+def parse_arguments():
+    '''This function reads the options of the command line that take a
+    value and exits with an error message if one of them is not valid.'''
+    global SEED, FPS, SCALE
+    for argument in sys.argv[1:]:
+        if argument.startswith("--seed="):
+            SEED = argument[len("--seed="):]
+        elif argument.startswith("--fps="):
+            value = argument[len("--fps="):]
+            try:
+                FPS = int(value)
+            except ValueError:
+                FPS = 0
+            if FPS <= 0:
+                sys.exit("%s: --fps must be a whole number above 0, not %s" %
+                         (sys.argv[0], value))
+        elif argument.startswith("--scale="):
+            value = argument[len("--scale="):]
+            if value == "fit":
+                SCALE = value
+                continue
+            try:
+                SCALE = float(value)
+            except ValueError:
+                SCALE = 0
+            if not 0 < SCALE < float("inf"):
+                sys.exit("%s: --scale must be fit or a number above 0, not %s"
+                         % (sys.argv[0], value))
 
 def main():
     '''This function defines the mainline logic for the game.'''
-    # Read the existing high score from file with exception handling
-    try:
-        high_scores = open("highscores.txt", 'r')
-        for line in high_scores:
-            old_score = int(line)
-        
-        high_scores.close()
+    global display, screen, profiler
+    parse_arguments()
+    profiler = myTiming.FrameProfiler(budget=1.0 / FPS)
+    myTiming.startup.mark("imports")
+    
+    # Bring up only the display before the first frame; the fonts and
+    # the mixer are started when they are first needed
+    pygame.display.init()
+    display = myDisplay.create(myDisplay.SIZE, SCALE, TEXTURES)
+    screen = display.get_surface()
+    myTiming.startup.mark("display")
+    
+    # Open the leaderboard of every run (importing the high score of
+    # highscores.txt the first time) and read the high score from it
+    leaderboard = myScores.Leaderboard()
+    old_score = leaderboard.best()
+    myTiming.startup.mark("leaderboard")
+    
+    # Start profiling the game frames if asked to
+    if PROFILE_OUT != None:
+        profiler.start_export(PROFILE_OUT)
+    if PROFILE:
+        profiler.toggle_overlay()
     
-    # Assign 0 to old_score's value if IOError occurs
-    except IOError:
-        old_score = 0
-    
-    # Assign initial values to variables
-    high_score = old_score
-    quit_game = False
+    # Hide the mouse
+    pygame.mouse.set_visible(False)
     
-    # Keep looping as long as the player does not choose to exit
-    while not quit_game:
-        quit_game = welcome_screen(high_score)
-        
-        if not quit_game:
-            # Get player's score from the main game loop
-            player_score = game()
-            # Assign the highest of player's score and high score to high_score
-            high_score = max(high_score, player_score)
-            # Call the transition screen to display both scores
-            # (with updated high score)
-            transition_screen(player_score, high_score)
+    # Make every screen (each one loads what it draws once the first frame
+    # of the welcome screen is shown, or when it is first shown if that is
+    # sooner) and keep showing screens until the player chooses to exit
+    manager = myScenes.SceneManager(display)
+    manager.add("welcome", WelcomeScene(manager))
+    manager.add("instructions", InstructionScene())
+    manager.add("transition", TransitionScene())
+    manager.add("game", GameScene(leaderboard))
+    manager.run("welcome", old_score)
             
-    # Write player's high score into the file
-    high_scores = open("highscores.txt", 'w')
-    high_scores.write(str(high_score))
-    high_scores.close()
+    # Finish writing the runs and close the leaderboard
+    leaderboard.close()
+    
+    # Close the profile export file
+    profiler.stop_export()
     
     # Close the game window
     pygame.quit()
 
-def transition_screen(player_score, high_score):
-    '''This function defines the transition screen between games. 
-    It takes player_score and high_score as parameters.
-    It will be called after the main game loop ends to display the player's 
-    score as well as the current highscore.'''
-    
-    # Display    
-    pygame.display.set_caption("Cloud Jumper")        
-    
-    # Entities    
-    # Background image
-    background = pygame.image.load("./Images/tscreen.jpg")
-    background.convert()
-    screen.blit(background, (0,0))
-    
-    # Display instructions
-    font = pygame.font.Font("EHSMB.ttf", 25)        
-    instructions = ("Your score: %d" %(player_score), "Highscore: %d" % \
-            (high_score), "  ", "",  "", "", "", "PRESS SPACEBAR TO CONTINUE" )
-
-    # Make a jumping player
-    player = mySprites.Player(screen, 550, 300, 550)
-    cloud = mySprites.Cloud(screen, 13)
-
-    allSprites = pygame.sprite.OrderedUpdates(cloud, player,)
-
-    # ACTION          
-    # Assign     
-    clock = pygame.time.Clock()   
-    
-    keepGoing = True   
-    quit_game = False
-    
-    # Hide the mouse
-    pygame.mouse.set_visible(False)
-    
-    # Loop    
-    while keepGoing:             
-        # Time       
-        clock.tick(30)             
+class TransitionScene(myScenes.Scene):
+    '''This class defines the transition screen between games, which
+    displays the player's score as well as the current highscore.'''
+    def __init__(self):
+        '''This initializer creates the screen, with nothing loaded yet.'''
+        myScenes.Scene.__init__(self, "Cloud Jumper")
+        self.__manager = None
+        self.__high_score = 0
         
-        # Events       
-        # End the loop when user clicks exit button or press spacebar
-        for event in pygame.event.get():          
-            if event.type == pygame.QUIT: 
-                keepGoing = False  
-            elif event.type == pygame.KEYDOWN:      
-                if event.key == pygame.K_SPACE:
-                    keepGoing = False
-                    
-        # Display the messages
+    def preload(self):
+        '''This method loads the background and makes the sprites of the
+        screen.'''
+        # Entities    
+        # Background image, and the copy of it the messages are drawn onto
+        self.__image = myAssets.load_image("./Images/tscreen.jpg")
+        self.__background = self.__image.copy()
+        
+        # Make a jumping player
+        player = mySprites.Player(screen, 550, 300, 550)
+        cloud = mySprites.Cloud(screen, 13)
+        self.__allSprites = pygame.sprite.OrderedUpdates(cloud, player)
+        
+    def enter(self, manager, player_score, high_score):
+        '''This method takes the scene manager, player_score and high_score
+        and shows both scores.'''
+        self.__manager = manager
+        self.__high_score = high_score
+        
+        # Display instructions (rendered once onto the background)
+        instructions = ("Your score: %d" %(player_score), "Highscore: %d" % \
+                (high_score), "  ", "",  "", "", "", \
+                "PRESS SPACEBAR TO CONTINUE" )
+        self.__background.blit(self.__image, (0, 0))
         for i in range(len(instructions)):
-            message = font.render(instructions[i], 1, (58,116,186))
-            background.blit(message, (15, 310+40*i))
-        screen.blit(background, (0, 0))
+            message = myText.render(instructions[i], 25)
+            self.__background.blit(message, (15, 310+40*i))
+        screen.blit(self.__background, (0,0))
         
-        # Refresh screen       
-        allSprites.clear(screen, background)       
-        allSprites.update()       
-        allSprites.draw(screen)                 
+    def handle(self, event):
+        '''This method takes an event and goes back to the welcome screen
+        when user clicks exit button or press spacebar.'''
+        if event.type == pygame.QUIT: 
+            self.__manager.switch("welcome", self.__high_score)
+        elif event.type == pygame.KEYDOWN:      
+            if event.key == pygame.K_SPACE:
+                self.__manager.switch("welcome", self.__high_score)
+                    
+    def update(self, elapsed):
+        '''This method takes the milliseconds since the last frame and moves
+        the sprites.'''
+        self.__allSprites.clear(screen, self.__background)       
+        self.__allSprites.update()       
         
-        pygame.display.flip() 
+    def draw(self):
+        '''This method draws the sprites and shows the frame.'''
+        self.__allSprites.draw(screen)                 
+        display.flip() 
         
-def instruction_screen():
-    '''This function defines the instruction screen.
-    It will be called when the user presses the I key at the welcome screen.'''
-    # Display    
-    pygame.display.set_caption("Cloud Jumper Instructions")  
-    
-    # Entities    
-    # Background image
-    background = pygame.image.load("./Images/instructions.jpg")
-    background.convert()
-    screen.blit(background, (0,0))
-    pygame.display.flip() 
-    
-    # ACTION          
-    # Assign     
-    clock = pygame.time.Clock()   
-    
-    keepGoing = True   
-    
-    # Hide the mouse
-    pygame.mouse.set_visible(False)
-    
-    # Loop    
-    while keepGoing:             
-        # Time       
-        clock.tick(30)             
+class InstructionScene(myScenes.Scene):
+    '''This class defines the instruction screen, shown when the user
+    presses the I key at the welcome screen. Nothing on it moves, so it is
+    a still scene: it is only drawn when it is shown (or uncovered).'''
+    def __init__(self):
+        '''This initializer creates the screen, with nothing loaded yet.'''
+        myScenes.Scene.__init__(self, "Cloud Jumper Instructions", None)
+        self.__manager = None
+        self.__shown = False
         
-        # Events       
-        # End loop when user clicks exit button or press spacebar
-        for event in pygame.event.get():          
-            if event.type == pygame.QUIT:             
-                keepGoing = False
-            elif event.type == pygame.KEYDOWN:      
-                if event.key == pygame.K_SPACE:
-                    keepGoing = False
-
-def welcome_screen(high_score):
-    '''This function defines the main menu screen for the game.
-    It takes high_score as a parameter and returns the value of the boolean
-    variable quit_game.'''
-    # Display    
-    pygame.display.set_caption("Welcome to Cloud Jumper!")        
-    
-    # Entities    
-    
-    # Background image
-    background = pygame.image.load("./Images/screen.jpg")
-    background.convert()
-    screen.blit(background, (0,0))
-    
-    # Background music
-    pygame.mixer.music.load("./Sounds/intro.wav")
-    pygame.mixer.music.set_volume(0.3)
-    pygame.mixer.music.play(-1)
-    
-    # Display instructions
-    font = pygame.font.Font("EHSMB.ttf", 23)        
-    instructions = [ "     HIGH SCORE: %d" % (high_score), " ", "", "",  \
-    "PRESS SPACEBAR TO BEGIN", "", "PRESS I FOR INSTRUCTIONS", "",\
-    "PRESS ESC TO QUIT"]
-
-    # Make a jumping player and animated monster on welcome screen
-    player = mySprites.Player(screen, 550, 300, 550)
-    cloud = mySprites.Cloud(screen, 13)
-    star = mySprites.Star(screen, True)
-    monster = mySprites.Monster(screen, True, 80, 355)
-    
-    allSprites = pygame.sprite.OrderedUpdates(cloud, player, star, monster)
+    def preload(self):
+        '''This method loads the background of the screen.'''
+        # Entities    
+        # Background image
+        self.__background = myAssets.load_image("./Images/instructions.jpg")
+        
+    def enter(self, manager):
+        '''This method takes the scene manager and shows the instructions.'''
+        self.__manager = manager
+        screen.blit(self.__background, (0,0))
+        self.__shown = False
+        
+    def handle(self, event):
+        '''This method takes an event and goes back to the welcome screen
+        when user clicks exit button or press spacebar.'''
+        if event.type == pygame.QUIT:             
+            self.__manager.switch("welcome")
+        elif event.type == pygame.KEYDOWN:      
+            if event.key == pygame.K_SPACE:
+                self.__manager.switch("welcome")
+        elif event.type == pygame.VIDEOEXPOSE:
+            # Show the instructions again when the window is uncovered
+            screen.blit(self.__background, (0,0))
+            self.__shown = False
+            
+    def draw(self):
+        '''This method shows the instructions if they are not on screen.'''
+        if not self.__shown:
+            display.flip()
+            self.__shown = True
 
-    # ACTION          
-    # Assign     
-    clock = pygame.time.Clock()   
-    
-    keepGoing = True   
-    quit_game = False
-    
-    # Hide the mouse
-    pygame.mouse.set_visible(False)
-    
-    # Loop    
-    while keepGoing:             
-        # Time       
-        clock.tick(30)             
+class WelcomeScene(myScenes.Scene):
+    '''This class defines the main menu screen for the game.'''
+    def __init__(self, manager):
+        '''This initializer takes the scene manager (which the other screens
+        are preloaded through once the first frame has been shown) and
+        creates the screen, with nothing loaded yet.'''
+        myScenes.Scene.__init__(self, "Welcome to Cloud Jumper!")
+        self.__manager = manager
+        # The high score the messages were drawn with
+        self.__high_score = None
+        self.__first_frame = True
+        self.__loaded = False
         
-        # Events       
-        for event in pygame.event.get():          
-            if event.type == pygame.QUIT:  
-                # End loop and return True for quit_game
-                keepGoing = False
-                quit_game = True 
-            elif event.type == pygame.KEYDOWN:      
-                if event.key == pygame.K_SPACE:
-                    # End loop
-                    keepGoing = False
-                if event.key == pygame.K_i:
-                    # Call the instruction screen
-                    instruction_screen()
-                if event.key == pygame.K_ESCAPE:
-                    # End loop and return True for quit_game
-                    keepGoing = False
-                    quit_game = True
-                    
-        #R- Refresh screen
-        for i in range(len(instructions)):
-            message = font.render(instructions[i], 1, (58,116,186))
-            background.blit(message, (20, 330+20*i))
-            screen.blit(background, (0, 0))
+    def preload(self):
+        '''This method loads the background and makes the sprites of the
+        screen.'''
+        # Entities    
+        # Background image, and the copy of it the messages are drawn onto
+        self.__image = myAssets.load_image("./Images/screen.jpg")
+        self.__background = self.__image.copy()
         
-        # Refresh screen       
-        allSprites.clear(screen, background)       
-        allSprites.update()       
-        allSprites.draw(screen)                 
+        # Make a jumping player and animated monster on welcome screen
+        player = mySprites.Player(screen, 550, 300, 550)
+        cloud = mySprites.Cloud(screen, 13)
+        star = mySprites.Star(screen, True)
+        monster = mySprites.Monster(screen, True, 80, 355)
+        self.__allSprites = pygame.sprite.OrderedUpdates(cloud, player, \
+                                                         star, monster)
         
-        pygame.display.flip()  
+    def enter(self, manager, high_score=None):
+        '''This method takes the scene manager and the high score to display
+        (None to keep the one displayed last) and shows the screen.'''
+        self.__manager = manager
         
-    # Return the value of quit_game when user exits
-    return quit_game
-    
-def game():
-    '''This is the main game loop for Cloud Jumper.
-    It does not have any parameters but it returns the player's score.'''
-    
-    # Display    
-    pygame.display.set_caption("Cloud Jumper")    
-    
-    # Entities    
-    background = pygame.Surface(screen.get_size())    
-    background.fill((255, 255, 255))    
-    screen.blit(background, (0, 0))   
-    
-    # Background music
-    pygame.mixer.music.load("./Sounds/Rainbow_Road.wav")
-    pygame.mixer.music.set_volume(0.4)
-    pygame.mixer.music.play(-1)
-    
-    # Sound effects
-    # Game over
-    end_game = pygame.mixer.Sound("./Sounds/end.wav")
-    end_game.set_volume(0.3)
-    # Get star
-    points_up = pygame.mixer.Sound("./Sounds/star.wav")
-    points_up.set_volume(0.8)
-    # Kill monster
-    killed = pygame.mixer.Sound("./Sounds/killed.wav")
-    killed.set_volume(0.7)
-    # Get shield
-    shield_sound = pygame.mixer.Sound("./Sounds/shield.wav")
-    shield_sound.set_volume(0.8)
-    # Shoot bullet
-    shoot = pygame.mixer.Sound("./Sounds/shoot.wav")
-    shoot.set_volume(0.8)
-    
-    # Create game over image
-    gameover = pygame.image.load("./Images/gameover.png")
-    gameover.convert()
-    
-    # Create sprite objects for game
-    sky = mySprites.Sky(screen)   
-       
-    cloudSprites = pygame.sprite.Group()
-    for i in range(13):       
-        cloudSprites.add(mySprites.Cloud(screen,i))  
-
-    player = mySprites.Player(screen, screen.get_height() - 20, \
-                              screen.get_width()/2, screen.get_height() - 50)
-    
-    monster = mySprites.Monster(screen, False, 0, 0)
-    star = mySprites.Star(screen, False)
-    shield = mySprites.Shield(screen)
-    bullets = pygame.sprite.Group()
-    score = mySprites.ScoreKeeper()
-    
-    scroll_sprites = pygame.sprite.Group(sky, star, shield, monster)
-    
-    allSprites = pygame.sprite.OrderedUpdates(sky, cloudSprites, monster, \
-                                    bullets, player, shield, star, score) 
-
-    # ACTION          
-    # Assign     
-    keepGoing = True   
-    clock = pygame.time.Clock()       
-    shield_on = False
-    
-    # Hide the mouse
-    pygame.mouse.set_visible(False)
-    
-    # Loop    
-    while keepGoing:             
-        # Time       
-        clock.tick(30)             
+        # Display instructions (rendered onto the background only when the
+        # high score has changed)
+        if high_score != None and high_score != self.__high_score:
+            self.__high_score = high_score
+            instructions = [ "     HIGH SCORE: %d" % (high_score), " ", "", \
+            "",  "PRESS SPACEBAR TO BEGIN", "", "PRESS I FOR INSTRUCTIONS", \
+            "", "PRESS ESC TO QUIT"]
+            self.__background.blit(self.__image, (0, 0))
+            for i in range(len(instructions)):
+                message = myText.render(instructions[i], 23)
+                self.__background.blit(message, (20, 330+20*i))
+        screen.blit(self.__background, (0,0))
+        self.__first_frame = True
         
-        # Events       
-        for event in pygame.event.get():          
-            if event.type == pygame.QUIT:   
-                keepGoing = False
-            elif event.type == pygame.KEYDOWN:      
-                if event.key == pygame.K_RIGHT:    
-                    # Change the player's direction with a position x value
-                    player.change_direction(10)
-                if event.key == pygame.K_LEFT: 
-                    # Change the player's direction with a position x value
-                    player.change_direction(-10)
-                if event.key == pygame.K_SPACE:
-                    # Play sound effect
-                    shoot.play()
-                    # Add a bullet object to the list bullets
-                    bullet = mySprites.Bullet(screen, player.rect.centerx, \
-                                              player.rect.bottom)
-                    bullets.add(bullet)
-                    allSprites = pygame.sprite.OrderedUpdates(sky, \
-                                cloudSprites, monster, bullets, player, score) 
-                # Exit current game if "Q" key is pressed
-                if event.key == pygame.K_q:
-                    keepGoing = False 
-            elif event.type == pygame.KEYUP:
-                # Change the player's dx to 0 when no key is pressed
-                player.change_direction(0)
-           
-        # Use a boolean variable to control the player's jumping movements
-        cloud_list = pygame.sprite.spritecollide(player, cloudSprites, False) 
-        # Set initial cloud height
-        cloud_height = 640
+    def handle(self, event):
+        '''This method takes an event and starts a game, shows the
+        instructions or exits as the user asks.'''
+        if event.type == pygame.QUIT:  
+            self.__manager.quit()
+        elif event.type == pygame.KEYDOWN:      
+            if event.key == pygame.K_SPACE:
+                self.__manager.switch("game", self.__high_score)
+            if event.key == pygame.K_i:
+                # Show the instruction screen
+                self.__manager.switch("instructions")
+            if event.key == pygame.K_ESCAPE:
+                self.__manager.quit()
+                    
+    def update(self, elapsed):
+        '''This method takes the milliseconds since the last frame and moves
+        the sprites.'''
+        self.__allSprites.clear(screen, self.__background)       
+        self.__allSprites.update()       
         
-        # Get player's velocity
-        player_velocity = player.get_velocity()
+    def draw(self):
+        '''This method draws the sprites and shows the frame.'''
+        self.__allSprites.draw(screen)                 
+        display.flip()  
         
-        # Make player jump on clouds only when the jumping motion is downwards
-        if player_velocity > 0:
-            if cloud_list:
-                for cloud in cloud_list:
-                    # Check if player's bottom is greater than cloud's top
-                    if player.rect.bottom > cloud.rect.top:
-                        # Set the cloud's centery to the variable new_ground
-                        new_ground = cloud.rect.centery
-                        # Check if the player's bottom is less (higher)
-                        # Than new_ground (cloud's centery)
-                        if player.rect.bottom <= new_ground:
-                            # Get cloud's centery value as new ground
-                            player.set_ground(new_ground)
-                            
-                        # Check if cloud's top is less than cloud_height
-                        # If True, set cloud_height to it
-                        if cloud.rect.top < cloud_height:
-                            cloud_height = cloud.rect.top
-                            
-                        # If the cloud_height is less than 500
-                        # Scroll everything on screen down
-                        if cloud_height<500:
-                            # Set the scroll value for all clouds
-                            for cloud in cloudSprites:
-                                cloud.set_scroll(player.get_scroll())
-                            # Add to player's score the scroll value
-                            score.set_score(player.get_scroll())
-                            # Set the scroll value for monster, sky
-                            # shield, star, and monster
-                            for item in scroll_sprites:
-                                item.set_scroll(player.get_scroll())
-                        # If the cloud_height is greater than 500
-                        # Set all scroll values to 0 so they don't move
-                        else:
-                            for cloud in cloudSprites:
-                                cloud.set_scroll(0)
-                            for item in scroll_sprites:
-                                item.set_scroll(0)
-                            
-            # Set the ground to greater than screen height if player 
-            # does not collide with any clouds while jumping downwards
-            else:
-                player.set_ground(screen.get_height() + 20)
-                
-        # If a bullet collides with monster, reset monster and kill bullet
-        for bullet in bullets:
-            if bullet.rect.colliderect(monster.rect):
-                monster.reset()
-                bullet.kill()
-                # Play sound effect
-                killed.play()
-                
-        # Add 500 points to player's score when it collides with star
-        # Reset the star's position and play sound effect
-        if player.rect.colliderect(star.rect):
-            star.reset()
-            score.set_score(500)
-            points_up.play()
-            
-        # When player collides with shield, reset shield's position
-        # and turn on player's 'immunity', set shield_on to True
-        if player.rect.colliderect(shield.rect):
-            shield.reset()
-            player.set_immunity(True)
-            shield_on = True
-            # Play shield sound effect
-            shield_sound.play()
+        # Start the background music once the first frame is on screen
+        if self.__first_frame:
+            self.__first_frame = False
+            myTiming.startup.mark("welcome screen", True)
+            mySounds.play_music(mySounds.INTRO_MUSIC, 0.3)
+            myTiming.startup.mark("music")
             
-        # Set shield_on to false is player is no longer immune
-        if not player.get_immunity():
-            shield_on = False
+        # The first time, decode the sound effects and preload the other
+        # screens (loading everything they draw)
+        if not self.__loaded:
+            self.__loaded = True
+            mySounds.preload()
+            myTiming.startup.mark("sound effects")
+            self.__manager.preload()
+            if myTiming.startup.finish("screens") and STARTUP_REPORT:
+                print(myTiming.startup.report())
+    
+class GameScene(myScenes.Scene):
+    '''This class defines the main game loop for Cloud Jumper. The world of
+    each game is made when the game starts; the background and the game
+    over image are loaded once.'''
+    def __init__(self, leaderboard):
+        '''This initializer takes the leaderboard the runs are saved to and
+        creates the screen, with nothing loaded yet.'''
+        myScenes.Scene.__init__(self, "Cloud Jumper", FPS)
+        self.__leaderboard = leaderboard
+        self.__manager = None
+        self.__high_score = 0
+        self.__world = None
+        self.__renderer = None
+        self.__rewinder = None
         
-        # Check player is in the game area 
-        # (player will not be killed if jumping off-screen)
-        if player.rect.top > 0:
-             # Check if the player has collided with the monster
-            if player.rect.colliderect(monster.rect):
-                # Kill the player if the player does not have immunity
-                if not shield_on:
-                    player.kill()
-
-        # Check if the player has lost
-        # End game loop if True
-        if player.lose():
-            # Play game over sound
-            end_game.play()
-            keepGoing = False
+    def preload(self):
+        '''This method loads what every game draws.'''
+        # Entities    
+        # The sky (and any parallax layers) drawn behind the sprites, which
+        # covers the whole screen
+        self.__background = myBackground.Background(screen.get_size())
         
-        # Refresh screen       
-        screen.blit(background, (0, 0))
-        allSprites.update()       
-        allSprites.draw(screen)                 
+        # Create game over image
+        self.__gameover = myAssets.load_image("./Images/gameover.png")
         
-        pygame.display.flip()   
+    def enter(self, manager, high_score):
+        '''This method takes the scene manager and the high score and starts
+        a new game.'''
+        self.__manager = manager
+        self.__high_score = high_score
         
-    # Get player's score at the end of the game
-    score = score.get_score()
+        # Background music
+        mySounds.play_music(mySounds.GAME_MUSIC, 0.4)
         
-    # Show gameover image
-    screen.blit(gameover, (50, 200))
-    pygame.display.flip()
-    
-    # Sleep for 2 seconds
-    time.sleep(2.0)
-    
-    # Return player's score to main function
-    return score
-    
-# Call the main function 
-main()
\ No newline at end of file
+        # Create the world holding the sprite objects for game
+        # (both the world and the renderer mark their phases on the profiler)
+        self.__world = myWorld.World(screen, seed=SEED, profiler=profiler)
+        
+        # The sky is drawn by the renderer as the backdrop of all other
+        # sprites (the world keeps its layered group of them up to date),
+        # through the world's camera for the sprites in world coordinates
+        # (with textures, the frame is drawn in full on the display itself)
+        self.__renderer = myRender.Renderer(display.get_target(), \
+                                            self.__background, \
+                                            self.__world.sky, DIRTY_RECTS and \
+                                            not display.is_textured(), \
+                                            profiler, self.__world.camera, \
+                                            myWorld.WORLD_LAYERS, display, \
+                                            (myWorld.SCORE_LAYER,))
+        # Snapshots of the last few seconds, rewound while "R" is held down
+        self.__rewinder = myWorld.Rewinder(self.__world)
+        self.__rewinding = False
+        
+        # Assign     
+        self.__keepGoing = True   
+        # Time passed that has not been simulated yet (in milliseconds) and
+        # the input actions waiting for the next tick
+        self.__lag = 0.0
+        self.__actions = []
+        # Milliseconds the game over image is still shown for (None until
+        # the game is over)
+        self.__gameover_left = None
+        
+    def leave(self):
+        '''This method lets go of the world of the game that has ended.'''
+        self.__world = None
+        self.__renderer = None
+        self.__rewinder = None
+        
+    def wait(self, clock):
+        '''This method takes the clock of the main loop, waits until it is
+        time for the next frame and returns the milliseconds since the last
+        one.'''
+        if self.__gameover_left != None:
+            return myScenes.Scene.wait(self, clock)
+        profiler.begin()
+        elapsed = myScenes.Scene.wait(self, clock)
+        profiler.mark("wait")
+        return elapsed
+        
+    def handle(self, event):
+        '''This method takes an event and turns the key presses into the
+        world's input actions (the events that come in while the game over
+        image is shown are ignored).'''
+        if self.__gameover_left != None:
+            return
+        if event.type == pygame.QUIT:   
+            self.__keepGoing = False
+        elif event.type == pygame.KEYDOWN:      
+            if event.key == pygame.K_RIGHT:    
+                self.__actions.append(myWorld.RIGHT)
+            if event.key == pygame.K_LEFT: 
+                self.__actions.append(myWorld.LEFT)
+            if event.key == pygame.K_SPACE:
+                self.__actions.append(myWorld.FIRE)
+            # Exit current game if "Q" key is pressed
+            if event.key == pygame.K_q:
+                self.__keepGoing = False 
+            # Show or hide the frame timings if "F3" is pressed
+            if event.key == pygame.K_F3:
+                profiler.toggle_overlay()
+            # Start rewinding if "R" is pressed
+            if event.key == pygame.K_r:
+                self.__rewinding = True
+        elif event.type == pygame.KEYUP:
+            if event.key == pygame.K_r:
+                self.__rewinding = False
+            else:
+                self.__actions.append(myWorld.RELEASE)
+                
+    def update(self, elapsed):
+        '''This method takes the milliseconds since the last frame and
+        advances the world by as many fixed ticks as that calls for.'''
+        # Show the game over image for 2 seconds, then both scores
+        if self.__gameover_left != None:
+            self.__gameover_left -= elapsed
+            if self.__gameover_left <= 0:
+                score = self.__world.get_score()
+                self.__manager.switch("transition", score, \
+                                      max(self.__high_score, score))
+            return
+        profiler.mark("events")
+        self.__lag += elapsed
+        
+        # Advance the world by as many fixed ticks as the time passed calls
+        # for (none on some frames when drawing faster than the tick rate,
+        # several when the game is falling behind)
+        world = self.__world
+        events = []
+        ticks = 0
+        while self.__lag >= TICK_TIME and not world.is_over():
+            if ticks == MAX_TICKS_PER_FRAME:
+                # Give up on the time that cannot be caught up
+                self.__lag %= TICK_TIME
+                break
+            self.__renderer.remember(world.sprites)
+            if self.__rewinding:
+                # Go back one tick (until the snapshots run out)
+                self.__rewinder.step_back()
+            else:
+                self.__rewinder.record()
+                events.extend(world.step(self.__actions))
+                self.__actions = []
+            self.__lag -= TICK_TIME
+            ticks += 1
+            
+        # Play the world's sound effects
+        # (the sound bank's effects are named after the world's events)
+        for event in events:
+            mySounds.play(event)
+        profiler.mark("sound")
+        
+        # End game loop if the player has lost
+        if world.is_over():
+            self.__keepGoing = False
+            
+    def draw(self):
+        '''This method draws a frame of the game (the sprites the fraction
+        of a tick since the last tick of the way from where they were to
+        where they are) and, once the game is over, the game over image
+        over the last frame.'''
+        if self.__gameover_left != None:
+            return
+        world = self.__world
+        alpha = self.__lag / TICK_TIME
+        world.score.update()
+        if profiler.is_overlay_on():
+            self.__renderer.draw(world.sprites, profiler.draw_overlay, alpha)
+        else:
+            self.__renderer.draw(world.sprites, None, alpha)
+        profiler.end()
+        
+        if not self.__keepGoing:
+            # Save the run (written in the background, so the game goes
+            # on straight away and the run is kept even if the game is
+            # not quit properly)
+            self.__leaderboard.record(world.get_score(), SEED)
+            
+            # Show gameover image over the last frame
+            gameover = self.__gameover
+            def draw_gameover(surface):
+                surface.blit(gameover, (50, 200))
+            self.__renderer.draw(world.sprites, draw_gameover, alpha)
+            self.__gameover_left = GAMEOVER_TIME
+    
+# Call the main function when run as a program
+if __name__ == "__main__":
+    main()
\ No newline at end of file
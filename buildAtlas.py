@@ -0,0 +1,98 @@
+'''
+   Description: This script packs the small sprite images under Images/ into
+   a single atlas image plus a JSON index of the named frame rects, which
+   myAssets uses to hand out subsurfaces instead of opening every file.
+   Run it again whenever a sprite image is added or changed:
+
+       python buildAtlas.py [--width 512] [--padding 1]
+'''
+import argparse, glob, json, os, pygame, myArchive
+
+# Files written by the build, relative to the images directory
+ATLAS_IMAGE = "atlas.png"
+ATLAS_INDEX = "atlas.json"
+
+def frame_name(path):
+    '''This function takes the path of an image file (from the current
+    directory) and returns the name used for it in the atlas index: its
+    path relative to the game directory, which the asset registry looks
+    images up by wherever the game or this script is run from.'''
+    return myArchive.name_of(os.path.abspath(path))
+
+def pack(sizes, width, padding):
+    '''This function takes a dictionary of (width, height) sizes keyed by
+    name, the atlas width and the padding between frames. It places the
+    frames on horizontal shelves, tallest first, and returns a dictionary of
+    (x, y) positions along with the total atlas height.'''
+    positions = {}
+    x = y = shelf_height = 0
+
+    # Sort by height (then name, so the layout is stable between builds)
+    order = sorted(sizes, key=lambda name: (-sizes[name][1], name))
+    for name in order:
+        w, h = sizes[name]
+        if w + padding > width:
+            raise ValueError("%s is wider than the atlas (%d)" % (name, width))
+
+        # Start a new shelf when this frame does not fit on the current one
+        if x + w + padding > width:
+            x = 0
+            y += shelf_height
+            shelf_height = 0
+
+        positions[name] = (x + padding, y + padding)
+        x += w + padding
+        shelf_height = max(shelf_height, h + padding)
+
+    return positions, y + shelf_height + padding
+
+def build(directory, width, padding):
+    '''This function takes the images directory, the atlas width and the
+    padding, packs every PNG in the directory into one atlas and writes the
+    atlas image and its index. It returns the number of frames packed.'''
+    # Load every sprite image except a previously built atlas
+    images = {}
+    for path in sorted(glob.glob(os.path.join(directory, "*.png"))):
+        if os.path.basename(path) != ATLAS_IMAGE:
+            images[frame_name(path)] = pygame.image.load(path)
+
+    sizes = {}
+    for name in images:
+        sizes[name] = images[name].get_size()
+    positions, height = pack(sizes, width, padding)
+
+    # Blit every frame into a transparent sheet
+    sheet = pygame.Surface((width, height), pygame.SRCALPHA, 32)
+    sheet.fill((0, 0, 0, 0))
+    frames = {}
+    for name in sorted(images):
+        x, y = positions[name]
+        sheet.blit(images[name], (x, y))
+        frames[name] = [x, y, sizes[name][0], sizes[name][1]]
+
+    pygame.image.save(sheet, os.path.join(directory, ATLAS_IMAGE))
+    index = open(os.path.join(directory, ATLAS_INDEX), "w")
+    json.dump({"image": ATLAS_IMAGE, "size": [width, height],
+               "frames": frames}, index, indent=1, sort_keys=True)
+    index.close()
+
+    return len(frames)
+
+def main():
+    '''This function defines the mainline logic for the atlas build.'''
+    parser = argparse.ArgumentParser(description="Pack the Cloud Jumper "
+                                     "sprite images into one atlas.")
+    parser.add_argument("--images", default=myArchive.resolve("Images"),
+                        help="directory holding the sprite PNGs")
+    parser.add_argument("--width", type=int, default=512,
+                        help="width of the atlas in pixels")
+    parser.add_argument("--padding", type=int, default=1,
+                        help="transparent pixels between frames")
+    args = parser.parse_args()
+
+    count = build(args.images, args.width, args.padding)
+    print("Packed %d frames into %s" % (count, os.path.join(args.images,
+                                                            ATLAS_IMAGE)))
+
+if __name__ == "__main__":
+    main()
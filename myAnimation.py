@@ -0,0 +1,75 @@
+'''
+   Description: This file contains the animations of the Cloud Jumper game.
+   The frames of every clip are loaded (and converted to the display format)
+   once into a table shared by every sprite showing the clip, and a sprite
+   only keeps which clip it shows and how many ticks it has been showing
+   it: the frame to show is worked out from that, so animating a sprite
+   never loads, converts or copies an image.
+
+   Time is counted in ticks of the game (myWorld.TICK_RATE per second), so
+   the animations stay in step with the fixed-tick simulation at any frame
+   rate and are the same in every replay of a seeded game.
+   It contains the following:
+                          - the clips of the game
+                          - Clip
+                          - get_clip()
+'''
+import myAssets
+
+# Image paths of the clips, keyed by clip name. A clip plays its first
+# frames once and then loops the others (see Clip); the player's clips are
+# tables of the frames for looking left and right
+CLIPS = {"monster": ["./Images/alienR%d.png" % (number)
+                     for number in range(4)],
+         "star": ["./Images/star%d.png" % (number) for number in range(4)],
+         "player": ["./Images/doodleL1.png", "./Images/doodleR1.png"],
+         "player_shield": ["./Images/doodleSL1.png",
+                           "./Images/doodleSR1.png"]}
+
+# Frames of the player's clips
+LEFT = 0
+RIGHT = 1
+
+# Ticks every frame of an animated clip is shown for (1/10 of a second)
+FRAME_TICKS = 3
+
+class Clip(object):
+    '''This class defines the shared table of frames of one clip.'''
+    def __init__(self, paths, ticks=FRAME_TICKS, intro=1):
+        '''This initializer takes the list of image paths of the frames,
+        the number of ticks every frame is shown for and the number of
+        frames at the start that are only played once before the others
+        loop.'''
+        self.frames = tuple(myAssets.load_image(path) for path in paths)
+        self.__ticks = ticks
+        self.__intro = min(intro, len(self.frames) - 1)
+
+    def index(self, age):
+        '''This method takes the number of ticks the clip has been playing
+        for (0 before its first tick) and returns the number of the frame
+        to show.'''
+        # The first frame also covers the tick the clip started on
+        step = 0
+        if age > 0:
+            step = (age - 1) // self.__ticks
+        if step < self.__intro:
+            return step
+        loop = len(self.frames) - self.__intro
+        return self.__intro + (step - self.__intro) % loop
+
+    def frame(self, age):
+        '''This method takes the number of ticks the clip has been playing
+        for and returns the image to show.'''
+        return self.frames[self.index(age)]
+
+# Clips loaded so far, keyed by name
+_clips = {}
+
+def get_clip(name):
+    '''This function takes the name of a clip of CLIPS and returns its
+    Clip, loaded the first time it is asked for and shared after that.'''
+    clip = _clips.get(name)
+    if clip == None:
+        clip = Clip(CLIPS[name])
+        _clips[name] = clip
+    return clip
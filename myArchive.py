@@ -0,0 +1,265 @@
+'''
+   Description: This file contains the asset archive of the Cloud Jumper
+   game. packAssets.py packs the images, sounds and font into one file,
+   assets.pak, so a frozen build (and a cold start from slow storage) opens
+   one file instead of dozens. The archive is memory-mapped, and every
+   asset in it is handed to the pygame loaders as a View: a file object
+   over the asset's bytes in the mapping, which copies nothing until the
+   loader reads it.
+
+   The archive starts with a header and an index of the assets, followed by
+   their data:
+
+       header: b"CJPK", version (uint16), number of assets (uint32)
+       index:  for every asset, its offset and size in the archive (two
+               uint64) and its name (uint16 length and UTF-8 bytes)
+
+   all little-endian. Assets are named by their path relative to the game
+   directory with "/" separators (e.g. "Images/sky.jpg").
+
+   Paths of the game's files are relative to the game directory (the
+   directory of this file, or of the executable in a frozen build), not
+   to the current directory. An asset that is not in the archive (or with
+   no archive at all) is loaded from its own file.
+   It contains the following:
+                          - the archive format
+                          - View
+                          - Archive
+                          - write()
+                          - resolve()
+                          - name_of()
+                          - exists(), size(), read() and source()
+'''
+import io, mmap, os, struct, sys
+
+# Name of the archive file in the game directory
+ARCHIVE = "assets.pak"
+
+# Start and version of the archive format
+MAGIC = b"CJPK"
+VERSION = 1
+# Layout of the header and of the fixed part of an index entry
+HEADER = struct.Struct("<4sHI")
+ENTRY = struct.Struct("<QQH")
+
+# The directory the game's files are in
+if getattr(sys, "frozen", False):
+    GAME_DIRECTORY = os.path.dirname(os.path.abspath(sys.executable))
+else:
+    GAME_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+class View(io.RawIOBase):
+    '''This class defines a read-only file object over a buffer (such as an
+    asset in the memory-mapped archive) that does not copy it.'''
+    def __init__(self, data, name=""):
+        '''This initializer takes the buffer and the name of the asset.'''
+        io.RawIOBase.__init__(self)
+        self.__data = memoryview(data)
+        self.__position = 0
+        self.name = name
+
+    def readable(self):
+        '''This method returns True: a view can be read.'''
+        return True
+
+    def seekable(self):
+        '''This method returns True: a view can be read from anywhere.'''
+        return True
+
+    def tell(self):
+        '''This method returns the position of the next byte to read.'''
+        return self.__position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        '''This method takes an offset and where it is from (the start, the
+        current position or the end) and moves to it. It returns the new
+        position.'''
+        if whence == io.SEEK_CUR:
+            offset += self.__position
+        elif whence == io.SEEK_END:
+            offset += len(self.__data)
+        if offset < 0:
+            raise ValueError("negative seek position %d" % (offset))
+        self.__position = offset
+        return offset
+
+    def readinto(self, buffer):
+        '''This method takes a writable buffer, reads as many bytes as fit
+        in it and returns how many were read.'''
+        start = min(self.__position, len(self.__data))
+        count = min(len(buffer), len(self.__data) - start)
+        memoryview(buffer).cast("B")[:count] = \
+            self.__data[start:start + count]
+        self.__position = start + count
+        return count
+
+    def read(self, count=-1):
+        '''This method takes the most bytes to read (all the rest if it is
+        negative) and returns the bytes read.'''
+        start = min(self.__position, len(self.__data))
+        end = len(self.__data)
+        if count != None and count >= 0:
+            end = min(end, start + count)
+        self.__position = end
+        return self.__data[start:end].tobytes()
+
+    def readall(self):
+        '''This method returns all the bytes left to read.'''
+        return self.read()
+
+class Archive(object):
+    '''This class defines a memory-mapped archive of assets.'''
+    def __init__(self, path):
+        '''This initializer takes the path of an archive file, maps it and
+        reads its index. It raises ValueError if the file is not an archive
+        of this version.'''
+        archive_file = open(path, "rb")
+        try:
+            self.__map = mmap.mmap(archive_file.fileno(), 0, \
+                                   access=mmap.ACCESS_READ)
+        finally:
+            # The mapping stays valid once the file is closed
+            archive_file.close()
+        self.__data = memoryview(self.__map)
+
+        magic, version, count = HEADER.unpack_from(self.__map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("%s is not a version %d asset archive" % \
+                             (path, VERSION))
+
+        # Dictionary of (offset, size) pairs keyed by asset name
+        self.__index = {}
+        position = HEADER.size
+        for number in range(count):
+            offset, size, length = ENTRY.unpack_from(self.__map, position)
+            position += ENTRY.size
+            name = self.__data[position:position + length].tobytes()
+            self.__index[name.decode("utf-8")] = (offset, size)
+            position += length
+
+    def names(self):
+        '''This method returns the sorted list of the names of the assets.'''
+        return sorted(self.__index)
+
+    def contains(self, name):
+        '''This method takes the name of an asset and returns True if it is
+        in the archive.'''
+        return name in self.__index
+
+    def size(self, name):
+        '''This method takes the name of an asset and returns its size in
+        bytes.'''
+        return self.__index[name][1]
+
+    def read(self, name):
+        '''This method takes the name of an asset and returns a read-only
+        memoryview of its bytes in the mapping.'''
+        offset, size = self.__index[name]
+        return self.__data[offset:offset + size]
+
+    def open(self, name):
+        '''This method takes the name of an asset and returns a View of it.'''
+        return View(self.read(name), name)
+
+def write(path, files):
+    '''This function takes the path of the archive to write and a list of
+    (name, path) pairs of the files to pack, and writes the archive. It
+    returns the number of bytes written.'''
+    names = []
+    for name, file_path in files:
+        names.append(name.encode("utf-8"))
+
+    # The data starts right after the index
+    offset = HEADER.size
+    for name in names:
+        offset += ENTRY.size + len(name)
+
+    index = []
+    for i in range(len(files)):
+        size = os.path.getsize(files[i][1])
+        index.append(ENTRY.pack(offset, size, len(names[i])) + names[i])
+        offset += size
+
+    archive_file = open(path, "wb")
+    archive_file.write(HEADER.pack(MAGIC, VERSION, len(files)))
+    archive_file.write(b"".join(index))
+    for name, file_path in files:
+        data_file = open(file_path, "rb")
+        archive_file.write(data_file.read())
+        data_file.close()
+    archive_file.close()
+    return offset
+
+def resolve(path):
+    '''This function takes the path of one of the game's files, relative to
+    the game directory, and returns its absolute path.'''
+    return os.path.join(GAME_DIRECTORY, os.path.normpath(path))
+
+def name_of(path):
+    '''This function takes the path of one of the game's files and returns
+    its name in the archive.'''
+    path = os.path.normpath(path)
+    if os.path.isabs(path):
+        path = os.path.relpath(path, GAME_DIRECTORY)
+    return path.replace(os.sep, "/")
+
+# The archive of the game (opened the first time an asset is asked for, and
+# left as None if there is none)
+_archive = None
+_looked = False
+
+def get_archive():
+    '''This function returns the archive of the game, or None if there is
+    no archive file.'''
+    global _archive, _looked
+    if not _looked:
+        _looked = True
+        path = resolve(ARCHIVE)
+        if os.path.exists(path):
+            _archive = Archive(path)
+    return _archive
+
+def _packed(path):
+    '''This function takes the path of one of the game's files and returns
+    its name if it is in the archive, or None if it is a loose file.'''
+    archive = get_archive()
+    if archive == None:
+        return None
+    name = name_of(path)
+    if archive.contains(name):
+        return name
+    return None
+
+def exists(path):
+    '''This function takes the path of one of the game's files and returns
+    True if it is in the archive or on disk.'''
+    return _packed(path) != None or os.path.exists(resolve(path))
+
+def size(path):
+    '''This function takes the path of one of the game's files and returns
+    its size in bytes.'''
+    name = _packed(path)
+    if name != None:
+        return get_archive().size(name)
+    return os.path.getsize(resolve(path))
+
+def read(path):
+    '''This function takes the path of one of the game's files and returns
+    its bytes: a memoryview of the archive if it is packed (nothing is
+    copied), or the bytes read from its file.'''
+    name = _packed(path)
+    if name != None:
+        return get_archive().read(name)
+    data_file = open(resolve(path), "rb")
+    data = data_file.read()
+    data_file.close()
+    return data
+
+def source(path):
+    '''This function takes the path of one of the game's files and returns
+    what the pygame loaders take to load it: a View of it if it is packed,
+    or else the absolute path of its file.'''
+    name = _packed(path)
+    if name != None:
+        return get_archive().open(name)
+    return resolve(path)
@@ -0,0 +1,139 @@
+'''
+   Description: This file contains the shared asset registry for the Cloud
+   Jumper game. Images are loaded lazily the first time they are asked for,
+   converted to the display format once, and handed out from memory after
+   that, so constructing a sprite never touches the disk twice for the same
+   file. Images packed by buildAtlas.py are handed out as subsurfaces of the
+   atlas sheet instead of being opened one by one, and every file is read
+   through myArchive (from the packed asset archive when there is one).
+   It contains the following:
+                          - AssetRegistry
+                          - registry (the process-wide AssetRegistry)
+                          - load_image()
+                          - stats()
+'''
+import json, os, pygame, myArchive
+
+class AssetRegistry(object):
+    '''This class defines a cache of image surfaces keyed by their path.'''
+    def __init__(self, atlas="./Images/atlas.json"):
+        '''This initializer takes the path of the atlas index (None for no
+        atlas), creates the empty cache and zeroes the hit/miss/bytes
+        statistics.'''
+        # Dictionary of loaded surfaces keyed by their normalized path
+        self.__images = {}
+        # Set of keys whose surfaces are already in the display format
+        self.__converted = set()
+
+        # The atlas index is read the first time an image is requested
+        self.__atlas = atlas
+        self.__atlas_sheet = None
+        self.__frames = None
+        # Dictionary of (sheet, subsurface) pairs keyed by frame name
+        self.__subsurfaces = {}
+
+        # Initialize the statistics
+        self.__hits = 0
+        self.__misses = 0
+        self.__bytes_read = 0
+
+    def __convert(self, key):
+        '''This method takes a cache key and replaces the cached surface with
+        its display-format copy. It does nothing until a display mode is set,
+        so the registry can also be used without a window.'''
+        if pygame.display.get_surface() is None:
+            return
+
+        surface = self.__images[key]
+        # Keep per-pixel alpha for images that have it (the PNG sprites)
+        if surface.get_flags() & pygame.SRCALPHA:
+            self.__images[key] = surface.convert_alpha()
+        else:
+            self.__images[key] = surface.convert()
+        self.__converted.add(key)
+
+    def __load_atlas(self):
+        '''This method reads the atlas index if there is one. Without an
+        index every image is loaded from its own file.'''
+        self.__frames = {}
+        if self.__atlas is None or not myArchive.exists(self.__atlas):
+            return
+
+        self.__bytes_read += myArchive.size(self.__atlas)
+        index = json.loads(bytes(myArchive.read(self.__atlas)).decode("utf-8"))
+
+        self.__atlas_sheet = os.path.join(os.path.dirname(self.__atlas),
+                                          index["image"])
+        for name, frame in index["frames"].items():
+            self.__frames[os.path.normpath(name)] = pygame.Rect(frame)
+
+    def __frame(self, key):
+        '''This method takes the key of a packed image and returns its
+        subsurface of the atlas sheet.'''
+        sheet = self.image(self.__atlas_sheet)
+
+        # Cut a new subsurface if the sheet has been loaded or converted
+        # since this frame was last requested
+        cached = self.__subsurfaces.get(key)
+        if cached is None or cached[0] is not sheet:
+            cached = (sheet, sheet.subsurface(self.__frames[key]))
+            self.__subsurfaces[key] = cached
+
+        return cached[1]
+
+    def image(self, path):
+        '''This method takes the path of an image file and returns its shared
+        surface, loading it from disk only the first time it is requested.
+        The returned surface must not be drawn on; copy() it first.'''
+        key = os.path.normpath(path)
+
+        # Hand out packed images from the atlas sheet
+        if self.__frames is None:
+            self.__load_atlas()
+        if key in self.__frames:
+            return self.__frame(key)
+
+        # Load the image from disk if it has not been seen before
+        if key not in self.__images:
+            self.__misses += 1
+            self.__bytes_read += myArchive.size(path)
+            # (the file name tells the loader the format of a packed image)
+            self.__images[key] = pygame.image.load(myArchive.source(path), \
+                                                   os.path.basename(path))
+        else:
+            self.__hits += 1
+
+        # Convert the surface once the display exists
+        if key not in self.__converted:
+            self.__convert(key)
+
+        return self.__images[key]
+
+    def clear(self):
+        '''This method empties the cache and resets the statistics.'''
+        self.__init__(self.__atlas)
+
+    def stats(self):
+        '''This method returns a dictionary with the number of cache hits and
+        misses, the bytes read from disk and the bytes held in memory.'''
+        surface_bytes = 0
+        for surface in self.__images.values():
+            surface_bytes += surface.get_bytesize() * surface.get_width() * \
+                             surface.get_height()
+
+        return {"hits": self.__hits, "misses": self.__misses,
+                "bytes_read": self.__bytes_read,
+                "surface_bytes": surface_bytes,
+                "images": len(self.__images)}
+
+# The registry shared by every sprite in the game
+registry = AssetRegistry()
+
+def load_image(path):
+    '''This function takes the path of an image file and returns its shared
+    surface from the process-wide registry.'''
+    return registry.image(path)
+
+def stats():
+    '''This function returns the statistics of the process-wide registry.'''
+    return registry.stats()
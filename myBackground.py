@@ -0,0 +1,93 @@
+'''
+   Description: This file contains the background of the Cloud Jumper game:
+   the sky drawn behind every sprite, with any number of parallax layers
+   (images with transparent parts that scroll slower or faster than the
+   level) drawn over it.
+
+   Every layer is turned once into a strip in the display's pixel format,
+   as wide as the screen and one screen taller than its image, with the
+   image repeated down it, so the part of a vertically tiled layer on the
+   screen is always one window of the strip. Drawing a layer is a single
+   screen-sized area blit however tall its image is, and the sky covers the
+   whole screen, so the screen is never filled first.
+   It contains the following:
+                          - Layer
+                          - Background
+'''
+import pygame, myAssets
+
+class Layer(object):
+    '''This class defines one vertically tiled image of the background.'''
+    def __init__(self, image, size, factor=1.0):
+        '''This initializer takes the image of the layer, the (width, height)
+        of the screen and how far the layer scrolls for every pixel the
+        camera scrolls (1 moves with the level, less looks further away).'''
+        self.__factor = factor
+        self.__height = image.get_height()
+        width = min(image.get_width(), size[0])
+        # An image with transparent parts is drawn over the layers below it
+        self.__opaque = image.get_alpha() == None and \
+                        not image.get_flags() & pygame.SRCALPHA and \
+                        width == size[0]
+
+        # The image repeated down a strip one screen taller than it, so
+        # any screen-high window of the tiled image is in one piece
+        flags = 0
+        if not self.__opaque:
+            flags = pygame.SRCALPHA
+        self.__strip = pygame.Surface((width, self.__height + size[1]), \
+                                      flags, 32)
+        top = 0
+        while top < self.__height + size[1]:
+            self.__strip.blit(image, (0, top), (0, 0, width, self.__height))
+            top += self.__height
+        if pygame.display.get_surface() != None:
+            if self.__opaque:
+                self.__strip = self.__strip.convert()
+            else:
+                self.__strip = self.__strip.convert_alpha()
+
+        # The window of the strip drawn on the screen
+        self.__window = pygame.Rect(0, 0, width, size[1])
+
+    def is_opaque(self):
+        '''This method returns True if the layer covers the whole screen.'''
+        return self.__opaque
+
+    def get_factor(self):
+        '''This method returns how far the layer scrolls for every pixel the
+        camera scrolls.'''
+        return self.__factor
+
+    def draw(self, surface, top):
+        '''This method takes a surface and the y on it of the top of one of
+        the tiles of the layer (any tile) and draws the layer over the
+        whole surface.'''
+        self.__window.top = -top % self.__height
+        surface.blit(self.__strip, (0, 0), self.__window)
+
+class Background(object):
+    '''This class defines the sky and the parallax layers over it.'''
+    def __init__(self, size, sky="./Images/sky.jpg", layers=(), \
+                 color=(255, 255, 255)):
+        '''This initializer takes the (width, height) of the screen, the
+        path of the sky image, a tuple of (image path, factor) pairs of the
+        parallax layers, from the furthest away to the closest, and the
+        colour filled behind a sky that does not cover the screen.'''
+        self.__sky = Layer(myAssets.load_image(sky), size)
+        self.__layers = []
+        for path, factor in layers:
+            self.__layers.append(Layer(myAssets.load_image(path), size, \
+                                       factor))
+        self.__color = color
+
+    def draw(self, surface, top, offset=0):
+        '''This method takes a surface, the y on it of the top of the sky
+        image (the sky sprite's position) and the camera's offset (which
+        places the parallax layers), and draws the background over the
+        whole surface.'''
+        if not self.__sky.is_opaque():
+            surface.fill(self.__color)
+        self.__sky.draw(surface, top)
+        for layer in self.__layers:
+            layer.draw(surface, int(offset * layer.get_factor()))
@@ -0,0 +1,343 @@
+'''
+   Description: This file contains a batched Cloud Jumper simulator for
+   balance tuning. It keeps the state of many games at once in NumPy arrays
+   (one row per game) and applies the rules of myWorld.World (with the
+   classic recycled clouds, streaming=False) to all of them with vectorized
+   operations: the player's jumping physics, landing on the
+   clouds, scrolling, the star, shield and monster, and the bullets. It
+   draws nothing and keeps no sprites, so it needs NumPy but no display.
+   It contains the following:
+                          - the direction codes
+                          - BatchWorld
+'''
+import numpy, myAssets
+
+# Direction codes given to BatchWorld.step() for each game
+NONE = 0
+RIGHT = 1
+LEFT = 2
+RELEASE = 3
+
+# The y value of every cloud in a new game (as in mySprites.Cloud)
+CLOUD_TOPS = [0, 40, 80, 120, 160, 200, 250, 310, 360, 400, 450, 500, 590]
+
+class BatchWorld(object):
+    '''This class defines the state of a batch of games of Cloud Jumper.'''
+    def __init__(self, games, seed=None, size=(420, 640), bullets=8):
+        '''This initializer takes the number of games, an optional seed for
+        the random number generator, the size of the game area and the
+        number of bullets each game can have in flight, and starts a new
+        game in every row.'''
+        self.__games = games
+        self.__width, self.__height = size
+        self.__random = numpy.random.default_rng(seed)
+
+        # Sizes of the sprites (from the images, like the sprites' rects)
+        self.__player_size = myAssets.load_image("./Images/doodleL1.png") \
+                                     .get_size()
+        self.__cloud_size = myAssets.load_image("./Images/cloud1.png") \
+                                    .get_size()
+        self.__monster_size = myAssets.load_image("./Images/alienR0.png") \
+                                      .get_size()
+        self.__star_size = myAssets.load_image("./Images/star0.png").get_size()
+        self.__shield_size = myAssets.load_image("./Images/shield.png") \
+                                     .get_size()
+        self.__bullet_size = myAssets.load_image("./Images/ball.png").get_size()
+
+        # Rules of the game (as in mySprites.Player and mySprites.Bullet)
+        self.gravity = 2
+        self.jump_velocity = -23
+        self.scroll_speed = 8
+        self.immunity_ticks = 300
+        self.bullet_speed = 30
+
+        shape = (games,)
+        clouds = (games, len(CLOUD_TOPS))
+        # Player
+        self.player_x = numpy.zeros(shape, numpy.int32)
+        self.player_bottom = numpy.zeros(shape, numpy.int32)
+        self.player_velocity = numpy.zeros(shape, numpy.int32)
+        self.player_ground = numpy.zeros(shape, numpy.int32)
+        self.player_dx = numpy.zeros(shape, numpy.int32)
+        self.immune = numpy.zeros(shape, bool)
+        self.immune_counter = numpy.zeros(shape, numpy.int32)
+        # Clouds, star, shield and monster (left and top of their rects)
+        self.cloud_left = numpy.zeros(clouds, numpy.int32)
+        self.cloud_top = numpy.zeros(clouds, numpy.int32)
+        self.star_left = numpy.zeros(shape, numpy.int32)
+        self.star_top = numpy.zeros(shape, numpy.int32)
+        self.shield_left = numpy.zeros(shape, numpy.int32)
+        self.shield_top = numpy.zeros(shape, numpy.int32)
+        self.monster_left = numpy.zeros(shape, numpy.int32)
+        self.monster_top = numpy.zeros(shape, numpy.int32)
+        # Bullets (a fixed number of slots per game)
+        self.bullet_left = numpy.zeros((games, bullets), numpy.int32)
+        self.bullet_top = numpy.zeros((games, bullets), numpy.int32)
+        self.bullet_alive = numpy.zeros((games, bullets), bool)
+        # Status of every game
+        self.scroll = numpy.zeros(shape, numpy.int32)
+        self.score = numpy.zeros(shape, numpy.int64)
+        self.ticks = numpy.zeros(shape, numpy.int64)
+        self.alive = numpy.zeros(shape, bool)
+        self.over = numpy.zeros(shape, bool)
+
+        self.reset()
+
+    def get_games(self):
+        '''This method returns the number of games in the batch.'''
+        return self.__games
+
+    def __randrange(self, start, stop, mask):
+        '''This method takes the bounds of a range and a boolean mask of the
+        games, and returns random integers in [start, stop) for the games
+        where the mask is True.'''
+        return self.__random.integers(start, stop, int(mask.sum()),
+                                      dtype=numpy.int32)
+
+    def __place(self, left, top, size, bottoms, lefts, mask, centered):
+        '''This method takes the left and top arrays of a pickup or the
+        monster, its size, the (start, stop) ranges of its new bottom and
+        left values and a mask, and moves the masked games' sprite to a
+        random position above the screen. If centered is True the random x
+        value is used as the centre (like the sprites' initializers).'''
+        if not mask.any():
+            return
+        new_left = self.__randrange(lefts[0], lefts[1], mask)
+        if centered:
+            new_left -= size[0] // 2
+        left[mask] = new_left
+        top[mask] = self.__randrange(bottoms[0], bottoms[1], mask) - size[1]
+
+    def reset(self, mask=None):
+        '''This method takes an optional boolean mask of the games (all games
+        by default) and starts a new game in each of them.'''
+        if mask is None:
+            mask = numpy.ones(self.__games, bool)
+        width, height = self.__width, self.__height
+
+        # Player at the bottom centre of the game area, about to jump
+        self.player_x[mask] = width // 2
+        self.player_bottom[mask] = height - 50
+        self.player_velocity[mask] = self.jump_velocity
+        self.player_ground[mask] = height - 20
+        self.player_dx[mask] = 0
+        self.immune[mask] = False
+        self.immune_counter[mask] = 0
+
+        # Clouds at their fixed heights with random x values, except the
+        # special clouds under the player and on the left
+        tops = numpy.array(CLOUD_TOPS, numpy.int32)
+        count = int(mask.sum())
+        self.cloud_top[mask] = tops
+        lefts = self.__random.integers(0, width - 100, (count, len(tops)),
+                                       dtype=numpy.int32)
+        lefts[:, 11:13] = width // 2 - 45
+        lefts[:, 7] = 40
+        self.cloud_left[mask] = lefts
+
+        # Pickups and monster somewhere above the screen
+        self.__place(self.monster_left, self.monster_top, self.__monster_size,
+                     (-4999, -999), (0, width - 80), mask, True)
+        self.__place(self.star_left, self.star_top, self.__star_size,
+                     (-2999, -499), (0, width - 50), mask, True)
+        self.__place(self.shield_left, self.shield_top, self.__shield_size,
+                     (-2999, -799), (0, width - 80), mask, True)
+
+        self.bullet_alive[mask] = False
+        self.scroll[mask] = 0
+        self.score[mask] = 0
+        self.ticks[mask] = 0
+        self.alive[mask] = True
+        self.over[mask] = False
+
+    def __overlap(self, left, top, size, other_left, other_top, other_size):
+        '''This method takes the left, top and size of two kinds of rects
+        (arrays that broadcast against each other) and returns where they
+        overlap, with the same rule as pygame.Rect.colliderect().'''
+        return (left < other_left + other_size[0]) & \
+               (left + size[0] > other_left) & \
+               (top < other_top + other_size[1]) & \
+               (top + size[1] > other_top)
+
+    def __land(self):
+        '''This method makes the players jump on the clouds and sets the
+        scroll value of every game, like World's landing rule.'''
+        player_w, player_h = self.__player_size
+        cloud_w, cloud_h = self.__cloud_size
+        player_left = (self.player_x - player_w // 2)[:, None]
+        player_top = (self.player_bottom - player_h)[:, None]
+        bottom = self.player_bottom[:, None]
+
+        # Clouds the players touch while falling
+        falling = self.player_velocity > 0
+        touching = self.__overlap(player_left, player_top, self.__player_size,
+                                  self.cloud_left, self.cloud_top,
+                                  self.__cloud_size) & falling[:, None]
+        landed = touching.any(axis=1)
+
+        # The ground is the centre of the last touched cloud (in cloud
+        # order) whose centre is still below the player's feet
+        centers = self.cloud_top + cloud_h // 2
+        under = touching & (bottom <= centers)
+        has_ground = under.any(axis=1)
+        last = under.shape[1] - 1 - numpy.argmax(under[:, ::-1], axis=1)
+        ground = centers[numpy.arange(self.__games), last]
+        self.player_ground = numpy.where(has_ground, ground,
+                                         self.player_ground)
+
+        # Every touched cloud, in order, scrolls the screen (and scores)
+        # once the highest touched cloud so far is above 500
+        tops = numpy.where(touching, self.cloud_top, self.__height)
+        highest = numpy.minimum.accumulate(tops, axis=1)
+        scrolling = touching & (highest < 500)
+        self.score += self.scroll_speed * scrolling.sum(axis=1) * ~self.over
+        self.scroll = numpy.where(landed, numpy.where(highest[:, -1] < 500,
+                                  self.scroll_speed, 0), self.scroll)
+
+        # Fall through the bottom when falling without touching a cloud
+        self.player_ground = numpy.where(falling & ~landed,
+                                         self.__height + 20,
+                                         self.player_ground)
+
+    def __collide(self):
+        '''This method checks the bullets, star, shield and monster against
+        each other and the players, like World's collision rules.'''
+        player_w, player_h = self.__player_size
+        player_left = self.player_x - player_w // 2
+        player_top = self.player_bottom - player_h
+        live = ~self.over
+        width = self.__width
+
+        # The first bullet touching the monster kills it and is removed
+        hits = self.bullet_alive & self.__overlap(self.bullet_left,
+                    self.bullet_top, self.__bullet_size,
+                    self.monster_left[:, None], self.monster_top[:, None],
+                    self.__monster_size)
+        killed = hits.any(axis=1)
+        first = numpy.argmax(hits, axis=1)
+        games = numpy.nonzero(killed)[0]
+        self.bullet_alive[games, first[games]] = False
+        self.__place(self.monster_left, self.monster_top, self.__monster_size,
+                     (-9999, -1999), (0, width - 80), killed, False)
+
+        # A star is worth 500 points
+        star = self.__overlap(player_left, player_top, self.__player_size,
+                              self.star_left, self.star_top, self.__star_size)
+        self.__place(self.star_left, self.star_top, self.__star_size,
+                     (-2999, -499), (0, width - 50), star, False)
+        self.score += 500 * (star & live)
+
+        # A shield makes the player immune to the monster
+        shield = self.__overlap(player_left, player_top, self.__player_size,
+                                self.shield_left, self.shield_top,
+                                self.__shield_size)
+        self.__place(self.shield_left, self.shield_top, self.__shield_size,
+                     (-5999, -999), (0, width - 80), shield, False)
+        self.immune |= shield
+
+        # The monster kills a player in the game area without a shield
+        monster = self.__overlap(player_left, player_top, self.__player_size,
+                                 self.monster_left, self.monster_top,
+                                 self.__monster_size)
+        return monster & (player_top > 0) & ~self.immune
+
+    def __respawn(self, left, top, size, bottoms, lefts):
+        '''This method takes the arrays, size and ranges of a pickup or the
+        monster, scrolls it and moves it back above the screen once it has
+        left the bottom.'''
+        top += self.scroll
+        self.__place(left, top, size, bottoms, lefts, top > self.__height,
+                     False)
+
+    def __move(self):
+        '''This method moves every sprite by one tick, like the update()
+        methods of the sprites.'''
+        width, height = self.__width, self.__height
+
+        # Clouds leaving the bottom come back at the top
+        gone = self.cloud_top > height
+        self.cloud_top += self.scroll[:, None]
+        self.cloud_top[gone] = -self.__cloud_size[1]
+        self.cloud_left[gone] = self.__random.integers(0, width - 100,
+                                    int(gone.sum()), dtype=numpy.int32)
+
+        # Monster walks to the right and wraps around
+        walking = self.monster_left < width
+        self.monster_left = numpy.where(walking, self.monster_left + 1,
+                                        -self.__monster_size[0])
+        self.__respawn(self.monster_left, self.monster_top,
+                       self.__monster_size, (-9999, -1999), (0, width - 80))
+
+        # Bullets fly up until they leave the top
+        self.bullet_top -= self.bullet_speed
+        self.bullet_alive &= self.bullet_top + self.__bullet_size[1] >= 0
+
+        # Player wraps around the sides, falls off the bottom and jumps
+        self.player_x = numpy.where(self.player_x < 0, width, self.player_x)
+        self.player_x = numpy.where(self.player_x > width, 0, self.player_x)
+        self.alive &= self.player_bottom < height
+        next_bottom = self.player_bottom + self.player_velocity
+        rising = next_bottom <= self.player_ground
+        self.player_bottom = numpy.where(rising, next_bottom,
+                                         self.player_bottom)
+        self.player_x += self.player_dx * rising
+        self.player_velocity = numpy.where(rising, self.player_velocity +
+                                           self.gravity, self.jump_velocity)
+
+        # Immunity wears off after a while
+        self.immune_counter += self.immune
+        expired = self.immune_counter >= self.immunity_ticks
+        self.immune_counter[expired] = 0
+        self.immune &= ~expired
+
+        self.__respawn(self.shield_left, self.shield_top, self.__shield_size,
+                       (-5999, -999), (0, width - 80))
+        self.__respawn(self.star_left, self.star_top, self.__star_size,
+                       (-2999, -499), (0, width - 50))
+
+    def step(self, direction=None, fire=None):
+        '''This method takes an optional array of direction codes and an
+        optional boolean array of bullets fired (one entry per game) and
+        advances every game by one tick. Games that are over keep moving
+        but their score and ticks no longer change.'''
+        live = ~self.over
+        if direction is not None:
+            self.player_dx = numpy.select([direction == RIGHT,
+                direction == LEFT, direction == RELEASE],
+                [10, -10, 0], self.player_dx).astype(numpy.int32)
+        if fire is not None:
+            self.__fire(fire & live)
+
+        self.__land()
+        self.alive &= ~self.__collide()
+
+        # A game is over once its player has lost (it still moves this tick)
+        self.over |= ~self.alive
+        self.__move()
+        self.ticks += live
+
+    def __fire(self, fire):
+        '''This method takes a boolean array of the games that fire and adds
+        a bullet at the player's feet in the first free slot of each.'''
+        free = ~self.bullet_alive
+        games = numpy.nonzero(fire & free.any(axis=1))[0]
+        slots = numpy.argmax(free[games], axis=1)
+        bullet_w, bullet_h = self.__bullet_size
+        self.bullet_left[games, slots] = self.player_x[games] - bullet_w // 2
+        self.bullet_top[games, slots] = self.player_bottom[games] - bullet_h
+        self.bullet_alive[games, slots] = True
+
+    def run(self, max_ticks, policy=None):
+        '''This method takes the maximum number of ticks and an optional
+        policy (a function taking the BatchWorld and returning the direction
+        and fire arrays for the tick) and steps the batch until every game
+        is over or the limit is reached. It returns the array of scores.'''
+        for tick in range(max_ticks):
+            if self.over.all():
+                break
+            if policy is None:
+                self.step()
+            else:
+                direction, fire = policy(self)
+                self.step(direction, fire)
+        return self.score
@@ -0,0 +1,83 @@
+'''
+   Description: This file contains the camera of the Cloud Jumper game. The
+   sprites that scroll with the level (the sky, the clouds, the monster and
+   the pickups) are kept in world coordinates, which never change as the
+   screen scrolls: world coordinates are screen coordinates at the start of
+   the game, and a point at world y is drawn at y + offset on the screen,
+   where the offset is how far the camera has scrolled up since then.
+   Scrolling the screen is one addition to the offset per tick however many
+   sprites there are; sprites are only turned into screen coordinates when
+   they are drawn (and skipped when they are off the screen).
+
+   The scroll of a tick is chosen before the sprites are moved and added to
+   the offset after them (advance()), so a sprite's update() can tell where
+   it is on the screen now and where it will be once the tick is over.
+   It contains the following:
+                          - Camera
+                          - FIXED (a camera that never moves)
+'''
+
+class Camera(object):
+    '''This class defines the camera following the player up the level.'''
+    def __init__(self):
+        '''This initializer creates a camera at the start of the level that
+        is not scrolling.'''
+        # How far the camera has scrolled up and how far it scrolls this tick
+        self.__offset = 0
+        self.__scroll = 0
+
+    def get_offset(self):
+        '''This method returns how far the camera has scrolled up.'''
+        return self.__offset
+
+    def get_scroll(self):
+        '''This method returns how far the camera scrolls this tick.'''
+        return self.__scroll
+
+    def set_scroll(self, scroll):
+        '''This method takes scroll as a parameter and makes it how far the
+        camera scrolls every tick from now on.'''
+        self.__scroll = scroll
+
+    def advance(self):
+        '''This method scrolls the camera by one tick (to be called once the
+        sprites of the tick have been moved).'''
+        self.__offset += self.__scroll
+
+    def to_screen_y(self, y, moved=False):
+        '''This method takes a world y and returns where it is on the screen
+        (once this tick's scroll is done if moved is True).'''
+        if moved:
+            return y + self.__offset + self.__scroll
+        return y + self.__offset
+
+    def to_world_y(self, y, moved=False):
+        '''This method takes a screen y and returns the world y drawn there
+        (once this tick's scroll is done if moved is True).'''
+        if moved:
+            return y - self.__offset - self.__scroll
+        return y - self.__offset
+
+    def to_screen(self, rect):
+        '''This method takes a rect in world coordinates and returns a new
+        rect where it is on the screen.'''
+        return rect.move(0, self.__offset)
+
+    def to_world(self, rect):
+        '''This method takes a rect in screen coordinates and returns a new
+        rect where it is in the world.'''
+        return rect.move(0, -self.__offset)
+
+    def get_state(self):
+        '''This method returns the camera's offset and scroll as a tuple.'''
+        return (self.__offset, self.__scroll)
+
+    def set_state(self, state):
+        '''This method takes a tuple returned by get_state() and puts the
+        camera back in that state.'''
+        self.__offset, self.__scroll = state
+
+# The camera of sprites that are not in a scrolling level (such as those of
+# the welcome screen), whose world coordinates are screen coordinates; it is
+# never scrolled
+FIXED = Camera()
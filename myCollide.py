@@ -0,0 +1,132 @@
+'''
+   Description: This file contains the collision broadphase for Cloud Jumper.
+   A SpatialHash files sprites into the cells of a uniform grid covering the
+   cells their rects touch, so a collision query only has to look at the
+   sprites near the rect being tested instead of every sprite in a group.
+   The grid is kept up to date incrementally: a sprite is only re-filed when
+   it moves into a different set of cells.
+   It contains the following:
+                          - SpatialHash
+'''
+
+class SpatialHash(object):
+    '''This class defines a uniform grid of cells holding sprites.'''
+    def __init__(self, cell_size=128):
+        '''This initializer takes the width and height of a cell in pixels
+        and creates an empty grid.'''
+        self.__cell_size = cell_size
+        # Dictionary of sets of sprites keyed by (column, row)
+        self.__cells = {}
+        # Dictionary of the cell range each sprite is filed under
+        self.__ranges = {}
+        # Dictionary of the order sprites were added in (queries return
+        # sprites in that order, like iterating over a pygame Group)
+        self.__order = {}
+        self.__count = 0
+
+    def __len__(self):
+        '''This method returns the number of sprites in the grid.'''
+        return len(self.__ranges)
+
+    def __contains__(self, sprite):
+        '''This method returns True if the sprite is in the grid.'''
+        return sprite in self.__ranges
+
+    def __range(self, rect):
+        '''This method takes a rect and returns the (left, top, right,
+        bottom) columns and rows of the cells it covers.'''
+        size = self.__cell_size
+        return (rect.left // size, rect.top // size,
+                (rect.right - 1) // size, (rect.bottom - 1) // size)
+
+    def __file(self, sprite, cells):
+        '''This method takes a sprite and a cell range and adds the sprite
+        to every cell in the range.'''
+        for column in range(cells[0], cells[2] + 1):
+            for row in range(cells[1], cells[3] + 1):
+                cell = self.__cells.get((column, row))
+                if cell == None:
+                    cell = self.__cells[(column, row)] = set()
+                cell.add(sprite)
+
+    def __unfile(self, sprite, cells):
+        '''This method takes a sprite and a cell range and removes the
+        sprite from every cell in the range, dropping empty cells.'''
+        for column in range(cells[0], cells[2] + 1):
+            for row in range(cells[1], cells[3] + 1):
+                cell = self.__cells[(column, row)]
+                cell.discard(sprite)
+                if not cell:
+                    del self.__cells[(column, row)]
+
+    def add(self, *sprites):
+        '''This method takes any number of sprites and adds them to the
+        grid at their current rects.'''
+        for sprite in sprites:
+            if sprite in self.__ranges:
+                continue
+            cells = self.__range(sprite.rect)
+            self.__file(sprite, cells)
+            self.__ranges[sprite] = cells
+            self.__order[sprite] = self.__count
+            self.__count += 1
+
+    def remove(self, *sprites):
+        '''This method takes any number of sprites and removes them from
+        the grid.'''
+        for sprite in sprites:
+            cells = self.__ranges.pop(sprite, None)
+            if cells != None:
+                self.__unfile(sprite, cells)
+                del self.__order[sprite]
+
+    def sprites(self):
+        '''This method returns the list of sprites in the grid in the order
+        they were added.'''
+        return sorted(self.__ranges, key=self.__order.get)
+
+    def clear(self):
+        '''This method removes every sprite from the grid.'''
+        self.__cells.clear()
+        self.__ranges.clear()
+        self.__order.clear()
+
+    def move(self, sprite):
+        '''This method takes a sprite whose rect has changed and re-files it
+        if it now covers a different set of cells.'''
+        cells = self.__range(sprite.rect)
+        old_cells = self.__ranges[sprite]
+        if cells != old_cells:
+            self.__unfile(sprite, old_cells)
+            self.__file(sprite, cells)
+            self.__ranges[sprite] = cells
+
+    def refresh(self):
+        '''This method re-files every sprite that has moved into different
+        cells (to be called once the sprites have been updated).'''
+        for sprite in list(self.__ranges):
+            self.move(sprite)
+
+    def query(self, rect):
+        '''This method takes a rect and returns the list of sprites in the
+        grid whose rects collide with it, in the order they were added.'''
+        size = self.__cell_size
+        found = set()
+        for column in range(rect.left // size, (rect.right - 1) // size + 1):
+            for row in range(rect.top // size, (rect.bottom - 1) // size + 1):
+                cell = self.__cells.get((column, row))
+                if cell:
+                    found.update(cell)
+
+        hits = []
+        for sprite in found:
+            if rect.colliderect(sprite.rect):
+                hits.append(sprite)
+        if len(hits) > 1:
+            hits.sort(key=self.__order.get)
+        return hits
+
+    def collide(self, sprite):
+        '''This method takes a sprite and returns the list of sprites in the
+        grid that collide with it (like pygame.sprite.spritecollide()).'''
+        return self.query(sprite.rect)
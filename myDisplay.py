@@ -0,0 +1,258 @@
+'''
+   Description: This file contains the display backends of the Cloud Jumper
+   game. The game is always drawn at its own size (420x640); the window can
+   be that size or scaled up (by any factor, e.g. to fill a 1080p cabinet
+   screen) by either backend:
+
+       - SurfaceDisplay: the software path. The game is drawn with Surface
+         blits onto the window (or, when scaled, onto an off-screen surface
+         that is scaled into the window every frame).
+       - TextureDisplay: the hardware path, through pygame._sdl2.video. Every
+         image is uploaded once as a texture (images cut from the atlas
+         share the atlas sheet's texture) and drawn with texture copies; the
+         renderer scales the whole frame to the window, so scaling costs
+         nothing per frame. Headless (with no GPU) SDL's software renderer
+         is used instead.
+
+   The game loop draws on a TextureDisplay as if it were the screen surface
+   (it has the blit(), blits() and fill() of a Surface) and the frame is
+   redrawn in full every time. The other screens draw on an off-screen
+   surface (get_surface()) that flip() uploads and shows.
+
+   Images drawn on a TextureDisplay must not change once drawn (their
+   textures are kept), except those passed to refresh() before drawing.
+   It contains the following:
+                          - SurfaceDisplay
+                          - TextureDisplay
+                          - create()
+'''
+import os, sys, weakref, pygame
+
+# The pygame._sdl2 video module is missing from some pygame builds (and
+# from pygame 1), in which case only the software path is available
+try:
+    from pygame._sdl2 import video
+except ImportError:
+    video = None
+
+# Size of the game area
+SIZE = (420, 640)
+
+# SDL blend mode of textures drawn with their alpha channel
+BLEND = 1
+
+def scale_size(size, scale):
+    '''This function takes a (width, height) and a scale factor and returns
+    the scaled (width, height).'''
+    return (int(round(size[0] * scale)), int(round(size[1] * scale)))
+
+def fit_scale(size):
+    '''This function takes a (width, height) and returns the largest scale
+    factor that fits it on the desktop (1 if the desktop size is not
+    known).'''
+    sizes = pygame.display.get_desktop_sizes()
+    if not sizes or sizes[0][0] <= 0 or sizes[0][1] <= 0:
+        return 1.0
+    return min(sizes[0][0] / float(size[0]), sizes[0][1] / float(size[1]))
+
+class SurfaceDisplay(object):
+    '''This class defines the software display.'''
+    def __init__(self, size=SIZE, scale=1.0):
+        '''This initializer takes the size of the game area and the scale
+        factor of the window and opens the window.'''
+        self.__size = size
+        self.__window = pygame.display.set_mode(scale_size(size, scale))
+        # Draw straight onto the window unless it is scaled
+        if self.__window.get_size() == size:
+            self.__surface = self.__window
+        else:
+            self.__surface = pygame.Surface(size).convert()
+
+    def is_textured(self):
+        '''This method returns False: everything is drawn with Surfaces.'''
+        return False
+
+    def get_surface(self):
+        '''This method returns the surface the game area is drawn on.'''
+        return self.__surface
+
+    def get_target(self):
+        '''This method returns what the game loop draws on (the surface of
+        the game area).'''
+        return self.__surface
+
+    def set_caption(self, caption):
+        '''This method takes the title of the window.'''
+        pygame.display.set_caption(caption)
+
+    def flip(self):
+        '''This method shows the whole game area.'''
+        if self.__surface is not self.__window:
+            pygame.transform.scale(self.__surface, self.__window.get_size(), \
+                                   self.__window)
+        pygame.display.flip()
+
+    def update(self, rects):
+        '''This method takes a list of rects of the game area and shows
+        those parts of it (the whole of it when the window is scaled).'''
+        if self.__surface is not self.__window:
+            self.flip()
+        else:
+            pygame.display.update(rects)
+
+class TextureDisplay(object):
+    '''This class defines the display drawn with textures.'''
+    def __init__(self, size=SIZE, scale=1.0, title="Cloud Jumper"):
+        '''This initializer takes the size of the game area, the scale
+        factor of the window and its title, and opens the window with a
+        hardware renderer (or SDL's software renderer if there is none). It
+        raises video.error if no renderer can be made.'''
+        self.__size = size
+        window_size = scale_size(size, scale)
+        # Smooth the frame when it is scaled by a fraction
+        if window_size[0] % size[0] or window_size[1] % size[1]:
+            os.environ.setdefault("SDL_RENDER_SCALE_QUALITY", "linear")
+        self.__window = video.Window(title, size=window_size)
+        try:
+            self.__renderer = video.Renderer(self.__window, accelerated=1)
+        except video.error:
+            self.__renderer = video.Renderer(self.__window, accelerated=0)
+        # Draw at the size of the game area and let the renderer scale it
+        self.__renderer.logical_size = size
+
+        # The off-screen surface the other screens draw on and the texture
+        # it is uploaded to
+        self.__surface = pygame.Surface(size, 0, 32)
+        self.__canvas = video.Texture(self.__renderer, size, streaming=True)
+
+        # Textures of the images drawn so far, keyed by image (dropped with
+        # the image), and the textures of the images refreshed every frame
+        self.__textures = weakref.WeakKeyDictionary()
+        self.__streamed = weakref.WeakKeyDictionary()
+        # True once something has been drawn with textures since the last
+        # frame was shown
+        self.__drawn = False
+
+    def is_textured(self):
+        '''This method returns True: the game loop draws with textures.'''
+        return True
+
+    def get_surface(self):
+        '''This method returns the off-screen surface the screens other than
+        the game loop are drawn on.'''
+        return self.__surface
+
+    def get_target(self):
+        '''This method returns what the game loop draws on (the display
+        itself).'''
+        return self
+
+    def set_caption(self, caption):
+        '''This method takes the title of the window.'''
+        self.__window.title = caption
+
+    def get_size(self):
+        '''This method returns the size of the game area.'''
+        return self.__size
+
+    def get_width(self):
+        '''This method returns the width of the game area.'''
+        return self.__size[0]
+
+    def get_height(self):
+        '''This method returns the height of the game area.'''
+        return self.__size[1]
+
+    def get_rect(self):
+        '''This method returns the rect of the game area.'''
+        return pygame.Rect((0, 0), self.__size)
+
+    def __source(self, image):
+        '''This method takes an image and returns the texture it is drawn
+        from and the rect of the image in that texture (images cut from a
+        sheet are drawn from the sheet's texture).'''
+        texture = self.__streamed.get(image)
+        if texture != None:
+            return texture, image.get_rect()
+
+        sheet = image.get_abs_parent()
+        texture = self.__textures.get(sheet)
+        if texture == None:
+            texture = video.Texture.from_surface(self.__renderer, sheet)
+            self.__textures[sheet] = texture
+        return texture, pygame.Rect(image.get_abs_offset(), image.get_size())
+
+    def refresh(self, image):
+        '''This method takes an image that is drawn over in place (like the
+        score label) and uploads it again, so it is drawn as it is now.'''
+        texture = self.__streamed.get(image)
+        if texture == None or texture.width != image.get_width() or \
+           texture.height != image.get_height():
+            texture = video.Texture(self.__renderer, image.get_size(), \
+                                    streaming=True)
+            texture.blend_mode = BLEND
+            self.__streamed[image] = texture
+        texture.update(image)
+
+    def blit(self, image, position, area=None):
+        '''This method takes an image, the position to draw it at and an
+        optional rect of the part of it to draw, and draws it like
+        Surface.blit(). It returns the rect drawn.'''
+        texture, source = self.__source(image)
+        if area != None:
+            area = pygame.Rect(area).clip(image.get_rect())
+            source = area.move(source.topleft)
+        rect = pygame.Rect(position[0], position[1], source.width, \
+                           source.height)
+        texture.draw(source, rect)
+        self.__drawn = True
+        return rect
+
+    def blits(self, sequence, doreturn=True):
+        '''This method takes a sequence of (image, position) pairs and draws
+        them like Surface.blits().'''
+        rects = []
+        for image, position in sequence:
+            rects.append(self.blit(image, position))
+        if doreturn:
+            return rects
+        return None
+
+    def fill(self, color):
+        '''This method takes a colour and fills the game area with it.'''
+        self.__renderer.draw_color = color
+        self.__renderer.clear()
+        self.__drawn = True
+
+    def flip(self):
+        '''This method shows the frame drawn with textures, or, if nothing
+        was, the off-screen surface.'''
+        if not self.__drawn:
+            self.__canvas.update(self.__surface)
+            self.__canvas.draw()
+        self.__renderer.present()
+        self.__drawn = False
+
+    def update(self, rects):
+        '''This method takes a list of rects and shows the whole frame (a
+        renderer cannot show only part of one).'''
+        self.flip()
+
+def create(size=SIZE, scale=1.0, textures=False):
+    '''This function takes the size of the game area, the scale factor of
+    the window (or "fit" for the largest that fits the desktop) and whether
+    to draw with textures, and returns the display. It falls back to the
+    software display if textures are not available.'''
+    if scale == "fit":
+        scale = fit_scale(size)
+    if textures:
+        if video == None:
+            sys.stderr.write("Textures are not available in this pygame; "
+                             "drawing with surfaces\n")
+        else:
+            try:
+                return TextureDisplay(size, scale)
+            except (pygame.error, video.error) as error:
+                sys.stderr.write("Could not draw with textures (%s); drawing "
+                                 "with surfaces\n" % (error))
+    return SurfaceDisplay(size, scale)
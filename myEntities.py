@@ -0,0 +1,239 @@
+'''
+   Description: This file contains a compact entity store for stress levels
+   of Cloud Jumper with thousands of clouds and enemies. Instead of one
+   pygame Sprite per entity (with its own dictionary, rect, image list and
+   group bookkeeping), the entities of a type are rows of a few NumPy
+   columns (position, animation frame, counters), all entities of a type
+   share one table of images, and a system updates every entity of a type
+   in one vectorized pass with the same rules as the sprites' update()
+   methods. Only the entities on screen are turned into blits (or into
+   lightweight views with a rect and an image, for code that wants
+   sprite-like objects).
+   It contains the following:
+                          - image_table()
+                          - EntityView
+                          - EntityStore
+                          - update_clouds()
+                          - update_monsters()
+                          - update_stars()
+'''
+import numpy, pygame, myAnimation, myAssets
+
+# Images of each type of entity that is not animated (the animated ones
+# share the frames of the sprites' clips in myAnimation)
+IMAGES = {"cloud": ["./Images/cloud%d.png" % (number)
+                    for number in range(1, 6)],
+          "shield": ["./Images/shield.png"]}
+
+# Image tables shared by every store, keyed by type
+_tables = {}
+
+def image_table(kind):
+    '''This function takes the name of a type of entity and returns the
+    tuple of its images, loaded once and shared by every store.'''
+    table = _tables.get(kind)
+    if table == None:
+        if kind in myAnimation.CLIPS:
+            table = myAnimation.get_clip(kind).frames
+        else:
+            table = tuple(myAssets.load_image(path) for path in IMAGES[kind])
+        _tables[kind] = table
+    return table
+
+class EntityView(object):
+    '''This class defines a lightweight sprite-like view of one entity: its
+    rect and image at the time the view was made.'''
+    __slots__ = ("index", "rect", "image")
+
+    def __init__(self, index, rect, image):
+        '''This initializer takes the entity's index in its store, its rect
+        and its image.'''
+        self.index = index
+        self.rect = rect
+        self.image = image
+
+class EntityStore(object):
+    '''This class defines the entities of one type kept as columns of
+    arrays (one row per entity).'''
+    def __init__(self, kind, fields=(), capacity=64):
+        '''This initializer takes the name of the type of entity, the names
+        of the extra integer columns it needs and the number of rows to
+        start with (the store grows as needed).'''
+        self.images = image_table(kind)
+        # Every entity's rect is the size of the first image (like the
+        # sprites, whose rects keep the size of the image they start with)
+        self.__size = self.images[0].get_size()
+        self.__names = ("left", "top", "frame") + tuple(fields)
+        self.__columns = {}
+        for name in self.__names:
+            self.__columns[name] = numpy.zeros(capacity, numpy.int32)
+        self.__alive = numpy.zeros(capacity, bool)
+        # Rows in use are all below count; free rows below it are reused
+        self.__count = 0
+        self.__free = []
+
+    def __len__(self):
+        '''This method returns the number of entities alive.'''
+        return self.__count - len(self.__free)
+
+    def __grow(self):
+        '''This method doubles the number of rows of every column.'''
+        capacity = len(self.__alive) * 2
+        for name in self.__names:
+            column = numpy.zeros(capacity, numpy.int32)
+            column[:self.__count] = self.__columns[name][:self.__count]
+            self.__columns[name] = column
+        alive = numpy.zeros(capacity, bool)
+        alive[:self.__count] = self.__alive[:self.__count]
+        self.__alive = alive
+
+    def spawn(self, left, top, frame=0, **fields):
+        '''This method takes the left, top and frame of a new entity and the
+        values of any of its extra columns, and returns its index.'''
+        if self.__free:
+            index = self.__free.pop()
+        else:
+            if self.__count == len(self.__alive):
+                self.__grow()
+            index = self.__count
+            self.__count += 1
+
+        self.__alive[index] = True
+        self.__columns["left"][index] = left
+        self.__columns["top"][index] = top
+        self.__columns["frame"][index] = frame
+        for name in self.__names[3:]:
+            self.__columns[name][index] = fields.get(name, 0)
+        return index
+
+    def kill(self, index):
+        '''This method takes the index of an entity and removes it (its row
+        is reused by a later spawn).'''
+        if self.__alive[index]:
+            self.__alive[index] = False
+            self.__free.append(index)
+
+    def column(self, name):
+        '''This method takes the name of a column and returns the array of
+        its values for the rows in use (a view: changing it changes the
+        entities). Rows of dead entities are in it too; see alive().'''
+        return self.__columns[name][:self.__count]
+
+    def alive(self):
+        '''This method returns the boolean array of which rows in use hold a
+        live entity.'''
+        return self.__alive[:self.__count]
+
+    def get_size(self):
+        '''This method returns the width and height of the entities' rects.'''
+        return self.__size
+
+    def __visible(self, surface):
+        '''This method takes the surface drawn on and returns the indices of
+        the live entities that overlap it.'''
+        left = self.column("left")
+        top = self.column("top")
+        width, height = self.__size
+        on_screen = self.alive() & (left < surface.get_width()) & \
+                    (left + width > 0) & (top < surface.get_height()) & \
+                    (top + height > 0)
+        return numpy.nonzero(on_screen)[0]
+
+    def draw(self, surface):
+        '''This method takes a surface and draws every live entity that is
+        on it, in one call. It returns the number of entities drawn.'''
+        indices = self.__visible(surface)
+        images = self.images
+        frames = self.column("frame")[indices].tolist()
+        lefts = self.column("left")[indices].tolist()
+        tops = self.column("top")[indices].tolist()
+        surface.blits([(images[frames[number]], (lefts[number], tops[number]))
+                       for number in range(len(frames))], False)
+        return len(frames)
+
+    def views(self, surface):
+        '''This method takes the surface drawn on and returns the list of
+        EntityViews of the live entities that are on it.'''
+        views = []
+        frames = self.column("frame")
+        for index in self.__visible(surface).tolist():
+            image = self.images[frames[index]]
+            rect = pygame.Rect((int(self.column("left")[index]),
+                                int(self.column("top")[index])), self.__size)
+            views.append(EntityView(index, rect, image))
+        return views
+
+    def collide(self, rect):
+        '''This method takes a rect and returns the array of indices of the
+        live entities whose rects overlap it.'''
+        left = self.column("left")
+        top = self.column("top")
+        width, height = self.__size
+        hits = self.alive() & (left < rect.right) & (left + width > rect.left) \
+               & (top < rect.bottom) & (top + height > rect.top)
+        return numpy.nonzero(hits)[0]
+
+def _respawn(store, gone, rng, spawn, left_limit):
+    '''This function takes a store, the boolean array of the entities that
+    left the bottom of the screen, a NumPy random number generator, the
+    (start, stop) range of their new bottoms (counting down, like
+    randrange(start, stop, -1)) and the upper limit of their new left, and
+    moves them back above the screen.'''
+    count = int(gone.sum())
+    if not count:
+        return
+    bottoms = rng.integers(spawn[1] + 1, spawn[0] + 1, count, numpy.int32)
+    store.column("top")[gone] = bottoms - store.get_size()[1]
+    store.column("left")[gone] = rng.integers(0, left_limit, count,
+                                              numpy.int32)
+
+def _animate(store):
+    '''This function takes a store with a counter column and moves every
+    entity on to its next frame every 3 ticks (frame 0 first, then frames
+    1 to 3 over and over), like the monster's and star's update().'''
+    counter = store.column("counter")
+    frame = store.column("frame")
+    turn = counter == 3
+    frame[turn] = numpy.where(frame[turn] < 3, frame[turn] + 1, 1)
+    counter[turn] = 0
+    counter += 1
+
+def update_clouds(store, scroll, screen, rng, recycle=True):
+    '''This function takes the store of clouds, the scroll value, the screen
+    surface, a NumPy random number generator and whether clouds leaving
+    the bottom come back at the top, and moves every cloud by one tick.'''
+    top = store.column("top")
+    gone = store.alive() & (top > screen.get_height())
+    if not recycle:
+        gone[:] = False
+    top += scroll
+    # Clouds that left the bottom go back above the top of the screen
+    count = int(gone.sum())
+    if count:
+        top[gone] = -store.get_size()[1]
+        store.column("left")[gone] = rng.integers(0, screen.get_width() - 100,
+                                                  count, numpy.int32)
+
+def update_monsters(store, scroll, screen, rng, spawn=(-2000, -10000)):
+    '''This function takes the store of monsters (with a counter column),
+    the scroll value, the screen surface, a NumPy random number generator
+    and the range of heights they come back at, and moves every monster
+    by one tick.'''
+    _animate(store)
+    left = store.column("left")
+    # Walk to the right, wrapping around to the left
+    walking = left < screen.get_width()
+    left[:] = numpy.where(walking, left + 1, -store.get_size()[0])
+    store.column("top")[:] += scroll
+    gone = store.alive() & (store.column("top") > screen.get_height())
+    _respawn(store, gone, rng, spawn, screen.get_width() - 80)
+
+def update_stars(store, scroll, screen, rng, spawn=(-500, -3000)):
+    '''This function takes the store of stars (with a counter column), the
+    scroll value, the screen surface, a NumPy random number generator and
+    the range of heights they come back at, and moves every star by one
+    tick.'''
+    _animate(store)
+    store.column("top")[:] += scroll
+    gone = store.alive() & (store.column("top") > screen.get_height())
+    _respawn(store, gone, rng, spawn, screen.get_width() - 50)
@@ -0,0 +1,163 @@
+'''
+   Description: This file contains the level streaming for Cloud Jumper.
+   Instead of recycling a fixed set of clouds, the level above the first
+   screen is cut into chunks (horizontal bands of the world). A chunk's
+   clouds are generated from the level seed and the chunk's number only
+   when the chunk comes into view, and every cloud of a chunk that has
+   scrolled out of view goes back to a pool to be reused by a later chunk,
+   so the number of cloud sprites stays the same however high the player
+   climbs.
+
+   World coordinates are screen coordinates at the start of the game: the
+   first screen is chunk 0 (y from 0 to the chunk height), chunk 1 is the
+   band right above it, and so on. The altitude is how far the screen has
+   scrolled up since the start (the offset of the game's myCamera.Camera),
+   so a point at world y is drawn at y + altitude on the screen. Clouds are
+   placed in world coordinates and never move once placed.
+   It contains the following:
+                          - CloudPool
+                          - LevelStreamer
+'''
+import random, mySprites
+
+# Height of a chunk in pixels
+CHUNK_HEIGHT = 640
+# Every chunk has one cloud in every slot of this height, moved up or down
+# by up to JITTER pixels (so two clouds are always 40 to 88 pixels apart,
+# well within the player's jump)
+SLOT_HEIGHT = 64
+JITTER = 12
+# How far above the top of the screen chunks are generated in advance
+AHEAD = 64
+
+class CloudPool(object):
+    '''This class defines a pool of cloud sprites that can be reused.'''
+    def __init__(self, screen, rng=random, camera=None):
+        '''This initializer takes the screen surface, the random number
+        generator used to pick the image of new clouds and the
+        myCamera.Camera whose world coordinates the clouds are in.'''
+        self.__screen = screen
+        self.__random = rng
+        self.__camera = camera
+        # List of the clouds that are not in use
+        self.__free = []
+        # Total number of clouds created by the pool
+        self.__created = 0
+
+    def get_created(self):
+        '''This method returns the number of clouds the pool has created.'''
+        return self.__created
+
+    def acquire(self, left, top):
+        '''This method takes left and top (in world coordinates) as
+        parameters and returns a cloud placed there, reusing a free cloud if
+        there is one.'''
+        if self.__free:
+            cloud = self.__free.pop()
+        else:
+            cloud = mySprites.Cloud(self.__screen, 0, self.__random, \
+                                    self.__camera)
+            cloud.set_recycle(False)
+            self.__created += 1
+
+        cloud.place(left, top)
+        return cloud
+
+    def release(self, cloud):
+        '''This method takes a cloud that is no longer in use and keeps it
+        for later.'''
+        self.__free.append(cloud)
+
+    def get_state(self):
+        '''This method returns the free clouds and the number of clouds
+        created as the pool's state.'''
+        return (tuple(self.__free), self.__created)
+
+    def set_state(self, state):
+        '''This method takes a value returned by get_state() and puts the
+        pool back in that state (clouds created since then are dropped).'''
+        self.__free = list(state[0])
+        self.__created = state[1]
+
+class LevelStreamer(object):
+    '''This class defines the object that creates and recycles the chunks
+    of the level as the screen scrolls up.'''
+    def __init__(self, screen, seed, pool):
+        '''This initializer takes the screen surface, the level seed and the
+        CloudPool the clouds are taken from.'''
+        self.__screen = screen
+        self.__seed = seed
+        self.__pool = pool
+        # Dictionary of the lists of clouds keyed by chunk number
+        self.__chunks = {}
+        # Highest chunk generated so far
+        self.__top_chunk = 0
+
+    def start(self, clouds):
+        '''This method takes the clouds of the first screen (which are placed
+        by the game itself) and makes them chunk 0.'''
+        for cloud in clouds:
+            cloud.set_recycle(False)
+        self.__chunks[0] = list(clouds)
+
+    def get_chunks(self):
+        '''This method returns the sorted list of chunk numbers in view.'''
+        return sorted(self.__chunks)
+
+    def get_state(self):
+        '''This method returns the chunks in view, the highest chunk
+        generated and the state of the pool as the streamer's state.'''
+        chunks = []
+        for number in self.__chunks:
+            chunks.append((number, tuple(self.__chunks[number])))
+        return (tuple(chunks), self.__top_chunk, self.__pool.get_state())
+
+    def set_state(self, state):
+        '''This method takes a value returned by get_state() and puts the
+        streamer (and its pool) back in that state.'''
+        chunks, self.__top_chunk, pool_state = state
+        self.__chunks = {}
+        for number, clouds in chunks:
+            self.__chunks[number] = list(clouds)
+        self.__pool.set_state(pool_state)
+
+    def __generate(self, number):
+        '''This method takes a chunk number and returns the list of clouds of
+        that chunk, placed in the world.'''
+        rng = random.Random("%s/%d" % (self.__seed, number))
+        width = self.__screen.get_width()
+        bottom = -CHUNK_HEIGHT * (number - 1)
+
+        clouds = []
+        for slot in range(CHUNK_HEIGHT // SLOT_HEIGHT):
+            top = bottom - SLOT_HEIGHT * (slot + 1) + \
+                  rng.randrange(-JITTER, JITTER + 1)
+            left = rng.randrange(0, width - 100)
+            clouds.append(self.__pool.acquire(left, top))
+        return clouds
+
+    def update(self, altitude):
+        '''This method takes the altitude, generates the chunks coming into
+        view at the top and recycles the chunks that have left the bottom.
+        It returns the list of clouds added and the list of clouds removed.'''
+        added = []
+        removed = []
+
+        # Generate every chunk whose bottom is above the top of the screen
+        # (minus AHEAD) that has not been generated yet
+        while -CHUNK_HEIGHT * (self.__top_chunk) + altitude > -AHEAD:
+            self.__top_chunk += 1
+            clouds = self.__generate(self.__top_chunk)
+            self.__chunks[self.__top_chunk] = clouds
+            added.extend(clouds)
+
+        # Recycle every chunk whose top is below the bottom of the screen
+        for number in sorted(self.__chunks):
+            top = -CHUNK_HEIGHT * number + altitude
+            if top <= self.__screen.get_height():
+                break
+            for cloud in self.__chunks.pop(number):
+                self.__pool.release(cloud)
+                removed.append(cloud)
+
+        return added, removed
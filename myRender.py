@@ -0,0 +1,226 @@
+'''
+   Description: This file contains the renderer used by the main game loop
+   of Cloud Jumper. By default it redraws and flips the whole screen every
+   frame. In dirty-rectangle mode it only repaints the regions that changed
+   and pushes them with pygame.display.update(), falling back to a full
+   flip on the frames where the sky (and so everything else) scrolls.
+   While an overlay (such as the frame profiler's) is shown, every frame
+   is drawn in full.
+
+   When the display runs faster than the game's fixed tick, the renderer
+   can draw the sprites part of the way between where they were before the
+   last tick and where they are now, so movement stays smooth at any
+   refresh rate.
+
+   Given a myCamera.Camera, the sky and the sprites in the given layers are
+   taken to be in its world coordinates: they are moved onto the screen by
+   the camera's offset as they are drawn, and those off the screen are not
+   drawn at all. The sprites themselves are never moved.
+
+   The sky and the parallax layers are drawn by a myBackground.Background,
+   placed by the Sky sprite and the camera.
+
+   Frames are pushed with pygame.display, or through a myDisplay display if
+   one is given. The renderer can also draw on a myDisplay.TextureDisplay
+   in place of the screen surface (in full-frame mode); the images of the
+   sprites in the given volatile layers (which are drawn over in place) are
+   then uploaded again every frame.
+   It contains the following:
+                          - Renderer
+'''
+import pygame
+
+# Sprites that moved further than this in one tick (in pixels) have jumped,
+# e.g. a cloud recycled to the top or the player wrapping around the
+# screen, and are drawn where they are instead of part of the way there
+SNAP_DISTANCE = 100
+
+class Renderer(object):
+    '''This class defines the object that draws each frame of the game.'''
+    def __init__(self, screen, background, sky, dirty, profiler=None, \
+                 camera=None, world_layers=(), display=None, \
+                 volatile_layers=()):
+        '''This initializer takes the screen surface, the
+        myBackground.Background drawn behind the sprites, the Sky sprite
+        that places it, a boolean variable dirty
+        that turns on dirty-rectangle mode, an optional
+        myTiming.FrameProfiler that draw() marks its phases on, and an
+        optional myCamera.Camera with the layers of the sprites (besides the
+        sky) that are in its world coordinates. The optional display is the
+        myDisplay display frames are pushed through and volatile_layers are
+        the layers of the sprites whose images are drawn over in place.'''
+        # Instance variables to keep track of the surfaces and the sky
+        self.__screen = screen
+        self.__background = background
+        self.__sky = sky
+        self.__dirty = dirty
+        self.__profiler = profiler
+        self.__camera = camera
+        self.__world_layers = frozenset(world_layers)
+        self.__display = display
+        # Only a TextureDisplay drawn on in place of the screen keeps
+        # copies of the images that have to be refreshed
+        self.__volatile_layers = ()
+        if hasattr(screen, "refresh"):
+            self.__volatile_layers = tuple(volatile_layers)
+
+        # The backdrop (the background drawn once more) used to erase
+        # sprites in dirty-rectangle mode, rebuilt whenever the sky has moved
+        self.__backdrop = pygame.Surface(screen.get_size())
+        self.__backdrop_stale = True
+
+        # Position of the sky and camera, group drawn and rects of the
+        # sprites drawn in the previous frame
+        self.__sky_position = None
+        self.__group = None
+        self.__drawn = []
+
+        # Dictionary of the screen positions of the sprites before the last
+        # tick keyed by sprite, and the camera's offset then
+        self.__previous = {}
+        self.__previous_offset = 0
+
+    def __get_offset(self):
+        '''This method returns the camera's offset (0 without a camera).'''
+        if self.__camera == None:
+            return 0
+        return self.__camera.get_offset()
+
+    def __positions(self, sprites):
+        '''This method takes the group of sprites and returns the list of
+        (sprite, screen position) pairs of the sky and every sprite with a
+        rect, the sky first and then the sprites in the order they are
+        drawn.'''
+        offset = self.__get_offset()
+        left, top = self.__sky.rect.topleft
+        positions = [(self.__sky, (left, top + offset))]
+
+        for layer in sprites.layers():
+            if layer in self.__world_layers:
+                layer_offset = offset
+            else:
+                layer_offset = 0
+            for sprite in sprites.get_sprites_from_layer(layer):
+                # (sprites that have not been shown yet, like the score
+                # before its first update, have no rect)
+                if hasattr(sprite, "rect"):
+                    left, top = sprite.rect.topleft
+                    positions.append((sprite, (left, top + layer_offset)))
+        return positions
+
+    def full_redraw(self):
+        '''This method makes the next frame repaint the whole screen.'''
+        self.__sky_position = None
+
+    def remember(self, sprites):
+        '''This method takes the group of sprites drawn on top of the sky
+        and keeps their screen positions (and the sky's) as they are before
+        a tick, to draw the frames until the next tick in between.'''
+        self.__previous = dict(self.__positions(sprites))
+        self.__previous_offset = self.__get_offset()
+
+    def __interpolate(self, positions, alpha):
+        '''This method takes the list of (sprite, screen position) pairs
+        and the fraction of a tick since the last one and returns the list
+        with every sprite (and the sky) that many fractions of the way from
+        its remembered position to its current one.'''
+        moved = []
+        for sprite, now in positions:
+            before = self.__previous.get(sprite)
+            if before != None:
+                dx = now[0] - before[0]
+                dy = now[1] - before[1]
+                if (dx != 0 or dy != 0) and abs(dx) <= SNAP_DISTANCE and \
+                   abs(dy) <= SNAP_DISTANCE:
+                    # Draw the sprite where it would be a fraction of a
+                    # tick ago
+                    now = (int(round(now[0] - dx * (1 - alpha))),
+                           int(round(now[1] - dy * (1 - alpha))))
+            moved.append((sprite, now))
+        return moved
+
+    def draw(self, sprites, overlay=None, alpha=None):
+        '''This method takes the group of sprites drawn on top of the sky,
+        an optional function that takes the screen surface and draws an
+        overlay over everything and an optional alpha (the fraction of a
+        tick that has passed since the last one, to draw the sprites in
+        between their remembered and current positions), and draws a
+        frame. It returns the list of rects that were pushed to the
+        display (the whole screen for a full frame).'''
+        positions = self.__positions(sprites)
+        offset = self.__get_offset()
+        if alpha != None and alpha < 1 and self.__previous:
+            positions = self.__interpolate(positions, alpha)
+            offset = int(round(offset - (offset - self.__previous_offset) * \
+                               (1 - alpha)))
+        return self.__draw_frame(sprites, positions, offset, overlay)
+
+    def __draw_frame(self, sprites, positions, offset, overlay):
+        '''This method takes the group of sprites, the list of (sprite,
+        screen position) pairs to draw them at (the sky first), the camera
+        offset to draw the background at and the overlay function (or None)
+        and draws a frame.'''
+        profiler = self.__profiler
+        screen = self.__screen
+
+        # A full frame is needed when the sky has scrolled, the group
+        # of sprites has been replaced since the last frame or an overlay
+        # is drawn
+        sky_position = (positions[0][1], offset)
+        full_frame = not self.__dirty or sprites is not self.__group or \
+                     sky_position != self.__sky_position or overlay != None
+        self.__sky_position = sky_position
+        self.__group = sprites
+
+        for layer in self.__volatile_layers:
+            for sprite in sprites.get_sprites_from_layer(layer):
+                if hasattr(sprite, "image"):
+                    screen.refresh(sprite.image)
+
+        # The sprites whose images are on the screen
+        area = screen.get_rect()
+        blits = []
+        for sprite, position in positions[1:]:
+            if sprite.image.get_rect(topleft=position).colliderect(area):
+                blits.append((sprite.image, position))
+        drawn = self.__drawn
+
+        if full_frame:
+            # Draw the sky straight onto the screen and flip everything
+            self.__background.draw(screen, sky_position[0][1], offset)
+            self.__backdrop_stale = True
+            self.__drawn = screen.blits(blits)
+            if overlay != None:
+                overlay(screen)
+                # Make the frame after the overlay is hidden a full one
+                self.__sky_position = None
+            if profiler != None:
+                profiler.mark("draw")
+            if self.__display != None:
+                self.__display.flip()
+            else:
+                pygame.display.flip()
+            if profiler != None:
+                profiler.mark("flip")
+            return [area]
+
+        # Rebuild the backdrop on the first still frame after a scroll
+        if self.__backdrop_stale:
+            self.__background.draw(self.__backdrop, sky_position[0][1], \
+                                   offset)
+            self.__backdrop_stale = False
+
+        # Erase the sprites' old positions and push only what changed
+        for rect in drawn:
+            screen.blit(self.__backdrop, rect, rect)
+        self.__drawn = screen.blits(blits)
+        rects = drawn + self.__drawn
+        if profiler != None:
+            profiler.mark("draw")
+        if self.__display != None:
+            self.__display.update(rects)
+        else:
+            pygame.display.update(rects)
+        if profiler != None:
+            profiler.mark("flip")
+        return rects
@@ -0,0 +1,164 @@
+'''
+   Description: This file contains the scene manager of the Cloud Jumper
+   game. Every screen of the game (the welcome screen, the instructions,
+   the game itself and the scores between games) is a Scene, made once when
+   the game starts: a scene loads and prepares everything it draws in its
+   preload() (at the latest just before it is first shown) and keeps it for
+   as long as the game runs, so coming back to a screen never loads
+   anything again. The SceneManager runs the one main
+   loop of the game and hands every frame to the current scene; switching
+   scenes only changes which scene that is.
+
+   A scene that is drawn at no frame rate is still: the loop sleeps until
+   something happens instead of drawing the same frame over and over.
+   It contains the following:
+                          - Scene
+                          - SceneManager
+'''
+import pygame
+
+class Scene(object):
+    '''This class defines a screen of the game. Scenes override the methods
+    they need; by default a scene draws nothing and ignores every event.'''
+    def __init__(self, caption="Cloud Jumper", fps=30):
+        '''This initializer takes the title of the window while the scene is
+        shown and the frames per second it is drawn at (None for a still
+        scene, drawn again only when an event comes in).'''
+        self.__caption = caption
+        self.__fps = fps
+        self.__loaded = False
+
+    def get_caption(self):
+        '''This method returns the title of the window while the scene is
+        shown.'''
+        return self.__caption
+
+    def is_still(self):
+        '''This method returns True if the scene is still (drawn only when
+        an event comes in).'''
+        return self.__fps == None
+
+    def preload(self):
+        '''This method loads and prepares everything the scene draws. It is
+        called once, before the scene is first shown.'''
+        pass
+
+    def load(self):
+        '''This method preloads the scene if it has not been preloaded.'''
+        if not self.__loaded:
+            self.__loaded = True
+            self.preload()
+
+    def enter(self, manager, *args):
+        '''This method takes the scene manager and the arguments the scene
+        was switched to with, and is called every time the scene is shown.'''
+        pass
+
+    def leave(self):
+        '''This method is called every time another scene is shown instead
+        of this one.'''
+        pass
+
+    def wait(self, clock):
+        '''This method takes the clock of the main loop, waits until it is
+        time for the next frame and returns the milliseconds since the last
+        one.'''
+        if self.__fps == None:
+            # Sleep until something happens (and leave it to be handled)
+            pygame.event.post(pygame.event.wait())
+            return clock.tick()
+        return clock.tick(self.__fps)
+
+    def handle(self, event):
+        '''This method takes an event that has come in.'''
+        pass
+
+    def update(self, elapsed):
+        '''This method takes the milliseconds since the last frame and moves
+        the scene on by that much.'''
+        pass
+
+    def draw(self):
+        '''This method draws a frame of the scene and shows it.'''
+        pass
+
+class SceneManager(object):
+    '''This class defines the main loop and the scenes it shows.'''
+    def __init__(self, display):
+        '''This initializer takes the display (of myDisplay) the scenes are
+        shown on.'''
+        self.__display = display
+        # Dictionary of scenes keyed by name
+        self.__scenes = {}
+        # The scene shown and the (scene, arguments) to show next, if any
+        self.__scene = None
+        self.__next = None
+        self.__running = False
+
+    def add(self, name, scene):
+        '''This method takes a name and a scene and adds the scene to those
+        that can be switched to.'''
+        self.__scenes[name] = scene
+
+    def get_scene(self):
+        '''This method returns the scene shown.'''
+        return self.__scene
+
+    def switch(self, name, *args):
+        '''This method takes the name of a scene and the arguments to enter
+        it with, and shows it from the next frame on. It raises ValueError
+        if no scene has that name.'''
+        scene = self.__scenes.get(name)
+        if scene == None:
+            raise ValueError("there is no scene named %s" % (name))
+        self.__next = (scene, args)
+
+    def preload(self):
+        '''This method preloads every scene that has not been preloaded.'''
+        for name in sorted(self.__scenes):
+            self.__scenes[name].load()
+
+    def quit(self):
+        '''This method ends the main loop after the current frame.'''
+        self.__running = False
+
+    def __swap(self):
+        '''This method shows the scene that was switched to.'''
+        scene, args = self.__next
+        self.__next = None
+        if self.__scene != None:
+            self.__scene.leave()
+        self.__scene = scene
+        scene.load()
+        self.__display.set_caption(scene.get_caption())
+        scene.enter(self, *args)
+
+    def run(self, name, *args):
+        '''This method takes the name of the first scene and the arguments
+        to enter it with, and runs the main loop until quit() is called.'''
+        clock = pygame.time.Clock()
+        self.switch(name, *args)
+        self.__running = True
+        while self.__running:
+            if self.__next != None:
+                self.__swap()
+                # Show a still scene straight away (its frames otherwise
+                # wait for an event to come in)
+                if self.__scene.is_still():
+                    self.__scene.draw()
+            scene = self.__scene
+
+            # Time
+            elapsed = scene.wait(clock)
+
+            # Events
+            for event in pygame.event.get():
+                scene.handle(event)
+
+            # Refresh screen
+            scene.update(elapsed)
+            scene.draw()
+
+        if self.__scene != None:
+            self.__scene.leave()
+            self.__scene = None
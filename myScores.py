@@ -0,0 +1,217 @@
+'''
+   Description: This file contains the leaderboard of the Cloud Jumper game.
+   Every run is kept in an SQLite database (in write-ahead log mode, so the
+   leaderboard can be read while a run is being written) with its score,
+   the time it ended and the seed it was played with.
+
+   Runs are written by a background thread fed through a queue, so the game
+   never waits on the disk; each write is one transaction, so a crash loses
+   at most the runs still in the queue and never leaves a half-written one.
+
+   The top scores come from an index on the score. The rank of a score comes
+   from a Fenwick tree (binary indexed tree) of run counts per score stored
+   in its own table, so both stay O(log n) however many runs there are.
+
+   The high score kept in highscores.txt by earlier versions of the game is
+   imported as a run the first time the database is created.
+   It contains the following:
+                          - Leaderboard
+'''
+import os, queue, sqlite3, sys, threading, time, myArchive
+
+# The database file and the high score file of earlier versions (in the
+# game directory, wherever the game is started from)
+DATABASE = myArchive.resolve("scores.db")
+LEGACY_FILE = myArchive.resolve("highscores.txt")
+
+# Scores are counted in a Fenwick tree over 0 to SCORE_LIMIT - 1 (higher
+# scores are ranked as if they were SCORE_LIMIT - 1)
+SCORE_LIMIT = 1 << 24
+
+# The most runs the writer puts in one transaction
+BATCH_SIZE = 256
+
+SCHEMA = ("CREATE TABLE IF NOT EXISTS runs ("
+          "id INTEGER PRIMARY KEY, score INTEGER NOT NULL, "
+          "played_at REAL NOT NULL, seed TEXT)",
+          "CREATE INDEX IF NOT EXISTS runs_by_score ON runs (score DESC, id)",
+          "CREATE TABLE IF NOT EXISTS rank_tree ("
+          "node INTEGER PRIMARY KEY, runs INTEGER NOT NULL)")
+
+def _node(score):
+    '''This function takes a score and returns its (1-based) node in the
+    Fenwick tree.'''
+    return min(max(int(score), 0), SCORE_LIMIT - 1) + 1
+
+def _update_nodes(score):
+    '''This function takes a score and returns the list of Fenwick tree
+    nodes whose count includes it.'''
+    nodes = []
+    node = _node(score)
+    while node <= SCORE_LIMIT:
+        nodes.append(node)
+        node += node & -node
+    return nodes
+
+def _prefix_nodes(node):
+    '''This function takes a Fenwick tree node and returns the list of nodes
+    whose counts add up to the number of runs at or below it.'''
+    nodes = []
+    while node > 0:
+        nodes.append(node)
+        node -= node & -node
+    return nodes
+
+def _connect(path):
+    '''This function takes the path of the database and returns a new
+    connection to it in write-ahead log mode.'''
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    # Every committed run survives a power cut as well as a crash
+    connection.execute("PRAGMA synchronous=FULL")
+    return connection
+
+def _insert(connection, runs):
+    '''This function takes a connection and a list of (score, played_at,
+    seed) tuples and adds the runs and their counts in the Fenwick tree in
+    one transaction.'''
+    with connection:
+        connection.executemany("INSERT INTO runs (score, played_at, seed) "
+                               "VALUES (?, ?, ?)", runs)
+        for run in runs:
+            nodes = []
+            for node in _update_nodes(run[0]):
+                nodes.append((node,))
+            connection.executemany("INSERT OR IGNORE INTO rank_tree "
+                                   "(node, runs) VALUES (?, 0)", nodes)
+            connection.executemany("UPDATE rank_tree SET runs = runs + 1 "
+                                   "WHERE node = ?", nodes)
+
+class Leaderboard(object):
+    '''This class defines the store of every run played.'''
+    def __init__(self, path=DATABASE, legacy=LEGACY_FILE):
+        '''This initializer takes the path of the database and of the old
+        high score file, creates the database if needed (importing the old
+        high score) and starts the writer thread.'''
+        self.__path = path
+        connection = _connect(path)
+        with connection:
+            for statement in SCHEMA:
+                connection.execute(statement)
+        empty = connection.execute("SELECT 1 FROM runs LIMIT 1").fetchone() \
+                == None
+        if empty and legacy != None:
+            self.__import_legacy(connection, legacy)
+        connection.close()
+
+        # Connection used by the game to read the leaderboard
+        self.__reader = _connect(path)
+
+        # The writer thread and the queue of runs (None asks it to stop)
+        self.__queue = queue.Queue()
+        self.__writer = threading.Thread(target=self.__write,
+                                         name="leaderboard writer")
+        self.__writer.daemon = True
+        self.__writer.start()
+
+    def __import_legacy(self, connection, legacy):
+        '''This method takes a connection and the path of the old high score
+        file and adds the score in it (the last number in the file) as a run
+        played when the file was last written.'''
+        try:
+            legacy_file = open(legacy, "r")
+            score = None
+            for line in legacy_file:
+                if line.strip():
+                    score = int(line)
+            legacy_file.close()
+            played_at = os.path.getmtime(legacy)
+        # Nothing to import if there is no readable old high score
+        except (IOError, ValueError):
+            return
+
+        if score != None:
+            _insert(connection, [(score, played_at, None)])
+
+    def __write(self):
+        '''This method is the writer thread: it takes runs off the queue and
+        writes them, several at a time when they come in faster than they
+        can be written, until it is asked to stop.'''
+        connection = _connect(self.__path)
+        running = True
+        while running:
+            items = [self.__queue.get()]
+            while len(items) < BATCH_SIZE and items[-1] != None:
+                try:
+                    items.append(self.__queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            runs = items
+            if items[-1] == None:
+                running = False
+                runs = items[:-1]
+            try:
+                if runs:
+                    _insert(connection, runs)
+            # Report the error and keep the game running
+            except sqlite3.Error as error:
+                sys.stderr.write("Leaderboard: could not save %d run(s): %s\n"
+                                 % (len(runs), error))
+
+            for item in items:
+                self.__queue.task_done()
+        connection.close()
+
+    def record(self, score, seed=None, played_at=None):
+        '''This method takes the score of a run, the seed it was played with
+        (if any) and when it ended (now by default) and queues the run to be
+        written. It returns straight away.'''
+        if played_at == None:
+            played_at = time.time()
+        if seed != None:
+            seed = str(seed)
+        self.__queue.put((int(score), played_at, seed))
+
+    def flush(self):
+        '''This method waits until every queued run has been written.'''
+        self.__queue.join()
+
+    def close(self):
+        '''This method writes the queued runs, stops the writer thread and
+        closes the database.'''
+        if self.__writer.is_alive():
+            self.__queue.put(None)
+            self.__writer.join()
+        self.__reader.close()
+
+    def __at_or_below(self, score):
+        '''This method takes a score and returns the number of runs with that
+        score or lower, read from the Fenwick tree.'''
+        nodes = _prefix_nodes(_node(score))
+        row = self.__reader.execute("SELECT SUM(runs) FROM rank_tree WHERE "
+                                    "node IN (%s)" % (",".join("?" * \
+                                    len(nodes))), nodes).fetchone()
+        return row[0] or 0
+
+    def count(self):
+        '''This method returns the number of runs written.'''
+        return self.__at_or_below(SCORE_LIMIT - 1)
+
+    def best(self):
+        '''This method returns the highest score (0 if there are no runs).'''
+        row = self.__reader.execute("SELECT MAX(score) FROM runs").fetchone()
+        return row[0] or 0
+
+    def top(self, count=10):
+        '''This method takes a number of runs and returns the list of the
+        highest scoring runs as (score, played_at, seed) tuples, highest
+        first (the earliest first between equal scores).'''
+        return self.__reader.execute("SELECT score, played_at, seed FROM runs "
+                                     "ORDER BY score DESC, id LIMIT ?",
+                                     (count,)).fetchall()
+
+    def rank(self, score):
+        '''This method takes a score and returns its rank among the runs
+        written (1 plus the number of runs that scored higher).'''
+        return self.count() - self.__at_or_below(score) + 1
@@ -0,0 +1,166 @@
+'''
+   Description: This file contains the sound bank for the Cloud Jumper game.
+   Every sound effect is decoded once into a mixer-ready Sound and played
+   on channels handed out by the bank: each effect has a limit on how many
+   copies of it can play at once and a priority, so rapid shooting reuses
+   its own channels instead of using up the ones the other effects need.
+   Music tracks are read into memory once, still compressed (or used in
+   place in the packed asset archive of myArchive), and streamed from
+   there, so changing tracks between screens never touches the disk.
+   It contains the following:
+                          - the effects and music tracks
+                          - SoundBank
+                          - bank (the process-wide SoundBank)
+                          - preload()
+                          - play()
+                          - play_music()
+'''
+import os, pygame, myArchive
+
+# Sound effects (named after the events of myWorld) with their file, volume,
+# the most copies that can play at once and their priority (a higher
+# priority effect can take the channel of a lower priority one)
+EFFECTS = {"end": ("./Sounds/end.wav", 0.3, 1, 3),
+           "killed": ("./Sounds/killed.wav", 0.7, 2, 2),
+           "star": ("./Sounds/star.wav", 0.8, 2, 2),
+           "shield": ("./Sounds/shield.wav", 0.8, 1, 2),
+           "shoot": ("./Sounds/shoot.wav", 0.8, 3, 1)}
+
+# Music tracks
+INTRO_MUSIC = "./Sounds/intro.mp3"
+GAME_MUSIC = "./Sounds/Rainbow Road.mp3"
+MUSIC = (INTRO_MUSIC, GAME_MUSIC)
+
+class SoundBank(object):
+    '''This class defines the decoded sound effects and the mixer channels
+    they are played on.'''
+    def __init__(self, effects=EFFECTS, channels=8, music=MUSIC):
+        '''This initializer takes the dictionary of effects, the number of
+        mixer channels to use and the paths of the music tracks. Nothing is
+        loaded until the first sound is played (or preload() is called).'''
+        self.__effects = effects
+        self.__music_paths = music
+        self.__channel_count = channels
+        # Dictionary of decoded sounds keyed by effect name
+        self.__sounds = None
+        # List of the channels and what each one last played, as
+        # (effect name, priority, play number) tuples
+        self.__channels = None
+        self.__voices = None
+        self.__plays = 0
+        # The music track currently loaded and the compressed tracks read
+        # so far, keyed by path
+        self.__music = None
+        self.__tracks = {}
+
+    def preload(self):
+        '''This method starts the mixer if needed, decodes every sound
+        effect and reads every music track into memory.'''
+        if self.__sounds != None:
+            return
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+
+        pygame.mixer.set_num_channels(self.__channel_count)
+        self.__channels = []
+        self.__voices = []
+        for number in range(self.__channel_count):
+            self.__channels.append(pygame.mixer.Channel(number))
+            self.__voices.append(None)
+
+        self.__sounds = {}
+        for name in self.__effects:
+            path, volume, voices, priority = self.__effects[name]
+            sound = pygame.mixer.Sound(myArchive.source(path))
+            sound.set_volume(volume)
+            self.__sounds[name] = sound
+        for path in self.__music_paths:
+            self.__track(path)
+
+    def __choose(self, name, voices, priority):
+        '''This method takes an effect name, its voice limit and priority and
+        returns the number of the channel it should play on, or None if
+        every channel is busy with something at least as important.'''
+        own = None
+        own_count = 0
+        free = None
+        victim = None
+        for number in range(len(self.__channels)):
+            playing = self.__voices[number]
+            if playing == None or not self.__channels[number].get_busy():
+                if free == None:
+                    free = number
+            elif playing[0] == name:
+                # Remember the oldest copy of this effect
+                own_count += 1
+                if own == None or playing[2] < self.__voices[own][2]:
+                    own = number
+            elif playing[1] < priority:
+                # Remember the oldest of the least important effects
+                if victim == None or playing[1:] < self.__voices[victim][1:]:
+                    victim = number
+
+        # Restart the oldest copy when the effect is at its limit
+        if own_count >= voices:
+            return own
+        if free != None:
+            return free
+        return victim
+
+    def play(self, name):
+        '''This method takes the name of an effect and plays it. It returns
+        the channel used, or None if the effect was dropped.'''
+        self.preload()
+        path, volume, voices, priority = self.__effects[name]
+
+        number = self.__choose(name, voices, priority)
+        if number == None:
+            return None
+
+        channel = self.__channels[number]
+        channel.play(self.__sounds[name])
+        self.__voices[number] = (name, priority, self.__plays)
+        self.__plays += 1
+        return channel
+
+    def __track(self, path):
+        '''This method takes the path of a music file and returns a file
+        object over the track in memory, reading the file the first time.'''
+        data = self.__tracks.get(path)
+        if data == None:
+            data = myArchive.read(path)
+            self.__tracks[path] = data
+        return myArchive.View(data, path)
+
+    def play_music(self, path, volume):
+        '''This method takes the path of a music file and a volume and plays
+        the track on a loop, streaming it from memory. A track that is
+        already playing just has its volume changed.'''
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+
+        if path != self.__music or not pygame.mixer.music.get_busy():
+            # The extension tells the mixer how the track is encoded
+            pygame.mixer.music.load(self.__track(path), \
+                                    os.path.splitext(path)[1][1:])
+            pygame.mixer.music.play(-1)
+            self.__music = path
+        pygame.mixer.music.set_volume(volume)
+
+# The sound bank shared by the whole game
+bank = SoundBank()
+
+def preload():
+    '''This function decodes the effects and reads the music tracks of the
+    process-wide sound bank.'''
+    bank.preload()
+
+def play(name):
+    '''This function takes the name of an effect and plays it through the
+    process-wide sound bank.'''
+    return bank.play(name)
+
+def play_music(path, volume):
+    '''This function takes the path of a music file and a volume and plays
+    the track through the process-wide sound bank.'''
+    bank.play_music(path, volume)
@@ -7,25 +7,27 @@
                           - Cloud
                           - Player
                           - Bullet
+                          - BulletPool
                           - Monster
                           - Star
                           - Shield
                           - ScoreKeeper
 '''
-import pygame, random   
+import pygame, random, myAnimation, myAssets, myCamera, myText   
 
 class Sky(pygame.sprite.Sprite):
     '''This class defines the background which is capable of scrolling down.'''
-    def __init__(self, screen):
+    def __init__(self, screen, camera=None):
         '''This initializer takes the screen surface as a parameter and 
         initializes the image and rect attributes along with the __scroll 
-        value of the background.'''
+        value of the background. The optional camera is the myCamera.Camera 
+        whose world coordinates the sky is kept in (screen coordinates by 
+        default).'''
         # Call the parent __init__() method  
         pygame.sprite.Sprite.__init__(self)   
         
         # Set the image and rect attributes of the sky
-        self.image = pygame.image.load("./Images/sky.jpg")
-        self.image.convert() 
+        self.image = myAssets.load_image("./Images/sky.jpg")
         
         self.rect = self.image.get_rect()
         self.rect.bottom = screen.get_height()
@@ -33,8 +35,11 @@ class Sky(pygame.sprite.Sprite):
         
         # Initialize __scroll value of the sky
         self.__scroll = 0
-        # Instance variable to keep track of the screen surface  
+        # Instance variables to keep track of the screen surface and camera
         self.__screen = screen
+        if camera == None:
+            camera = myCamera.FIXED
+        self.__camera = camera
         
     def set_scroll(self, scroll):
         '''This method takes scroll as a parameter and assigns its value 
@@ -44,26 +49,43 @@ class Sky(pygame.sprite.Sprite):
     def update(self):
         '''This method will be called automatically to reposition the         
         sky on the screen.''' 
-        # Check if the y position is greater than 0
+        # Check if the y position on the screen is greater than 0
         # and sets it to the screen height if True
-        if self.rect.top >= 0:
-            self.rect.bottom = self.__screen.get_height()
+        if self.__camera.to_screen_y(self.rect.top) >= 0:
+            self.rect.bottom = self.__camera.to_world_y(\
+                                    self.__screen.get_height(), True)
         # If not, it will add __scroll to the y position of the sky background.
         else:
             self.rect.bottom += self.__scroll
         
+    def get_state(self):
+        '''This method returns the sky's position and scroll as a tuple.'''
+        return (self.rect.left, self.rect.top, self.__scroll)
+        
+    def set_state(self, state):
+        '''This method takes a tuple returned by get_state() and puts the 
+        sky back in that state.'''
+        self.rect.left, self.rect.top, self.__scroll = state
+        
 class Cloud(pygame.sprite.Sprite):     
     '''This class defines the cloud sprite.'''    
-    def __init__(self, screen, variable):   
+    def __init__(self, screen, variable, rng=random, camera=None):   
         '''This initializer takes the screen surface and an integer variable as 
-        parameters and initializes the image and rect attributes of the cloud.'''
+        parameters and initializes the image and rect attributes of the cloud.
+        The optional rng parameter is the random number generator used to 
+        place the cloud (the random module by default) and camera is the 
+        myCamera.Camera whose world coordinates the cloud is kept in (screen 
+        coordinates by default).'''
         # Call the parent __init__() method  
         pygame.sprite.Sprite.__init__(self)           
         
+        # Instance variable to keep track of the random number generator
+        self.__random = rng
+        
         # Set the image (randomly) for the clouds 
-        randnum = random.randrange(1, 6)
-        self.image = pygame.image.load("./Images/cloud" + str(randnum) + ".png")
-        self.image.convert()
+        randnum = self.__random.randrange(1, 6)
+        self.image = myAssets.load_image("./Images/cloud" + str(randnum) + \
+                                         ".png")
         
         # Set the rect attributes
         self.rect = self.image.get_rect() 
@@ -81,56 +103,85 @@ class Cloud(pygame.sprite.Sprite):
             self.rect.left = 40
         # Assign a random x value for normal clouds
         else:
-            self.rect.left = random.randrange(0, screen.get_width()-100) 
+            self.rect.left = self.__random.randrange(0, screen.get_width()-100) 
         
-        # Instance variable to keep track of the screen surface  
+        # Instance variables to keep track of the screen surface and camera
         self.__screen = screen
+        if camera == None:
+            camera = myCamera.FIXED
+        self.__camera = camera
         # Assign the cloud's variable to instance variable
         self.__variable = variable
         # Initialize __scroll value of the cloud
         self.__scroll = 0
+        # Clouds go back to the top when they leave the bottom unless
+        # a level places them
+        self.__recycle = True
     
     def set_scroll(self, scroll):
         '''This method takes scroll as a parameter and assigns its value 
         to __scroll.'''
         self.__scroll = scroll
         
+    def set_recycle(self, recycle):
+        '''This method takes a boolean variable as a parameter and assigns 
+        its value to __recycle. A cloud that is not recycled keeps scrolling 
+        down when it leaves the screen.'''
+        self.__recycle = recycle
+        
+    def place(self, left, top):
+        '''This method takes left and top (in world coordinates) as 
+        parameters and moves the cloud there.'''
+        self.rect.left = left
+        self.rect.top = top
+        
     def reset(self):
         '''This method resets the cloud's y value and randomizes it's x value.'''
-        self.rect.bottom = 0
-        self.rect.left = random.randrange(0,7) * 50
+        self.rect.bottom = self.__camera.to_world_y(0)
+        self.rect.left = self.__random.randrange(0,7) * 50
         
     def update(self):
         '''This method will be called automatically to reposition the         
         cloud sprite on the screen.'''  
         # If the cloud goes off-screen, reset its x and y values
-        if self.rect.top > self.__screen.get_height():
-            self.rect.bottom = 0
-            self.rect.left = random.randrange(0, self.__screen.get_width()-100) 
+        if self.__recycle and self.__camera.to_screen_y(self.rect.top) > \
+           self.__screen.get_height():
+            self.rect.bottom = self.__camera.to_world_y(0, True)
+            self.rect.left = self.__random.randrange(0, \
+                                              self.__screen.get_width()-100) 
         # Add the __scroll value to cloud's y otherwise
         else:
             self.rect.bottom += self.__scroll
         
+    def get_state(self):
+        '''This method returns the cloud's position, scroll and recycling 
+        as a tuple.'''
+        return (self.rect.left, self.rect.top, self.__scroll, self.__recycle)
+        
+    def set_state(self, state):
+        '''This method takes a tuple returned by get_state() and puts the 
+        cloud back in that state.'''
+        self.rect.left, self.rect.top, self.__scroll, self.__recycle = state
+        
 class Player(pygame.sprite.Sprite):
     '''This class defines the player sprite.'''    
-    def __init__(self, screen, ground, centerx, bottom):
+    def __init__(self, screen, ground, centerx, bottom, gravity=2, jump=-23, \
+                 scroll=8):
         '''This initializer takes screen, ground, centerx and bottom as 
         parameters. It loads the player's image and positions it at the 
-        bottom of the game window.'''
+        bottom of the game window. The optional gravity, jump and scroll 
+        parameters are the velocity added every tick, the velocity of a 
+        jump and how far the screen scrolls per tick.'''
         # Call the parent __init__() method  
         pygame.sprite.Sprite.__init__(self) 
         
-        # Load the images of player with shield into a list
-        self.__player_list_shield = [pygame.image.load("./Images/DoodleSL1.png")\
-                                , pygame.image.load("./Images/DoodleSR1.png")]
-        
-        # Load the images of normal player into a list
-        self.__player_list = [pygame.image.load("./Images/DoodleL1.png"), \
-                              pygame.image.load("./Images/DoodleR1.png")]
+        # The shared tables of the images of player with shield and of
+        # normal player (looking left and right)
+        self.__player_list_shield = myAnimation.get_clip("player_shield")
+        self.__player_list = myAnimation.get_clip("player")
         
         # Set player's image as one of the normal-list images
-        self.image = self.__player_list[0]
-        self.image.convert()
+        self.image = self.__player_list.frames[myAnimation.LEFT]
 
         # Set the rect attributes
         self.rect = self.image.get_rect() 
@@ -150,10 +201,11 @@ class Player(pygame.sprite.Sprite):
         # Set the initial values of instance variables that control the player's
         # jumping movements
         self.__ground = ground
-        self.__gravity = 2
-        self.__velocity = -23
+        self.__gravity = gravity
+        self.__jump_velocity = jump
+        self.__velocity = jump
         # Initialize __scroll value of the player
-        self.__scroll = 8
+        self.__scroll = scroll
         # Initialze the player's counter with value 0
         self.__counter = 0
     
@@ -186,8 +238,7 @@ class Player(pygame.sprite.Sprite):
         
         # Change player's image when immune to monster
         if self.__immune:
-            self.image = self.__player_list_shield[1]
-            self.image.convert()
+            self.image = self.__player_list_shield.frames[myAnimation.RIGHT]
         
     def change_direction(self, x):
         '''This method takes x as a parameter and assigns its value to __dx. 
@@ -197,20 +248,14 @@ class Player(pygame.sprite.Sprite):
         
         # Use special immune images if player is immune
         if self.__immune:
-            if x > 0:
-                self.image = self.__player_list_shield[1]
-                self.image.convert()
-            elif x < 0 :
-                self.image = self.__player_list_shield[0]
-                self.image.convert()
+            images = self.__player_list_shield.frames
         # Use normal images otherwise
         else:
-            if x > 0:
-                self.image = self.__player_list[1]
-                self.image.convert()
-            elif x < 0 :
-                self.image = self.__player_list[0]
-                self.image.convert()
+            images = self.__player_list.frames
+        if x > 0:
+            self.image = images[myAnimation.RIGHT]
+        elif x < 0 :
+            self.image = images[myAnimation.LEFT]
     
     def kill(self):
         '''This method makes the boolean variable __alive False.'''
@@ -253,7 +298,7 @@ class Player(pygame.sprite.Sprite):
             # If the player would be below the __ground when __velocity is added
             # reset __velocity
             elif (self.rect.bottom+self.__velocity >= self.__ground):
-                self.__velocity = -23
+                self.__velocity = self.__jump_velocity
                 
         # Start counter when the player is immune
         if self.__immune:
@@ -264,9 +309,22 @@ class Player(pygame.sprite.Sprite):
                 self.__counter = 0
                 self.__immune = False
                 # Change player's image back to normal
-                self.image = self.__player_list[1]
-                self.image.convert()
+                self.image = self.__player_list.frames[myAnimation.RIGHT]
 
+    def get_state(self):
+        '''This method returns the player's position, image and movement 
+        and status values as a tuple (the image is shared, not copied).'''
+        return (self.rect.left, self.rect.top, self.image, self.__dx, \
+                self.__alive, self.__immune, self.__jump, self.__ground, \
+                self.__velocity, self.__counter)
+        
+    def set_state(self, state):
+        '''This method takes a tuple returned by get_state() and puts the 
+        player back in that state.'''
+        self.rect.left, self.rect.top, self.image, self.__dx, \
+            self.__alive, self.__immune, self.__jump, self.__ground, \
+            self.__velocity, self.__counter = state
+        
 class Bullet(pygame.sprite.Sprite):
     '''This class defines the sprite for the bullet.'''    
     def __init__(self, screen, x, y):
@@ -276,8 +334,7 @@ class Bullet(pygame.sprite.Sprite):
         pygame.sprite.Sprite.__init__(self)
         
         # Set the image and rect attributes for the Ball         
-        self.image = pygame.image.load("./Images/ball.png")
-        self.image.convert()
+        self.image = myAssets.load_image("./Images/ball.png")
         self.rect = self.image.get_rect() 
 
         self.rect.centerx = x
@@ -297,22 +354,78 @@ class Bullet(pygame.sprite.Sprite):
         if (self.rect.bottom < 0):
             self.kill()
             
+    def fire(self, x, y):
+        '''This method takes x and y values as parameters and moves the 
+        bullet back to them so it can be fired again.'''
+        self.rect.centerx = x
+        self.rect.bottom = y
+            
+    def get_state(self):
+        '''This method returns the bullet's position as a tuple.'''
+        return (self.rect.left, self.rect.top)
+        
+    def set_state(self, state):
+        '''This method takes a tuple returned by get_state() and moves the 
+        bullet back there.'''
+        self.rect.topleft = state
+            
+class BulletPool(object):
+    '''This class defines a fixed number of bullets that are reused.'''
+    def __init__(self, screen, capacity):
+        '''This initializer takes the screen surface and the number of 
+        bullets as parameters and creates all of the bullets.'''
+        self.__bullets = []
+        for number in range(capacity):
+            self.__bullets.append(Bullet(screen, 0, 0))
+        # Index of the bullet to try first the next time one is fired
+        self.__next = 0
+        
+    def acquire(self, x, y):
+        '''This method takes x and y values as parameters and returns a 
+        bullet that is not in flight (not in any group) placed there, or None 
+        if every bullet is in flight.'''
+        for number in range(len(self.__bullets)):
+            bullet = self.__bullets[(self.__next + number) % \
+                                    len(self.__bullets)]
+            if not bullet.alive():
+                self.__next = (self.__next + number + 1) % len(self.__bullets)
+                bullet.fire(x, y)
+                return bullet
+        return None
+            
+    def get_state(self):
+        '''This method returns the index of the bullet to try first as the 
+        pool's state.'''
+        return self.__next
+        
+    def set_state(self, state):
+        '''This method takes a value returned by get_state() and puts the 
+        pool back in that state.'''
+        self.__next = state
+            
 class Monster(pygame.sprite.Sprite):
     '''This class defines the sprite for the monster.'''  
-    def __init__(self, screen, welcome, x, y):
+    def __init__(self, screen, welcome, x, y, rng=random, \
+                 spawn=(-2000, -10000), camera=None):
         '''This initializer takes screen, boolean variable welcome, and x and y
-        values as parameters.''' 
+        values as parameters. The optional rng parameter is the random number 
+        generator used to place the monster (the random module by default), 
+        spawn is the range of heights above the screen it comes back at and 
+        camera is the myCamera.Camera whose world coordinates the monster is 
+        kept in (screen coordinates by default).''' 
         # Call the parent __init__() method
         pygame.sprite.Sprite.__init__(self)
         
-        # Set the image and rect attributes for the Ball       
-        self.__monster_images = []
-        for number in range(4):
-            self.__monster_images.append(pygame.image.load("./Images/alienR" \
-                                                    + str(number) + ".png"))
+        # Instance variable to keep track of the random number generator
+        self.__random = rng
+        
+        # Set the image and rect attributes for the Ball (from the shared
+        # frames of the monster's clip)
+        self.__clip = myAnimation.get_clip("monster")
+        # Number of ticks the clip has been playing for
+        self.__age = 0
             
-        self.image = self.__monster_images[0]
-        self.image.convert()
+        self.image = self.__clip.frame(self.__age)
 
         self.rect = self.image.get_rect() 
         
@@ -322,16 +435,19 @@ class Monster(pygame.sprite.Sprite):
             self.rect.bottom = y
         # Otherwise, assign it randomly (off screen)
         else:
-            self.rect.centerx = random.randrange(0, screen.get_width()-80)
-            self.rect.bottom = random.randrange(-1000, -5000, -1)
+            self.rect.centerx = self.__random.randrange(0, \
+                                                    screen.get_width()-80)
+            self.rect.bottom = self.__random.randrange(-1000, -5000, -1)
         
-        # Instance variable to keep track of the screen surface 
+        # Instance variables to keep track of the screen surface and camera
         self.__screen = screen
-        # Initialze the instance variable to keep track of which image to show
-        self.__monster_number = 0
-        # Initialze the __counter and __scroll values of monster
-        self.__counter = 0
+        if camera == None:
+            camera = myCamera.FIXED
+        self.__camera = camera
+        # Initialze the __scroll value of monster
         self.__scroll = 0
+        # Range of bottoms the monster is reset to
+        self.__spawn = spawn
 
     def set_scroll(self, scroll):
         '''This method takes scroll as a parameter and assigns its value 
@@ -340,26 +456,18 @@ class Monster(pygame.sprite.Sprite):
         
     def reset(self):
         '''This method resets the monster's x and y values randomly.'''
-        self.rect.bottom = random.randrange(-2000, -10000, -1)
-        self.rect.left = random.randrange(0, self.__screen.get_width()-80)
+        self.rect.bottom = self.__camera.to_world_y(self.__random.randrange(\
+                                   self.__spawn[0], self.__spawn[1], -1))
+        self.rect.left = self.__random.randrange(0, \
+                                          self.__screen.get_width()-80)
         
     def update(self):
         '''This method will be called automatically to reposition the         
         monster on the screen.''' 
-        # Change the monster's image number every 1/10 of a second
-        if self.__counter == 3:
-            if self.__monster_number < 3:
-                self.__monster_number += 1
-            else:
-                self.__monster_number = 1
-            self.__counter = 0
-        
-        # Add one to counter every time update is called
-        self.__counter += 1
-        
-        # Change the monster's image according to image number
-        self.image = self.__monster_images[self.__monster_number]
-        self.image.convert()
+        # Show the frame of the monster's clip for its age (the image
+        # changes every 1/10 of a second)
+        self.__age += 1
+        self.image = self.__clip.frame(self.__age)
         
         # Add 1 to monster's x as long as it is less than screen width
         if self.rect.left < self.__screen.get_width():
@@ -372,26 +480,49 @@ class Monster(pygame.sprite.Sprite):
         self.rect.top += self.__scroll
         
         # Reset the monster's x and y values if it goes off-screen
-        if self.rect.top > self.__screen.get_height():
-            self.rect.bottom = random.randrange(-2000, -10000, -1)
-            self.rect.left = random.randrange(0, self.__screen.get_width()-80)
+        if self.__camera.to_screen_y(self.rect.top, True) > \
+           self.__screen.get_height():
+            self.rect.bottom = self.__camera.to_world_y(\
+                                self.__random.randrange(self.__spawn[0], \
+                                                        self.__spawn[1], -1), \
+                                True)
+            self.rect.left = self.__random.randrange(0, \
+                                              self.__screen.get_width()-80)
+            
+    def get_state(self):
+        '''This method returns the monster's position, animation and scroll 
+        as a tuple.'''
+        return (self.rect.left, self.rect.top, self.__age, self.__scroll)
+        
+    def set_state(self, state):
+        '''This method takes a tuple returned by get_state() and puts the 
+        monster back in that state.'''
+        self.rect.left, self.rect.top, self.__age, self.__scroll = state
+        self.image = self.__clip.frame(self.__age)
             
 class Star(pygame.sprite.Sprite):
     '''This class defines the sprite for the enhancement star.'''  
-    def __init__(self, screen, welcome):
+    def __init__(self, screen, welcome, rng=random, spawn=(-500, -3000), \
+                 camera=None):
         '''This initializer takes screen and boolean variable welcome
-        as parameters.''' 
+        as parameters. The optional rng parameter is the random number 
+        generator used to place the star (the random module by default), 
+        spawn is the range of heights above the screen it comes back at and 
+        camera is the myCamera.Camera whose world coordinates the star is 
+        kept in (screen coordinates by default).''' 
         # Call the parent __init__() method
         pygame.sprite.Sprite.__init__(self)
         
-        # Set the image and rect attributes for the star   
-        self.__star_images = []
-        for number in range(12):
-            self.__star_images.append(pygame.image.load("./Images/star" + \
-                                                        str(number) + ".png"))
+        # Instance variable to keep track of the random number generator
+        self.__random = rng
+        
+        # Set the image and rect attributes for the star (from the shared
+        # frames of the star's clip)
+        self.__clip = myAnimation.get_clip("star")
+        # Number of ticks the clip has been playing for
+        self.__age = 0
             
-        self.image = self.__star_images[0]
-        self.image.convert()
+        self.image = self.__clip.frame(self.__age)
         
         self.rect = self.image.get_rect() 
         
@@ -401,21 +532,26 @@ class Star(pygame.sprite.Sprite):
             self.rect.bottom = 300
         # Assign it randomly otherwise
         else:
-            self.rect.centerx = random.randrange(0, screen.get_width()-50)
-            self.rect.bottom = random.randrange(-500, -3000, -1)
+            self.rect.centerx = self.__random.randrange(0, \
+                                                    screen.get_width()-50)
+            self.rect.bottom = self.__random.randrange(-500, -3000, -1)
         
-        # Initialze the instance variable to keep track of which image to show
-        self.__star_number = 0
-        # Instance variable to keep track of the screen surface 
+        # Instance variables to keep track of the screen surface and camera
         self.__screen = screen
-        # Initialze the __counter and __scroll values of star
+        if camera == None:
+            camera = myCamera.FIXED
+        self.__camera = camera
+        # Initialze the __scroll value of star
         self.__scroll = 0
-        self.__counter = 0
+        # Range of bottoms the star is reset to
+        self.__spawn = spawn
         
     def reset(self):
         '''This method resets the star's x and y values randomly.'''
-        self.rect.bottom = random.randrange(-500, -3000, -1)
-        self.rect.left = random.randrange(0, self.__screen.get_width()-50)
+        self.rect.bottom = self.__camera.to_world_y(self.__random.randrange(\
+                                   self.__spawn[0], self.__spawn[1], -1))
+        self.rect.left = self.__random.randrange(0, \
+                                          self.__screen.get_width()-50)
         
     def set_scroll(self, scroll):
         '''This method takes scroll as a parameter and assigns its value 
@@ -425,55 +561,74 @@ class Star(pygame.sprite.Sprite):
     def update(self):
         '''This method will be called automatically to reposition the         
         star on the screen.''' 
-        # Change the star's image number every 1/10 of a second
-        if self.__counter == 3:
-            if self.__star_number < 3:
-                self.__star_number += 1
-            else:
-                self.__star_number = 1
-            self.__counter = 0
-        
-        # Add one to counter every time update is called
-        self.__counter += 1
-        
-        # Change star's image according to image number
-        self.image = self.__star_images[self.__star_number]
-        self.image.convert()
+        # Show the frame of the star's clip for its age (the image
+        # changes every 1/10 of a second)
+        self.__age += 1
+        self.image = self.__clip.frame(self.__age)
         
         # Add __scroll to star's y value
         self.rect.top += self.__scroll
         
         # Reset the star's x and y values if it goes off-screen
-        if self.rect.top > self.__screen.get_height():
-            self.rect.bottom = random.randrange(-500, -3000, -1)
-            self.rect.left = random.randrange(0, self.__screen.get_width()-50)
+        if self.__camera.to_screen_y(self.rect.top, True) > \
+           self.__screen.get_height():
+            self.rect.bottom = self.__camera.to_world_y(\
+                                self.__random.randrange(self.__spawn[0], \
+                                                        self.__spawn[1], -1), \
+                                True)
+            self.rect.left = self.__random.randrange(0, \
+                                              self.__screen.get_width()-50)
+            
+    def get_state(self):
+        '''This method returns the star's position, animation and scroll 
+        as a tuple.'''
+        return (self.rect.left, self.rect.top, self.__age, self.__scroll)
+        
+    def set_state(self, state):
+        '''This method takes a tuple returned by get_state() and puts the 
+        star back in that state.'''
+        self.rect.left, self.rect.top, self.__age, self.__scroll = state
+        self.image = self.__clip.frame(self.__age)
             
 class Shield(Star):
     '''This class defines the sprite for the enhancement shield.'''  
-    def __init__(self, screen):
-        '''This initializer takes the screen surface as a parameter.''' 
+    def __init__(self, screen, rng=random, spawn=(-1000, -6000), camera=None):
+        '''This initializer takes the screen surface as a parameter. The 
+        optional rng parameter is the random number generator used to place 
+        the shield (the random module by default), spawn is the range of 
+        heights above the screen it comes back at and camera is the 
+        myCamera.Camera whose world coordinates the shield is kept in (screen 
+        coordinates by default).''' 
         # Call the parent __init__() method
         pygame.sprite.Sprite.__init__(self)
         
+        # Instance variable to keep track of the random number generator
+        self.__random = rng
+        
         # Set the image and rect attributes for the shield   
-        self.image = pygame.image.load("./Images/shield.png")
-            
-        self.image.convert()
+        self.image = myAssets.load_image("./Images/shield.png")
         
         self.rect = self.image.get_rect() 
 
-        self.rect.centerx = random.randrange(0, screen.get_width()-80)
-        self.rect.bottom = random.randrange(-800, -3000, -1)
+        self.rect.centerx = self.__random.randrange(0, screen.get_width()-80)
+        self.rect.bottom = self.__random.randrange(-800, -3000, -1)
         
-        # Instance variable to keep track of the screen surface 
+        # Instance variables to keep track of the screen surface and camera
         self.__screen = screen
+        if camera == None:
+            camera = myCamera.FIXED
+        self.__camera = camera
         # Initialze  __scroll value of shield
         self.__scroll = 0
+        # Range of bottoms the shield is reset to
+        self.__spawn = spawn
         
     def reset(self):
         '''This method resets shield's x and y values randomly.'''
-        self.rect.bottom = random.randrange(-1000, -6000, -1)
-        self.rect.left = random.randrange(0, self.__screen.get_width()-80)
+        self.rect.bottom = self.__camera.to_world_y(self.__random.randrange(\
+                                   self.__spawn[0], self.__spawn[1], -1))
+        self.rect.left = self.__random.randrange(0, \
+                                          self.__screen.get_width()-80)
         
     def set_scroll(self, scroll):
         '''This method takes scroll as a parameter and assigns its value 
@@ -487,20 +642,37 @@ class Shield(Star):
         self.rect.top += self.__scroll
         
         # Reset the shield's x and y values if it goes off-screen
-        if self.rect.top > self.__screen.get_height():
-            self.rect.bottom = random.randrange(-1000, -6000, -1)
-            self.rect.left = random.randrange(0, self.__screen.get_width()-80)
+        if self.__camera.to_screen_y(self.rect.top, True) > \
+           self.__screen.get_height():
+            self.rect.bottom = self.__camera.to_world_y(\
+                                self.__random.randrange(self.__spawn[0], \
+                                                        self.__spawn[1], -1), \
+                                True)
+            self.rect.left = self.__random.randrange(0, \
+                                              self.__screen.get_width()-80)
+            
+    def get_state(self):
+        '''This method returns the shield's position and scroll as a 
+        tuple.'''
+        return (self.rect.left, self.rect.top, self.__scroll)
+        
+    def set_state(self, state):
+        '''This method takes a tuple returned by get_state() and puts the 
+        shield back in that state.'''
+        self.rect.left, self.rect.top, self.__scroll = state
             
         
 class ScoreKeeper(pygame.sprite.Sprite):     
     '''This class defines a label sprite to display the score.'''    
     def __init__(self):         
-        '''This initializer loads the custom font for the game.'''  
+        '''This initializer initializes the starting score.'''  
         # Call the parent __init__() method         
         pygame.sprite.Sprite.__init__(self)           
         
-        # Load custom font, and initialize the starting score.
-        self.__font = pygame.font.Font("EHSMB.ttf", 30)         
+        # The label (drawn from cached digit glyphs) is created by the first
+        # update, so a score can be kept without any fonts loaded.
+        # Initialize the starting score.
+        self.__label = None
         self.__score = 0 
         
     def set_score(self, point):         
@@ -514,12 +686,23 @@ class ScoreKeeper(pygame.sprite.Sprite):
     def update(self):         
         '''This method will be called automatically to display          
         the current game status at the top of the game window.'''  
-        # Set the message
-        message = "Score: %d" % (self.__score) 
-        
-        # Render and set rect
-        self.image = self.__font.render(message, 1, (58,116,186))
-        self.image.convert()
-        self.rect = self.image.get_rect()         
-        self.rect.left = 5
-        self.rect.top = 15
\ No newline at end of file
+        # Create the label the first time the score is displayed
+        if self.__label == None:
+            self.__label = myText.NumberLabel("Score: ", 30)
+        
+        # Redraw the digits that changed (nothing if the score is the same)
+        if self.__label.set_number(self.__score):
+            # Set the image and rect
+            self.image = self.__label.image
+            self.rect = self.image.get_rect()         
+            self.rect.left = 5
+            self.rect.top = 15
+            
+    def get_state(self):
+        '''This method returns the score as the score keeper's state.'''
+        return self.__score
+        
+    def set_state(self, state):
+        '''This method takes a value returned by get_state() and puts the 
+        score back (the label follows on the next update).'''
+        self.__score = state
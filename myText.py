@@ -0,0 +1,105 @@
+'''
+   Description: This file contains the text rendering helpers for the Cloud
+   Jumper game. Fonts are opened once and shared, rendered strings are kept
+   in a cache keyed by (text, size, color), and numbers can be drawn from
+   per-digit glyphs so a changing score only redraws the digits that changed.
+   It contains the following:
+                          - get_font()
+                          - render()
+                          - NumberLabel
+'''
+import collections, pygame, myArchive
+
+# The custom font used for every piece of text in the game
+FONT_FILE = "EHSMB.TTF"
+# The colour used for every piece of text in the game
+TEXT_COLOR = (58, 116, 186)
+# The number of rendered strings kept in the cache
+CACHE_SIZE = 256
+
+# Dictionary of open fonts keyed by size
+_fonts = {}
+# Rendered strings keyed by (text, size, color), least recently used first
+_rendered = collections.OrderedDict()
+
+def get_font(size):
+    '''This function takes a point size and returns the shared game font of
+    that size, opening it the first time it is asked for.'''
+    font = _fonts.get(size)
+    if font is None:
+        # Bring up the font module the first time text is needed
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = pygame.font.Font(myArchive.source(FONT_FILE), size)
+        _fonts[size] = font
+    return font
+
+def render(text, size, color=TEXT_COLOR):
+    '''This function takes a string, a point size and a colour and returns
+    the rendered (antialiased) text surface, rendering it only the first
+    time. The returned surface is shared and must not be drawn on.'''
+    key = (text, size, color)
+    surface = _rendered.pop(key, None)
+    if surface is None:
+        surface = get_font(size).render(text, 1, color)
+        # Drop the least recently used string when the cache is full
+        if len(_rendered) >= CACHE_SIZE:
+            _rendered.popitem(False)
+    _rendered[key] = surface
+    return surface
+
+class NumberLabel(object):
+    '''This class defines a label made of a fixed prefix followed by a number,
+    drawn from cached digit glyphs in fixed-width cells.'''
+    def __init__(self, prefix, size, color=TEXT_COLOR):
+        '''This initializer takes the prefix string, a point size and a
+        colour and renders the prefix and the ten digit glyphs.'''
+        self.__prefix = render(prefix, size, color)
+        self.__digits = []
+        for digit in range(10):
+            self.__digits.append(render(str(digit), size, color))
+
+        # Every digit gets a cell as wide as the widest glyph so that
+        # changing one digit never moves the others
+        self.__cell = 0
+        for glyph in self.__digits:
+            self.__cell = max(self.__cell, glyph.get_width())
+        self.__height = self.__prefix.get_height()
+
+        # The label surface and the digits currently drawn on it
+        self.__text = None
+        self.image = None
+
+    def __resize(self, length):
+        '''This method takes the number of digits and creates a new label
+        surface with room for them.'''
+        width = self.__prefix.get_width() + self.__cell * length
+        self.image = pygame.Surface((width, self.__height), pygame.SRCALPHA,
+                                    32)
+        self.image.fill((0, 0, 0, 0))
+        self.image.blit(self.__prefix, (0, 0))
+        self.__text = " " * length
+
+    def set_number(self, number):
+        '''This method takes an integer and redraws the digit cells whose
+        digit changed. It returns True if the label surface was touched.'''
+        text = "%d" % (number)
+        if text == self.__text:
+            return False
+
+        # Start from a new surface when the number of digits changes
+        if self.__text is None or len(text) != len(self.__text):
+            self.__resize(len(text))
+
+        left = self.__prefix.get_width()
+        for i in range(len(text)):
+            if text[i] != self.__text[i]:
+                # Clear the digit's cell and draw the new glyph into it
+                cell = pygame.Rect(left + self.__cell * i, 0, self.__cell,
+                                   self.__height)
+                self.image.fill((0, 0, 0, 0), cell)
+                glyph = self.__digits[int(text[i])]
+                self.image.blit(glyph, (cell.centerx - glyph.get_width() // 2,
+                                        0))
+        self.__text = text
+        return True
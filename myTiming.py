@@ -0,0 +1,317 @@
+'''
+   Description: This file contains the timing instruments of the Cloud
+   Jumper game. The StartupTimer measures how long each phase of starting
+   the game takes, up to the first frame of the welcome screen and the
+   subsystems brought up after it. The FrameProfiler times each phase of
+   the frames of the game loop, keeps the last few seconds of them for an
+   on-screen overlay (rolling percentiles and a frame-time graph) and can
+   write every frame to a CSV or JSON lines file for offline analysis.
+   It contains the following:
+                          - StartupTimer
+                          - startup (the StartupTimer of this process)
+                          - the phases of a game frame
+                          - FrameProfiler
+'''
+import collections, json, time
+
+# Time to first frame the game should stay within, in seconds
+STARTUP_BUDGET = 0.5
+
+class StartupTimer(object):
+    '''This class defines a timer that records the phases of startup.'''
+    def __init__(self, budget=STARTUP_BUDGET):
+        '''This initializer takes the time to first frame budget (in
+        seconds) and starts timing.'''
+        self.__budget = budget
+        self.__start = time.perf_counter()
+        self.__last = self.__start
+        # List of (phase, seconds) tuples in the order they were marked
+        self.__phases = []
+        # Time to first frame, once known
+        self.__first_frame = None
+        self.__done = False
+
+    def mark(self, phase, first_frame=False):
+        '''This method takes the name of the phase that just ended and
+        records how long it took. If first_frame is True the phase ended
+        with the first frame on screen. Nothing is recorded once startup
+        is finished.'''
+        if self.__done:
+            return
+        now = time.perf_counter()
+        self.__phases.append((phase, now - self.__last))
+        self.__last = now
+        if first_frame and self.__first_frame == None:
+            self.__first_frame = now - self.__start
+
+    def finish(self, phase):
+        '''This method takes the name of the last phase of startup, records
+        it and stops timing. It returns True the first time it is called.'''
+        if self.__done:
+            return False
+        self.mark(phase)
+        self.__done = True
+        return True
+
+    def get_first_frame(self):
+        '''This method returns the time to first frame in seconds (None if
+        the first frame has not been shown yet).'''
+        return self.__first_frame
+
+    def get_phases(self):
+        '''This method returns the list of (phase, seconds) tuples.'''
+        return list(self.__phases)
+
+    def report(self):
+        '''This method returns the startup timings as a printable string.'''
+        lines = []
+        if self.__first_frame == None:
+            lines.append("Startup (no frame shown yet):")
+        else:
+            if self.__first_frame <= self.__budget:
+                verdict = "within"
+            else:
+                verdict = "OVER"
+            lines.append("Startup: first frame after %.3f s (%s the %.3f s "
+                         "budget)" % (self.__first_frame, verdict,
+                                      self.__budget))
+
+        total = 0
+        for phase, seconds in self.__phases:
+            total += seconds
+            lines.append("  %-20s %7.3f s  (at %.3f s)" % (phase, seconds,
+                                                           total))
+        return "\n".join(lines)
+
+# The timer of this process, started when this module is first imported
+startup = StartupTimer()
+
+# Phases of a frame of the game loop, in the order they happen
+# (waiting for the frame clock, the event pump, landing on clouds and
+# scrolling, the bullet/pickup/monster collisions, moving the sprites,
+# playing the sound effects, drawing and pushing the frame to the display)
+GAME_PHASES = ("wait", "events", "clouds", "collisions", "update", "sound",
+               "draw", "flip")
+
+# Number of frames the rolling statistics are taken over
+HISTORY = 300
+# Number of frames between two rebuilds of the overlay
+OVERLAY_INTERVAL = 15
+# Frame time the game loop aims for by default, in seconds (drawn on the
+# graph)
+FRAME_BUDGET = 1.0 / 30
+
+class FrameProfiler(object):
+    '''This class defines a profiler that times the phases of every frame.
+    While it is off, begin(), mark() and end() return straight away.'''
+    def __init__(self, phases=GAME_PHASES, history=HISTORY,
+                 budget=FRAME_BUDGET):
+        '''This initializer takes the names of the phases of a frame, the
+        number of frames kept for the rolling statistics and the frame time
+        the game aims for in seconds.'''
+        self.__budget = budget
+        self.__phases = tuple(phases)
+        self.__index = {}
+        for number in range(len(self.__phases)):
+            self.__index[self.__phases[number]] = number
+
+        # Public so the game loop can test it without a method call
+        self.enabled = False
+        self.__overlay_on = False
+        # Rows of (frame number, total, phase times...) in seconds, the
+        # oldest first
+        self.__history = collections.deque(maxlen=history)
+        self.__frames = 0
+        # Times of the frame in progress
+        self.__current = None
+        self.__start = 0
+        self.__last = 0
+        # Export file and its format ("csv" or "jsonl")
+        self.__export = None
+        self.__format = None
+        # The overlay surface and the frame it was built at
+        self.__overlay = None
+        self.__overlay_frame = None
+
+    def get_phases(self):
+        '''This method returns the tuple of phase names.'''
+        return self.__phases
+
+    def get_frames(self):
+        '''This method returns the number of frames recorded so far.'''
+        return self.__frames
+
+    def is_overlay_on(self):
+        '''This method returns True if the overlay is shown.'''
+        return self.__overlay_on
+
+    def toggle_overlay(self):
+        '''This method shows the overlay if it is hidden (turning the
+        profiler on) or hides it otherwise. The profiler keeps recording
+        after the overlay is hidden only if it is exporting.'''
+        self.__overlay_on = not self.__overlay_on
+        self.enabled = self.__overlay_on or self.__export != None
+        self.__overlay_frame = None
+
+    def begin(self):
+        '''This method starts timing a frame.'''
+        if not self.enabled:
+            return
+        self.__current = [0.0] * len(self.__phases)
+        self.__start = self.__last = time.perf_counter()
+
+    def mark(self, phase):
+        '''This method takes the name of the phase that just ended and adds
+        the time since the last mark to it.'''
+        if not self.enabled or self.__current == None:
+            return
+        now = time.perf_counter()
+        self.__current[self.__index[phase]] += now - self.__last
+        self.__last = now
+
+    def end(self):
+        '''This method finishes timing a frame, keeps it for the rolling
+        statistics and writes it to the export file.'''
+        if not self.enabled or self.__current == None:
+            return
+        row = [self.__frames, self.__last - self.__start] + self.__current
+        self.__current = None
+        self.__frames += 1
+        self.__history.append(row)
+        if self.__export != None:
+            self.__write(row)
+
+    def percentiles(self, phase=None, points=(50, 95, 99)):
+        '''This method takes the name of a phase (None for the whole frame)
+        and a tuple of percentages and returns the tuple of those
+        percentiles of the recent frames, in seconds (all 0 if no frame has
+        been recorded).'''
+        if phase == None:
+            column = 1
+        else:
+            column = self.__index[phase] + 2
+        times = sorted(row[column] for row in self.__history)
+        if not times:
+            return (0.0,) * len(points)
+
+        values = []
+        for point in points:
+            # Nearest-rank percentile
+            rank = max(0, -(-point * len(times) // 100) - 1)
+            values.append(times[rank])
+        return tuple(values)
+
+    def start_export(self, path):
+        '''This method takes the path of a file ending in .csv or .jsonl
+        (any other name is written as CSV), turns the profiler on and writes
+        every frame from now on to the file.'''
+        self.stop_export()
+        if path.endswith(".jsonl"):
+            self.__format = "jsonl"
+        else:
+            self.__format = "csv"
+        self.__export = open(path, "w")
+        if self.__format == "csv":
+            header = ["frame", "total_ms"]
+            for phase in self.__phases:
+                header.append(phase + "_ms")
+            self.__export.write(",".join(header) + "\n")
+        self.enabled = True
+
+    def stop_export(self):
+        '''This method closes the export file, if there is one. The profiler
+        stays on only if the overlay is shown.'''
+        if self.__export != None:
+            self.__export.close()
+            self.__export = None
+        self.enabled = self.__overlay_on
+
+    def __write(self, row):
+        '''This method takes a row of frame times and writes it to the
+        export file in milliseconds.'''
+        if self.__format == "csv":
+            fields = ["%d" % (row[0])]
+            for seconds in row[1:]:
+                fields.append("%.3f" % (seconds * 1000))
+            self.__export.write(",".join(fields) + "\n")
+        else:
+            phases = {}
+            for number in range(len(self.__phases)):
+                phases[self.__phases[number]] = round(row[number + 2] * 1000,
+                                                      3)
+            self.__export.write(json.dumps({"frame": row[0],
+                                            "total_ms": round(row[1] * 1000,
+                                                              3),
+                                            "phases": phases}) + "\n")
+
+    def draw_overlay(self, surface):
+        '''This method takes the screen surface and draws the overlay (a
+        table of the rolling p50/p95/p99 of every phase in milliseconds and
+        a graph of the recent frame times) in its bottom left corner. The
+        overlay is only rebuilt every OVERLAY_INTERVAL frames. It returns
+        the rect drawn, or None if the overlay is hidden.'''
+        if not self.__overlay_on:
+            return None
+        if self.__overlay_frame == None or \
+           self.__frames - self.__overlay_frame >= OVERLAY_INTERVAL:
+            self.__overlay = self.__build_overlay()
+            self.__overlay_frame = self.__frames
+
+        rect = self.__overlay.get_rect(bottomleft=(0, surface.get_height()))
+        surface.blit(self.__overlay, rect)
+        return rect
+
+    def __build_overlay(self):
+        '''This method returns a new overlay surface.'''
+        # Imported here so the timers can be used without pygame
+        import pygame
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = pygame.font.Font(None, 16)
+        line_height = font.get_linesize()
+        graph_height = 60
+        width = 220
+        names = ("frame",) + self.__phases
+        height = line_height * (len(names) + 1) + graph_height + 8
+
+        overlay = pygame.Surface((width, height), pygame.SRCALPHA, 32)
+        overlay.fill((0, 0, 0, 170))
+        white = (255, 255, 255)
+
+        # Table of percentiles (every column is drawn at its own x, since
+        # the font is not fixed-width; numbers are right-aligned)
+        rows = [("ms", "p50", "p95", "p99")]
+        for name in names:
+            if name == "frame":
+                values = self.percentiles()
+            else:
+                values = self.percentiles(name)
+            rows.append((name, "%.2f" % (values[0] * 1000),
+                         "%.2f" % (values[1] * 1000),
+                         "%.2f" % (values[2] * 1000)))
+        for number in range(len(rows)):
+            top = 4 + line_height * number
+            overlay.blit(font.render(rows[number][0], 1, white), (4, top))
+            for column in range(1, 4):
+                text = font.render(rows[number][column], 1, white)
+                overlay.blit(text, (80 + 45 * column - text.get_width(), top))
+
+        # Graph of the frame times, newest on the right, scaled so the
+        # frame budget is half way up
+        budget = self.__budget
+        bottom = height - 4
+        scale = graph_height / (2 * budget)
+        budget_y = bottom - int(budget * scale)
+        pygame.draw.line(overlay, (255, 80, 80), (4, budget_y),
+                         (width - 5, budget_y))
+        rows = list(self.__history)[-(width - 8):]
+        left = width - 4 - len(rows)
+        for number in range(len(rows)):
+            bar = min(graph_height, int(rows[number][1] * scale))
+            if rows[number][1] > budget:
+                color = (255, 80, 80)
+            else:
+                color = (120, 220, 120)
+            pygame.draw.line(overlay, color, (left + number, bottom),
+                             (left + number, bottom - bar))
+        return overlay
@@ -0,0 +1,573 @@
+'''
+   Description: This file contains the headless simulation core of Cloud
+   Jumper. A World holds the game's sprites and applies the jumping,
+   scrolling, collision and scoring rules one tick at a time, driven by a
+   list of input actions per tick. It never draws, plays sounds or needs a
+   window, so it can be stepped as fast as the CPU allows (for automated
+   playtesting) as well as by the game loop in CloudJumper.py.
+   
+   A World given a seed is deterministic: every entity type draws from its
+   own random number stream derived from the seed, time only advances one
+   fixed tick per step, and a rolling checksum of the world state is kept
+   after every tick, so two runs (or two machines, or two versions of the
+   code) given the same seed and inputs can be compared tick by tick.
+   
+   Collisions go through spatial hashes (myCollide) of the platforms, the
+   enemies and the pickups, so their cost depends on how many sprites are
+   near the player or a bullet rather than on how many there are in total.
+   
+   Above the first screen, clouds are streamed in chunks by myLevel (the
+   classic mode, which recycles the 13 clouds of the first screen, can be
+   asked for with streaming=False).
+
+   The sky, clouds, monster and pickups are kept in the world coordinates of
+   a myCamera.Camera, so scrolling only moves the camera; the player, the
+   bullets and the score stay in screen coordinates. The sprites in the
+   layers of WORLD_LAYERS of World.sprites are drawn through the camera.
+
+   The whole state of a World can be captured as a snapshot (plain tuples
+   of positions, counters and random number generator states, sharing the
+   images rather than copying them) and put back later, to look ahead from
+   a state or to rewind the last few seconds of a game with a Rewinder.
+   It contains the following:
+                          - the input actions and the events
+                          - World
+                          - Rewinder
+                          - run()
+                          - first_desync()
+'''
+import collections, pygame, random, struct, zlib, myCamera, myCollide, \
+       myLevel, mySprites
+
+# Input actions that can be given to World.step()
+LEFT = "left"
+RIGHT = "right"
+RELEASE = "release"
+FIRE = "fire"
+
+# Events returned by World.step() (the game plays a sound for each)
+SHOOT = "shoot"
+KILLED = "killed"
+STAR = "star"
+SHIELD = "shield"
+END = "end"
+
+# Layers of the sprites in World.sprites, the group drawn over the sky
+CLOUD_LAYER = 1
+MONSTER_LAYER = 2
+BULLET_LAYER = 3
+PLAYER_LAYER = 4
+PICKUP_LAYER = 5
+SCORE_LAYER = 6
+# Layers whose sprites are in world coordinates (the others are in screen
+# coordinates)
+WORLD_LAYERS = (CLOUD_LAYER, MONSTER_LAYER, PICKUP_LAYER)
+
+# Number of bullets that can be in flight at once
+BULLETS = 24
+
+# Physics and spawn parameters of a game, which World() can be given
+# different values of: the player's gravity, jump velocity and scroll per
+# tick, and the ranges of heights above the screen the monster, star and
+# shield come back at
+PARAMETERS = {"gravity": 2, "jump": -23, "scroll": 8,
+              "monster_spawn": (-2000, -10000),
+              "star_spawn": (-500, -3000),
+              "shield_spawn": (-1000, -6000)}
+
+# Fraction of a pixel the checksum tells apart: the world state is folded
+# into it as fixed-point integers in 1/CHECKSUM_SCALE pixels, so
+# fractional physics parameters (such as a gravity of 1.5) can be checked
+CHECKSUM_SCALE = 1000
+
+# Causes of the end of a game returned by World.get_death_cause()
+FELL = "fell"
+MONSTER = "monster"
+
+# Number of ticks simulated per second of play (every speed, counter and
+# animation of the sprites is expressed per tick)
+TICK_RATE = 30
+
+# Seconds of play a Rewinder keeps by default
+REWIND_SECONDS = 3
+
+class World(object):
+    '''This class defines the state of one game of Cloud Jumper.'''
+    def __init__(self, screen=None, size=(420, 640), seed=None, \
+                 streaming=True, profiler=None, parameters=None):
+        '''This initializer takes the screen surface (or None to simulate
+        without a display, using an off-screen surface of the given size for
+        the game area), an optional seed for a deterministic game, a
+        boolean variable streaming (False for the classic recycled clouds),
+        an optional myTiming.FrameProfiler that step() marks its phases
+        on and an optional dictionary of PARAMETERS to change, and creates
+        the sprites for a new game.'''
+        if screen == None:
+            screen = pygame.Surface(size)
+        # Instance variable to keep track of the screen surface
+        self.__screen = screen
+        self.__profiler = profiler
+
+        # Start from the default parameters and change the ones given
+        self.__parameters = dict(PARAMETERS)
+        if parameters != None:
+            for name in parameters:
+                if name not in PARAMETERS:
+                    raise ValueError("unknown parameter: %s" % (name))
+                self.__parameters[name] = parameters[name]
+        parameters = self.__parameters
+
+        # Give every entity type its own random number stream when seeded
+        # (so e.g. firing more bullets never changes where clouds appear),
+        # or share the random module otherwise
+        self.__seed = seed
+        self.__streams = {}
+        # List of the distinct generators, whose states are snapshotted
+        self.__generators = []
+        for name in ("cloud", "monster", "star", "shield"):
+            if seed == None:
+                self.__streams[name] = random
+            else:
+                self.__streams[name] = random.Random("%s/%s" % (seed, name))
+            if self.__streams[name] not in self.__generators:
+                self.__generators.append(self.__streams[name])
+
+        # The camera scrolling up the level, in whose world coordinates the
+        # sprites that scroll are kept
+        self.camera = myCamera.Camera()
+        camera = self.camera
+
+        # Create sprite objects for game
+        self.sky = mySprites.Sky(screen, camera)
+
+        self.clouds = pygame.sprite.Group()
+        for i in range(13):
+            self.clouds.add(mySprites.Cloud(screen, i, \
+                                            self.__streams["cloud"], camera))
+
+        self.player = mySprites.Player(screen, screen.get_height() - 20, \
+                              screen.get_width()/2, screen.get_height() - 50, \
+                              parameters["gravity"], parameters["jump"], \
+                              parameters["scroll"])
+
+        self.monster = mySprites.Monster(screen, False, 0, 0, \
+                                         self.__streams["monster"], \
+                                         parameters["monster_spawn"], camera)
+        self.star = mySprites.Star(screen, False, self.__streams["star"], \
+                                   parameters["star_spawn"], camera)
+        self.shield = mySprites.Shield(screen, self.__streams["shield"], \
+                                       parameters["shield_spawn"], camera)
+        self.bullets = pygame.sprite.Group()
+        self.__bullet_pool = mySprites.BulletPool(screen, BULLETS)
+        self.score = mySprites.ScoreKeeper()
+
+        # Group of every sprite drawn over the sky, by layer (sprites are
+        # added to and removed from it as they come and go)
+        self.sprites = pygame.sprite.LayeredUpdates()
+        self.sprites.add(*self.clouds, layer=CLOUD_LAYER)
+        self.sprites.add(self.monster, layer=MONSTER_LAYER)
+        self.sprites.add(self.player, layer=PLAYER_LAYER)
+        self.sprites.add(self.shield, self.star, layer=PICKUP_LAYER)
+        self.sprites.add(self.score, layer=SCORE_LAYER)
+
+        # Sprites moved by every tick, in the order the game updates them
+        self.__moving_sprites = pygame.sprite.OrderedUpdates(self.sky, \
+                                self.clouds, self.monster, self.bullets, \
+                                self.player, self.shield, self.star)
+
+        # Spatial hashes (in world coordinates) of the sprites the player
+        # and bullets can hit
+        self.__platforms = myCollide.SpatialHash()
+        self.__platforms.add(*self.clouds)
+        self.__enemies = myCollide.SpatialHash()
+        self.__enemies.add(self.monster)
+        self.__pickups = myCollide.SpatialHash()
+        self.__pickups.add(self.star, self.shield)
+
+        # Stream the level above the first screen in chunks
+        self.__level = None
+        if streaming:
+            if seed == None:
+                level_seed = random.getrandbits(32)
+            else:
+                level_seed = "%s/level" % (seed)
+            pool = myLevel.CloudPool(screen, self.__streams["cloud"], camera)
+            self.__level = myLevel.LevelStreamer(screen, level_seed, pool)
+            self.__level.start(self.clouds)
+
+        # Initialize the status of the game
+        self.__shield_on = False
+        self.__over = False
+        self.__death_cause = None
+        self.__ticks = 0
+        self.__checksum = 0
+
+    def get_score(self):
+        '''This method returns the player's score.'''
+        return self.score.get_score()
+
+    def get_ticks(self):
+        '''This method returns the number of ticks simulated so far.'''
+        return self.__ticks
+
+    def is_over(self):
+        '''This method returns True once the player has lost.'''
+        return self.__over
+
+    def get_death_cause(self):
+        '''This method returns what ended the game (FELL or MONSTER), or None
+        while the game is still on.'''
+        return self.__death_cause
+
+    def get_parameters(self):
+        '''This method returns a copy of the game's parameters.'''
+        return dict(self.__parameters)
+
+    def get_altitude(self):
+        '''This method returns how far the screen has scrolled up.'''
+        return self.camera.get_offset()
+
+    def get_seed(self):
+        '''This method returns the world's seed (None if not deterministic).'''
+        return self.__seed
+
+    def get_checksum(self):
+        '''This method returns the rolling checksum of the world state after
+        the last tick (always 0 for a world without a seed).'''
+        return self.__checksum
+
+    def __update_checksum(self):
+        '''This method folds the current world state (the position of every
+        sprite on the screen, the player's velocity and immunity and the
+        score) into the rolling checksum.'''
+        player = self.player
+        offset = self.camera.get_offset()
+        values = [self.__ticks, self.get_score(), player.get_velocity(), \
+                  player.get_immunity()]
+        for sprite in self.__moving_sprites:
+            if sprite is player or sprite in self.bullets:
+                values.extend((sprite.rect.left, sprite.rect.top))
+            else:
+                values.extend((sprite.rect.left, sprite.rect.top + offset))
+
+        fixed = []
+        for value in values:
+            fixed.append(int(round(value * CHECKSUM_SCALE)))
+        state = struct.pack("<%dq" % len(fixed), *fixed)
+        self.__checksum = zlib.crc32(state, self.__checksum) & 0xffffffff
+
+    def __apply(self, action, events):
+        '''This method takes an input action and the list of events of the
+        current tick and applies the action to the player.'''
+        if action == RIGHT:
+            # Change the player's direction with a position x value
+            self.player.change_direction(10)
+        elif action == LEFT:
+            # Change the player's direction with a position x value
+            self.player.change_direction(-10)
+        elif action == RELEASE:
+            # Change the player's dx to 0 when no key is pressed
+            self.player.change_direction(0)
+        elif action == FIRE:
+            # Add a bullet from the pool to the group bullets
+            # (nothing is fired if every bullet is in flight)
+            bullet = self.__bullet_pool.acquire(self.player.rect.centerx, \
+                                                self.player.rect.bottom)
+            if bullet != None:
+                self.bullets.add(bullet)
+                self.__moving_sprites.add(bullet)
+                self.sprites.add(bullet, layer=BULLET_LAYER)
+                events.append(SHOOT)
+
+    def __land(self):
+        '''This method makes the player jump on the clouds and scrolls
+        everything down when the player lands high enough.'''
+        player = self.player
+        camera = self.camera
+        # The clouds are in world coordinates, and the player on the screen
+        offset = camera.get_offset()
+
+        # Use a boolean variable to control the player's jumping movements
+        cloud_list = self.__platforms.query(camera.to_world(player.rect))
+        # Set initial cloud height
+        cloud_height = 640
+
+        # Make player jump on clouds only when the jumping motion is downwards
+        if player.get_velocity() > 0:
+            if cloud_list:
+                for cloud in cloud_list:
+                    # Check if player's bottom is greater than cloud's top
+                    if player.rect.bottom > cloud.rect.top + offset:
+                        # Set the cloud's centery to the variable new_ground
+                        new_ground = cloud.rect.centery + offset
+                        # Check if the player's bottom is less (higher)
+                        # Than new_ground (cloud's centery)
+                        if player.rect.bottom <= new_ground:
+                            # Get cloud's centery value as new ground
+                            player.set_ground(new_ground)
+
+                        # Check if cloud's top is less than cloud_height
+                        # If True, set cloud_height to it
+                        if cloud.rect.top + offset < cloud_height:
+                            cloud_height = cloud.rect.top + offset
+
+                        # If the cloud_height is less than 500
+                        # Scroll everything on screen down (by moving
+                        # the camera up)
+                        if cloud_height<500:
+                            camera.set_scroll(player.get_scroll())
+                            # Add to player's score the scroll value
+                            self.score.set_score(player.get_scroll())
+                        # If the cloud_height is greater than 500
+                        # Stop the camera so nothing moves
+                        else:
+                            camera.set_scroll(0)
+
+            # Set the ground to greater than screen height if player
+            # does not collide with any clouds while jumping downwards
+            else:
+                player.set_ground(self.__screen.get_height() + 20)
+
+    def __collide(self, events):
+        '''This method takes the list of events of the current tick and
+        checks the bullets, star, shield and monster against each other
+        and the player.'''
+        player = self.player
+        camera = self.camera
+
+        # If a bullet collides with monster, reset monster and kill bullet
+        # (the hashes are in world coordinates, the bullets on the screen)
+        for bullet in self.bullets:
+            enemy_list = self.__enemies.query(camera.to_world(bullet.rect))
+            if enemy_list:
+                enemy_list[0].reset()
+                self.__enemies.move(enemy_list[0])
+                bullet.kill()
+                events.append(KILLED)
+
+        player_rect = camera.to_world(player.rect)
+        pickup_list = self.__pickups.query(player_rect)
+
+        # Add 500 points to player's score when it collides with star
+        # Reset the star's position
+        if self.star in pickup_list:
+            self.star.reset()
+            self.__pickups.move(self.star)
+            self.score.set_score(500)
+            events.append(STAR)
+
+        # When player collides with shield, reset shield's position
+        # and turn on player's 'immunity', set shield_on to True
+        if self.shield in pickup_list:
+            self.shield.reset()
+            self.__pickups.move(self.shield)
+            player.set_immunity(True)
+            self.__shield_on = True
+            events.append(SHIELD)
+
+        # Set shield_on to false is player is no longer immune
+        if not player.get_immunity():
+            self.__shield_on = False
+
+        # Check player is in the game area
+        # (player will not be killed if jumping off-screen)
+        if player.rect.top > 0:
+            # Check if the player has collided with the monster
+            if self.__enemies.query(player_rect):
+                # Kill the player if the player does not have immunity
+                if not self.__shield_on:
+                    player.kill()
+                    self.__death_cause = MONSTER
+
+    def __stream(self):
+        '''This method adds the clouds of the chunks coming into view to the
+        world, and removes the clouds of the chunks that have left it.'''
+        added, removed = self.__level.update(self.camera.get_offset())
+        for cloud in removed:
+            cloud.kill()
+            self.__platforms.remove(cloud)
+        for cloud in added:
+            self.clouds.add(cloud)
+            self.__moving_sprites.add(cloud)
+            self.sprites.add(cloud, layer=CLOUD_LAYER)
+            self.__platforms.add(cloud)
+
+    def step(self, actions=()):
+        '''This method takes the input actions for this tick, advances the
+        game by one tick and returns the list of events that happened.'''
+        events = []
+        if self.__over:
+            return events
+
+        profiler = self.__profiler
+
+        for action in actions:
+            self.__apply(action, events)
+
+        self.__land()
+        if profiler != None:
+            profiler.mark("clouds")
+        self.__collide(events)
+        if profiler != None:
+            profiler.mark("collisions")
+
+        # Check if the player has lost
+        if self.player.lose():
+            self.__over = True
+            if self.__death_cause == None:
+                self.__death_cause = FELL
+            events.append(END)
+
+        # Move everything and scroll the camera, then re-file whatever
+        # moved in the world into other cells (streamed clouds never move
+        # in the world once placed, so the platforms only need it in the
+        # classic mode, where clouds are recycled to the top)
+        self.__moving_sprites.update()
+        self.camera.advance()
+        if self.__level != None:
+            self.__stream()
+        else:
+            self.__platforms.refresh()
+        self.__enemies.refresh()
+        self.__pickups.refresh()
+        self.__ticks += 1
+
+        if self.__seed != None:
+            self.__update_checksum()
+        if profiler != None:
+            profiler.mark("update")
+
+        return events
+
+    def snapshot(self):
+        '''This method returns a snapshot of the whole state of the world:
+        a tuple of the state of every sprite, the level, the random number
+        generators and the game status. It can only be given back to
+        restore() of this world.'''
+        states = []
+        for sprite in self.__moving_sprites:
+            states.append((sprite, sprite.get_state()))
+
+        level = None
+        if self.__level != None:
+            level = self.__level.get_state()
+        generators = []
+        for generator in self.__generators:
+            generators.append(generator.getstate())
+
+        return (tuple(states), self.score.get_state(), \
+                self.__bullet_pool.get_state(), level, tuple(generators), \
+                self.camera.get_state(), self.__shield_on, self.__over, \
+                self.__death_cause, self.__ticks, self.__checksum)
+
+    def restore(self, snapshot):
+        '''This method takes a snapshot returned by snapshot() and puts the
+        world back in that state, so the game goes on from there exactly as
+        it did (or would have) the first time.'''
+        states, score, pool, level, generators, camera, self.__shield_on, \
+            self.__over, self.__death_cause, self.__ticks, \
+            self.__checksum = snapshot
+
+        moving = []
+        for sprite, state in states:
+            sprite.set_state(state)
+            moving.append(sprite)
+        self.score.set_state(score)
+        self.__bullet_pool.set_state(pool)
+        self.camera.set_state(camera)
+        if level != None:
+            self.__level.set_state(level)
+        for number in range(len(generators)):
+            self.__generators[number].setstate(generators[number])
+
+        # Put back the clouds and bullets that came or went since the
+        # snapshot, in their order then (which the collisions and the
+        # checksum depend on)
+        if moving != self.__moving_sprites.sprites():
+            self.__regroup(moving)
+        self.__platforms.refresh()
+        self.__enemies.refresh()
+        self.__pickups.refresh()
+
+    def __regroup(self, moving):
+        '''This method takes the list of moving sprites of a snapshot and
+        makes the clouds and bullets in the groups and the platforms' hash
+        those of the list, in its order.'''
+        clouds = []
+        bullets = []
+        for sprite in moving:
+            if isinstance(sprite, mySprites.Cloud):
+                clouds.append(sprite)
+            elif isinstance(sprite, mySprites.Bullet):
+                bullets.append(sprite)
+
+        self.sprites.remove(*(self.clouds.sprites() + self.bullets.sprites()))
+        self.clouds.empty()
+        self.clouds.add(*clouds)
+        self.bullets.empty()
+        self.bullets.add(*bullets)
+        self.sprites.add(*clouds, layer=CLOUD_LAYER)
+        self.sprites.add(*bullets, layer=BULLET_LAYER)
+        self.__moving_sprites.empty()
+        self.__moving_sprites.add(*moving)
+
+        self.__platforms.clear()
+        self.__platforms.add(*clouds)
+
+class Rewinder(object):
+    '''This class defines a ring buffer of the snapshots of the last few
+    seconds of a world, to rewind it tick by tick.'''
+    def __init__(self, world, seconds=REWIND_SECONDS):
+        '''This initializer takes the World and the number of seconds of
+        play to keep.'''
+        self.__world = world
+        self.__snapshots = collections.deque(maxlen=int(seconds * TICK_RATE))
+
+    def __len__(self):
+        '''This method returns the number of ticks that can be rewound.'''
+        return len(self.__snapshots)
+
+    def record(self):
+        '''This method keeps a snapshot of the world (to be called before
+        every tick), dropping the oldest one when the buffer is full.'''
+        self.__snapshots.append(self.__world.snapshot())
+
+    def step_back(self):
+        '''This method puts the world back the way it was before its last
+        recorded tick. It returns False if there is nothing left to rewind.'''
+        if not self.__snapshots:
+            return False
+        self.__world.restore(self.__snapshots.pop())
+        return True
+
+    def clear(self):
+        '''This method forgets every snapshot.'''
+        self.__snapshots.clear()
+
+def run(world, inputs=(), max_ticks=None, checksums=None):
+    '''This function takes a World, an iterable of per-tick action lists and
+    an optional tick limit. It steps the world with no frame limit until the
+    player loses or the tick limit is reached (no input means no action once
+    the inputs run out) and returns the player's score. If a list is given
+    as checksums, the world's checksum is appended to it after every tick.'''
+    inputs = iter(inputs)
+    while not world.is_over():
+        if max_ticks != None and world.get_ticks() >= max_ticks:
+            break
+        world.step(next(inputs, ()))
+        if checksums != None:
+            checksums.append(world.get_checksum())
+
+    return world.get_score()
+
+def first_desync(checksums, other_checksums):
+    '''This function takes two lists of per-tick checksums and returns the
+    index of the first tick where they differ (or where one list ends
+    before the other), or None if they match.'''
+    for tick in range(min(len(checksums), len(other_checksums))):
+        if checksums[tick] != other_checksums[tick]:
+            return tick
+
+    if len(checksums) != len(other_checksums):
+        return min(len(checksums), len(other_checksums))
+    return None
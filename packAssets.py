@@ -0,0 +1,61 @@
+'''
+   Description: This script packs the assets of Cloud Jumper (the images,
+   the atlas, the sounds and the font) into the asset archive that myArchive
+   memory-maps, so the game opens one file instead of dozens. The images
+   packed into the atlas by buildAtlas.py are left out, since the game hands
+   them out from the atlas sheet. Run it again whenever an asset is added or
+   changed (setup.py runs it before every build):
+
+       python packAssets.py [--out assets.pak]
+'''
+import argparse, glob, json, os, myArchive, myText
+
+# Files packed, as patterns relative to the game directory
+PATTERNS = ("Images/*.png", "Images/*.jpg", "Images/atlas.json",
+            "Sounds/*.wav", "Sounds/*.mp3", myText.FONT_FILE)
+# The atlas index of buildAtlas.py, relative to the game directory
+ATLAS_INDEX = "Images/atlas.json"
+
+def collect():
+    '''This function returns the sorted list of (name, path) pairs of the
+    files to pack.'''
+    # The images in the atlas do not need their own files
+    in_atlas = set()
+    atlas = myArchive.resolve(ATLAS_INDEX)
+    if os.path.exists(atlas):
+        index_file = open(atlas, "r")
+        in_atlas = set(json.load(index_file)["frames"])
+        index_file.close()
+
+    files = {}
+    for pattern in PATTERNS:
+        for path in glob.glob(myArchive.resolve(pattern)):
+            name = myArchive.name_of(path)
+            if name not in in_atlas:
+                files[name] = path
+    return sorted(files.items())
+
+def pack(path=None):
+    '''This function takes the path of the archive to write (the game's
+    archive by default), packs the assets into it and returns the number of
+    files and of bytes written.'''
+    if path == None:
+        path = myArchive.resolve(myArchive.ARCHIVE)
+    files = collect()
+    return len(files), myArchive.write(path, files)
+
+def main():
+    '''This function defines the mainline logic for packing the assets.'''
+    parser = argparse.ArgumentParser(description="Pack the Cloud Jumper "
+                                     "assets into one archive.")
+    parser.add_argument("--out", default=None,
+                        help="archive to write (default: %s in the game "
+                        "directory)" % (myArchive.ARCHIVE))
+    args = parser.parse_args()
+
+    count, size = pack(args.out)
+    print("Packed %d files (%d bytes) into %s" % (count, size, args.out or
+                                                  myArchive.ARCHIVE))
+
+if __name__ == "__main__":
+    main()
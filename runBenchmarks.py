@@ -0,0 +1,448 @@
+'''
+   Description: This script benchmarks the hot paths of Cloud Jumper without
+   a window. Every benchmark runs a seeded, scripted session, so two runs of
+   the same code on the same machine do the same work:
+
+       - game loop: ticks per second of the game scene's loop (world step,
+         score label and renderer, in full-frame and dirty-rectangle mode)
+         and of the world alone
+       - update: the cost of one update() of a Cloud, Monster, Star, Shield
+         and Player
+       - collide: the cost of one collision query against a level of n
+         clouds, through the spatial hash and through a plain sprite group
+       - render: the cost of drawing a frame of n sprites
+       - background: the cost of drawing the sky, as the whole image over a
+         filled screen and as a window of the background's tiled strip
+       - assets: the time to load every image, with and without the atlas
+       - entities: the cost of one tick of n clouds, monsters and stars
+         and the memory each one takes, as sprites and in the
+         array-backed entity stores of myEntities
+
+   The results are written as JSON and can be compared with a baseline saved
+   by an earlier run on the same machine (baselines are not portable between
+   machines, so none is kept in the repository):
+
+       python runBenchmarks.py [--seed 1] [--ticks 600] [--repeat 3]
+                               [--out results.json] [--save-baseline FILE]
+                               [--baseline FILE] [--tolerance 0.15]
+
+   With --baseline the script exits with status 1 if any benchmark is
+   slower than the baseline by more than the tolerance.
+'''
+import argparse, glob, json, os, platform, random, sys, time, tracemalloc
+
+# Run without a window or a sound device unless told otherwise
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy, pygame, myAssets, myBackground, myCollide, myEntities, \
+       myRender, mySprites, myWorld
+
+# Size of the game screen
+SCREEN_SIZE = (420, 640)
+# Entity counts the collision and render benchmarks are run with
+COUNTS = (16, 64, 256, 1024)
+
+def script(seed):
+    '''This function takes a seed and returns a generator of per-tick input
+    action lists that taps left and right and fires now and then, the same
+    way for the same seed.'''
+    rng = random.Random("%s/input" % (seed))
+    while True:
+        actions = []
+        roll = rng.random()
+        if roll < 0.05:
+            actions.append(myWorld.LEFT)
+        elif roll < 0.10:
+            actions.append(myWorld.RIGHT)
+        elif roll < 0.15:
+            actions.append(myWorld.RELEASE)
+        if rng.random() < 0.1:
+            actions.append(myWorld.FIRE)
+        yield actions
+
+def best_time(function, repeat):
+    '''This function takes a function with no parameters and a number of
+    repeats, calls the function that many times and returns the shortest
+    time one call took, in seconds.'''
+    best = None
+    for number in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        if best == None or elapsed < best:
+            best = elapsed
+    return best
+
+def result(value, unit, higher_is_better=False):
+    '''This function takes a measured value, its unit and whether a higher
+    value is better and returns the dictionary stored for a benchmark.'''
+    return {"value": value, "unit": unit,
+            "higher_is_better": higher_is_better}
+
+def play(screen, seed, ticks, renderer_mode):
+    '''This function takes the screen, a seed, a number of ticks and the
+    renderer mode ("full", "dirty" or None for no drawing) and plays that
+    many ticks of scripted games (a new game with the next seed starts
+    whenever the player loses).'''
+    background = myBackground.Background(screen.get_size())
+    inputs = script(seed)
+    game_number = 0
+    world = None
+    for tick in range(ticks):
+        if world == None or world.is_over():
+            world = myWorld.World(screen, seed="%s/%d" % (seed, game_number))
+            game_number += 1
+            renderer = None
+            if renderer_mode != None:
+                renderer = myRender.Renderer(screen, background, world.sky,
+                                             renderer_mode == "dirty", None,
+                                             world.camera,
+                                             myWorld.WORLD_LAYERS)
+        world.step(next(inputs))
+        if renderer != None:
+            world.score.update()
+            renderer.draw(world.sprites)
+
+def bench_game_loop(screen, seed, ticks, repeat, results):
+    '''This function takes the screen, the seed, the number of ticks and
+    repeats and the results dictionary and adds the ticks per second of
+    the game loop to it.'''
+    for mode in ("full", "dirty", None):
+        seconds = best_time(lambda: play(screen, seed, ticks, mode), repeat)
+        if mode == None:
+            name = "game_loop/world_only"
+        else:
+            name = "game_loop/%s" % (mode)
+        results[name] = result(ticks / seconds, "ticks/s", True)
+
+def bench_update(screen, seed, repeat, results):
+    '''This function takes the screen, the seed, the number of repeats and
+    the results dictionary and adds the cost of one update() of each kind
+    of sprite to it.'''
+    calls = 2000
+    rng = random.Random("%s/update" % (seed))
+    makers = (("Cloud", lambda: mySprites.Cloud(screen, 3, rng)),
+              ("Monster", lambda: mySprites.Monster(screen, False, 0, 0,
+                                                    rng)),
+              ("Star", lambda: mySprites.Star(screen, False, rng)),
+              ("Shield", lambda: mySprites.Shield(screen, rng)),
+              ("Player", lambda: mySprites.Player(screen, 620, 210, 590)))
+    for name, maker in makers:
+        # A group of sprites scrolling like they do in a game
+        sprites = []
+        for number in range(calls):
+            sprite = maker()
+            if hasattr(sprite, "set_scroll"):
+                sprite.set_scroll(5)
+            sprites.append(sprite)
+
+        def update_all():
+            for sprite in sprites:
+                sprite.update()
+        seconds = best_time(update_all, repeat)
+        results["update/%s" % (name)] = result(seconds / calls * 1e6, "us")
+
+def make_level(screen, rng, count):
+    '''This function takes the screen, a random number generator and a
+    number of clouds and returns a list of clouds spread over a level as
+    dense as the game's (13 clouds per screen).'''
+    height = screen.get_height() * count // 13
+    clouds = []
+    for number in range(count):
+        cloud = mySprites.Cloud(screen, 0, rng)
+        cloud.place(rng.randrange(0, screen.get_width() - 100),
+                    rng.randrange(-height, screen.get_height()))
+        clouds.append(cloud)
+    return clouds
+
+def bench_collide(screen, seed, repeat, results):
+    '''This function takes the screen, the seed, the number of repeats and
+    the results dictionary and adds the cost of one collision query
+    against levels of COUNTS clouds to it.'''
+    for count in COUNTS:
+        rng = random.Random("%s/collide/%d" % (seed, count))
+        clouds = make_level(screen, rng, count)
+        platforms = myCollide.SpatialHash()
+        platforms.add(*clouds)
+        group = pygame.sprite.Group(clouds)
+
+        # Probes where a player could be, inside the level
+        probes = []
+        for number in range(500):
+            probe = pygame.sprite.Sprite()
+            probe.rect = pygame.Rect(rng.randrange(0, screen.get_width()),
+                                     rng.randrange(-screen.get_height() *
+                                                   count // 13,
+                                                   screen.get_height()),
+                                     40, 60)
+            probes.append(probe)
+
+        def query_hash():
+            for probe in probes:
+                platforms.collide(probe)
+
+        def query_group():
+            for probe in probes:
+                pygame.sprite.spritecollide(probe, group, False)
+
+        seconds = best_time(query_hash, repeat)
+        results["collide/hash/%d" % (count)] = result(seconds / len(probes)
+                                                      * 1e6, "us")
+        seconds = best_time(query_group, repeat)
+        results["collide/group/%d" % (count)] = result(seconds / len(probes)
+                                                       * 1e6, "us")
+
+def bench_render(screen, seed, repeat, results):
+    '''This function takes the screen, the seed, the number of repeats and
+    the results dictionary and adds the cost of drawing one frame of
+    COUNTS sprites to it.'''
+    frames = 20
+    background = myBackground.Background(screen.get_size())
+    sky = mySprites.Sky(screen)
+    for count in COUNTS:
+        rng = random.Random("%s/render/%d" % (seed, count))
+        sprites = pygame.sprite.LayeredUpdates()
+        for number in range(count):
+            cloud = mySprites.Cloud(screen, 0, rng)
+            cloud.place(rng.randrange(0, screen.get_width() - 100),
+                        rng.randrange(0, screen.get_height()))
+            sprites.add(cloud)
+
+        for mode in ("full", "dirty"):
+            renderer = myRender.Renderer(screen, background, sky,
+                                         mode == "dirty")
+
+            def draw_frames():
+                for frame in range(frames):
+                    renderer.draw(sprites)
+            seconds = best_time(draw_frames, repeat)
+            results["render/%s/%d" % (mode, count)] = result(seconds / frames
+                                                             * 1000, "ms")
+
+def bench_background(screen, repeat, results):
+    '''This function takes the screen, the number of repeats and the results
+    dictionary and adds the cost of drawing the sky behind a frame to it,
+    the way the game used to (filling the screen and blitting the whole
+    sky image) and through a myBackground.Background.'''
+    frames = 200
+    height = screen.get_height()
+    image = myAssets.load_image("./Images/sky.jpg")
+    background = myBackground.Background(screen.get_size())
+
+    def draw_image():
+        for frame in range(frames):
+            screen.fill((255, 255, 255))
+            screen.blit(image, (0, height - image.get_height() + frame))
+
+    def draw_background():
+        for frame in range(frames):
+            background.draw(screen, height - image.get_height() + frame)
+
+    for name, function in (("image", draw_image),
+                           ("background", draw_background)):
+        seconds = best_time(function, repeat)
+        results["background/%s" % (name)] = result(seconds / frames * 1e6,
+                                                   "us")
+
+def bench_assets(repeat, results):
+    '''This function takes the number of repeats and the results dictionary
+    and adds the time to load every game image into an empty registry,
+    with and without the atlas, to it.'''
+    paths = []
+    for path in sorted(glob.glob("./Images/*.png") +
+                       glob.glob("./Images/*.jpg")):
+        if os.path.basename(path) != "atlas.png":
+            paths.append(path)
+
+    for name, atlas in (("atlas", "./Images/atlas.json"), ("files", None)):
+        def load_all():
+            registry = myAssets.AssetRegistry(atlas)
+            for path in paths:
+                registry.image(path)
+        seconds = best_time(load_all, repeat)
+        results["assets/%s" % (name)] = result(seconds * 1000, "ms")
+
+def make_sprites(screen, rng, count):
+    '''This function takes the screen, a random number generator and a
+    number of each kind of entity and returns a group of that many scrolling
+    clouds, monsters and stars.'''
+    sprites = pygame.sprite.Group()
+    for number in range(count):
+        cloud = mySprites.Cloud(screen, 0, rng)
+        cloud.set_recycle(False)
+        sprites.add(cloud, mySprites.Monster(screen, False, 0, 0, rng),
+                    mySprites.Star(screen, False, rng))
+    for sprite in sprites:
+        sprite.set_scroll(5)
+    return sprites
+
+def make_stores(sprites):
+    '''This function takes a group made by make_sprites() and returns the
+    (clouds, monsters, stars) entity stores holding the same entities.'''
+    clouds = myEntities.EntityStore("cloud")
+    monsters = myEntities.EntityStore("monster", ("counter",))
+    stars = myEntities.EntityStore("star", ("counter",))
+    for sprite in sprites:
+        if isinstance(sprite, mySprites.Cloud):
+            clouds.spawn(sprite.rect.left, sprite.rect.top)
+        elif isinstance(sprite, mySprites.Monster):
+            monsters.spawn(sprite.rect.left, sprite.rect.top)
+        else:
+            stars.spawn(sprite.rect.left, sprite.rect.top)
+    return clouds, monsters, stars
+
+def allocated(function):
+    '''This function takes a function with no parameters, calls it and
+    returns what it returned along with the number of bytes it allocated
+    that are still in use.'''
+    tracemalloc.start()
+    value = function()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return value, size
+
+def bench_entities(screen, seed, repeat, results):
+    '''This function takes the screen, the seed, the number of repeats and
+    the results dictionary and adds the cost of one tick and the memory of
+    COUNTS clouds, monsters and stars, as sprites and as entity stores, to
+    it.'''
+    ticks = 10
+    for count in COUNTS:
+        rng = random.Random("%s/entities/%d" % (seed, count))
+        sprites, sprite_bytes = allocated(lambda: make_sprites(screen, rng,
+                                                               count))
+        stores, store_bytes = allocated(lambda: make_stores(sprites))
+        clouds, monsters, stars = stores
+        generator = numpy.random.default_rng(count)
+
+        def update_sprites():
+            for tick in range(ticks):
+                sprites.update()
+
+        def update_stores():
+            for tick in range(ticks):
+                myEntities.update_clouds(clouds, 5, screen, generator, False)
+                myEntities.update_monsters(monsters, 5, screen, generator)
+                myEntities.update_stars(stars, 5, screen, generator)
+
+        entities = len(sprites)
+        for name, function in (("sprites", update_sprites),
+                               ("store", update_stores)):
+            seconds = best_time(function, repeat)
+            results["entities/update/%s/%d" % (name, count)] = \
+                result(seconds / ticks * 1e6, "us")
+        results["entities/memory/sprites/%d" % (count)] = \
+            result(sprite_bytes / float(entities), "bytes")
+        results["entities/memory/store/%d" % (count)] = \
+            result(store_bytes / float(entities), "bytes")
+
+def run(seed, ticks, repeat):
+    '''This function takes the seed, the number of game loop ticks and the
+    number of repeats, runs every benchmark and returns the report (the
+    machine it ran on and the results keyed by benchmark name).'''
+    pygame.display.init()
+    screen = pygame.display.set_mode(SCREEN_SIZE)
+
+    results = {}
+    bench_game_loop(screen, seed, ticks, repeat, results)
+    bench_update(screen, seed, repeat, results)
+    bench_collide(screen, seed, repeat, results)
+    bench_render(screen, seed, repeat, results)
+    bench_background(screen, repeat, results)
+    bench_assets(repeat, results)
+    bench_entities(screen, seed, repeat, results)
+    pygame.quit()
+
+    machine = {"python": platform.python_version(),
+               "pygame": pygame.version.ver,
+               "platform": platform.platform(),
+               "processor": platform.processor(),
+               "video_driver": os.environ["SDL_VIDEODRIVER"]}
+    return {"seed": seed, "ticks": ticks, "repeat": repeat,
+            "machine": machine, "results": results}
+
+def compare(report, baseline, tolerance):
+    '''This function takes a report, a baseline report and the relative
+    tolerance, prints how every benchmark changed and returns the list of
+    names of the benchmarks that got worse by more than the tolerance.'''
+    regressions = []
+    results = report["results"]
+    print("%-24s %12s %12s %8s" % ("benchmark", "baseline", "now", "change"))
+    for name in sorted(results):
+        now = results[name]
+        if name not in baseline["results"]:
+            print("%-24s %12s %12.3f %8s" % (name, "-", now["value"], "new"))
+            continue
+
+        before = baseline["results"][name]["value"]
+        change = (now["value"] - before) / before
+        # A change for the worse is negative for both kinds of benchmark
+        if now["higher_is_better"]:
+            worse = -change
+        else:
+            worse = change
+        flag = ""
+        if worse > tolerance:
+            flag = "  SLOWER"
+            regressions.append(name)
+        print("%-24s %12.3f %12.3f %+7.1f%%%s" % (name, before, now["value"],
+                                                  change * 100, flag))
+    return regressions
+
+def main():
+    '''This function parses the command line, runs the benchmarks and
+    writes and compares the results.'''
+    parser = argparse.ArgumentParser(description="Benchmark Cloud Jumper.")
+    parser.add_argument("--seed", default="1",
+                        help="seed of the scripted sessions")
+    parser.add_argument("--ticks", type=int, default=600,
+                        help="ticks played by each game loop benchmark")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="runs of each benchmark (the best is kept)")
+    parser.add_argument("--out", help="file to write the results to")
+    parser.add_argument("--baseline", help="results to compare against")
+    parser.add_argument("--save-baseline",
+                        help="file to save the results to as a baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="relative slowdown reported as a regression")
+    arguments = parser.parse_args()
+
+    # Paths in the game are relative to the directory of this script
+    # (the paths given on the command line are relative to where it was
+    # started from)
+    for option in ("out", "baseline", "save_baseline"):
+        if getattr(arguments, option) != None:
+            setattr(arguments, option,
+                    os.path.abspath(getattr(arguments, option)))
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    report = run(arguments.seed, arguments.ticks, arguments.repeat)
+
+    text = json.dumps(report, indent=2, sort_keys=True)
+    for path in (arguments.out, arguments.save_baseline):
+        if path != None:
+            output = open(path, "w")
+            output.write(text + "\n")
+            output.close()
+
+    if arguments.baseline == None:
+        if arguments.out == None:
+            print(text)
+        return 0
+
+    baseline_file = open(arguments.baseline, "r")
+    baseline = json.load(baseline_file)
+    baseline_file.close()
+    if baseline["seed"] != report["seed"] or \
+       baseline["ticks"] != report["ticks"]:
+        print("Warning: the baseline was run with a different seed or "
+              "number of ticks")
+    regressions = compare(report, baseline, arguments.tolerance)
+    if regressions:
+        print("%d benchmark(s) slower than the baseline" % (len(regressions)))
+        return 1
+    return 0
+
+# Run the benchmarks when run as a program
+if __name__ == "__main__":
+    sys.exit(main())
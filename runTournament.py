@@ -0,0 +1,315 @@
+'''
+   Description: This script plays many seeded headless games of Cloud
+   Jumper across every CPU core and reports how a bot does under each
+   combination of physics and spawn parameters:
+
+       python runTournament.py [--games 100] [--seed 1] [--max-ticks 9000]
+                               [--bot runTournament:climber]
+                               [--vary gravity=1,2,3] [--vary jump=-20,-23]
+                               [--vary monster_spawn=-2000:-10000,-500:-3000]
+                               [--processes N] [--classic] [--out FILE]
+
+   Every --vary takes a parameter of myWorld.PARAMETERS and the values to
+   try (a:b for a spawn range); every combination of the values is played.
+   Gravity, jump and scroll can be fractional (e.g. --vary gravity=1.5).
+   The games of every combination use the same seeds, so the combinations
+   are compared on the same levels.
+
+   A bot is any function taking the World and a random number generator of
+   its own and returning the list of input actions for the next tick, given
+   as module:function (the module must be importable from this directory).
+   This file has three: idle, button_masher and climber.
+
+   The report gives, for every combination, the distribution of the scores,
+   how long the bot survived and what ended its games (falling, the monster
+   or reaching the tick limit), and can be written as JSON with --out.
+'''
+import argparse, importlib, itertools, json, multiprocessing, os, random, \
+       sys, time
+
+# Run without a window or a sound device
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import myWorld
+
+# Cause given to games stopped at the tick limit
+TIMEOUT = "timeout"
+CAUSES = (myWorld.FELL, myWorld.MONSTER, TIMEOUT)
+
+def idle(world, rng):
+    '''This bot takes the World and a random number generator and never
+    presses anything.'''
+    return []
+
+def button_masher(world, rng):
+    '''This bot takes the World and a random number generator and presses
+    random keys.'''
+    actions = []
+    if rng.random() < 0.2:
+        actions.append(rng.choice((myWorld.LEFT, myWorld.RIGHT,
+                                   myWorld.RELEASE)))
+    if rng.random() < 0.1:
+        actions.append(myWorld.FIRE)
+    return actions
+
+def climber(world, rng):
+    '''This bot takes the World and a random number generator, steers the
+    player over the nearest cloud below its feet and shoots the monster
+    when it is overhead.'''
+    # The player is in screen coordinates, the clouds and the monster in
+    # world coordinates
+    player = world.camera.to_world(world.player.rect)
+    target = None
+    for cloud in world.clouds:
+        # Only the clouds the player can still land on
+        if cloud.rect.top >= player.bottom - 10 and \
+           (target == None or cloud.rect.top < target.rect.top):
+            target = cloud
+
+    actions = []
+    if target == None or abs(target.rect.centerx - player.centerx) < 10:
+        actions.append(myWorld.RELEASE)
+    elif target.rect.centerx > player.centerx:
+        actions.append(myWorld.RIGHT)
+    else:
+        actions.append(myWorld.LEFT)
+
+    monster = world.camera.to_screen(world.monster.rect)
+    player = world.player.rect
+    if monster.bottom < player.top and monster.bottom > -50 and \
+       abs(monster.centerx - player.centerx) < 40:
+        actions.append(myWorld.FIRE)
+    return actions
+
+def load_bot(name):
+    '''This function takes a bot given as module:function and returns the
+    function.'''
+    module_name, separator, function_name = name.partition(":")
+    if not separator:
+        raise ValueError("a bot is given as module:function, not %s" % (name))
+    return getattr(importlib.import_module(module_name), function_name)
+
+def parse_value(text):
+    '''This function takes the text of a parameter value and returns it as
+    an int, a float or, for a:b, a tuple of two ints.'''
+    if ":" in text:
+        low, high = text.split(":")
+        return (int(low), int(high))
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+def check_value(name, value):
+    '''This function takes the name of a parameter and a value parsed by
+    parse_value() and raises ValueError if the game cannot be played with
+    it: gravity and scroll must be positive, jump negative, and a spawn
+    range is a:b with a above b (a > b, such as -2000:-10000).'''
+    spawn = name.endswith("_spawn")
+    if spawn != isinstance(value, tuple):
+        if spawn:
+            raise ValueError("%s is a range given as a:b, not %s" %
+                             (name, value))
+        raise ValueError("%s takes a number, not %d:%d" % ((name,) + value))
+    if spawn:
+        if value[0] <= value[1]:
+            raise ValueError("the spawn range %s=%d:%d must go up from a "
+                             "to b (a > b)" % ((name,) + value))
+    elif name == "jump":
+        if value >= 0:
+            raise ValueError("jump must be negative (upwards), not %s" %
+                             (value))
+    elif value <= 0:
+        raise ValueError("%s must be positive, not %s" % (name, value))
+
+def parse_grid(variations):
+    '''This function takes the list of name=value,value,... strings given
+    with --vary and returns the list of dictionaries of parameters, one for
+    every combination of the values.'''
+    names = []
+    choices = []
+    for variation in variations:
+        name, separator, values = variation.partition("=")
+        if not separator or name not in myWorld.PARAMETERS:
+            raise ValueError("unknown parameter in --vary %s (one of %s)" %
+                             (variation, ", ".join(sorted(myWorld.PARAMETERS))))
+        names.append(name)
+        values = [parse_value(value) for value in values.split(",")]
+        for value in values:
+            check_value(name, value)
+        choices.append(values)
+
+    grid = []
+    for combination in itertools.product(*choices):
+        grid.append(dict(zip(names, combination)))
+    return grid
+
+def play_game(job):
+    '''This function takes a (combination number, parameters, seed, bot
+    name, tick limit, streaming) tuple, plays the game in this process and
+    returns the combination number with the game's result dictionary.'''
+    number, parameters, seed, bot_name, max_ticks, streaming = job
+    bot = load_bot(bot_name)
+    rng = random.Random("%s/bot" % (seed))
+
+    world = myWorld.World(seed=seed, streaming=streaming,
+                          parameters=parameters)
+    while not world.is_over() and world.get_ticks() < max_ticks:
+        world.step(bot(world, rng))
+
+    cause = world.get_death_cause()
+    if cause == None:
+        cause = TIMEOUT
+    return number, {"seed": seed, "score": world.get_score(),
+                    "ticks": world.get_ticks(), "cause": cause}
+
+def percentile(values, point):
+    '''This function takes a sorted list of numbers and a percentage and
+    returns that (nearest-rank) percentile.'''
+    rank = max(0, -(-point * len(values) // 100) - 1)
+    return values[rank]
+
+def summarize(parameters, games):
+    '''This function takes the parameters of a combination and the list of
+    results of its games and returns the summary of the combination.'''
+    scores = sorted(game["score"] for game in games)
+    ticks = sorted(game["ticks"] for game in games)
+    causes = {}
+    for cause in CAUSES:
+        causes[cause] = 0
+    for game in games:
+        causes[game["cause"]] += 1
+
+    return {"parameters": parameters, "games": len(games),
+            "score": {"mean": sum(scores) / float(len(scores)),
+                      "min": scores[0], "p10": percentile(scores, 10),
+                      "median": percentile(scores, 50),
+                      "p90": percentile(scores, 90), "max": scores[-1]},
+            "survival_seconds": {"mean": sum(ticks) / float(len(ticks)) /
+                                 myWorld.TICK_RATE,
+                                 "median": percentile(ticks, 50) /
+                                 float(myWorld.TICK_RATE)},
+            "causes": causes}
+
+def describe(parameters):
+    '''This function takes a dictionary of parameters and returns it as a
+    short string.'''
+    if not parameters:
+        return "defaults"
+    words = []
+    for name in sorted(parameters):
+        value = parameters[name]
+        if isinstance(value, tuple):
+            value = "%d:%d" % value
+        words.append("%s=%s" % (name, value))
+    return " ".join(words)
+
+def print_report(summaries):
+    '''This function takes the list of summaries and prints them as a
+    table, best mean score first.'''
+    print("%-44s %6s %8s %8s %8s %8s %6s %6s %6s" % ("parameters", "games",
+          "mean", "median", "p90", "alive s", "fell", "monst", "time"))
+    for summary in sorted(summaries, key=lambda item:
+                          -item["score"]["mean"]):
+        games = float(summary["games"])
+        causes = summary["causes"]
+        print("%-44s %6d %8.0f %8d %8d %8.1f %5.0f%% %5.0f%% %5.0f%%" %
+              (describe(summary["parameters"]), summary["games"],
+               summary["score"]["mean"], summary["score"]["median"],
+               summary["score"]["p90"], summary["survival_seconds"]["mean"],
+               causes[myWorld.FELL] * 100 / games,
+               causes[myWorld.MONSTER] * 100 / games,
+               causes[TIMEOUT] * 100 / games))
+
+def start_worker(directory):
+    '''This function takes the directory of the game and makes it the
+    working directory of a worker process (the images are loaded from
+    paths relative to it).'''
+    os.chdir(directory)
+
+def main():
+    '''This function parses the command line, plays the games and reports
+    the results.'''
+    parser = argparse.ArgumentParser(description="Play many headless games "
+                                     "of Cloud Jumper with a bot.")
+    parser.add_argument("--games", type=int, default=100,
+                        help="games played for every combination")
+    parser.add_argument("--seed", default="1",
+                        help="seed the seeds of the games are made from")
+    parser.add_argument("--max-ticks", type=int, default=9000,
+                        help="ticks after which a game is stopped")
+    parser.add_argument("--bot", default="runTournament:climber",
+                        help="bot policy, as module:function")
+    parser.add_argument("--vary", action="append", default=[],
+                        help="parameter and values, as name=value,value")
+    parser.add_argument("--processes", type=int,
+                        default=multiprocessing.cpu_count(),
+                        help="worker processes")
+    parser.add_argument("--classic", action="store_true",
+                        help="recycle the first screen's clouds instead of "
+                        "streaming the level")
+    parser.add_argument("--out", help="file to write the report to")
+    arguments = parser.parse_args()
+
+    directory = os.path.dirname(os.path.abspath(__file__))
+    if arguments.out != None:
+        arguments.out = os.path.abspath(arguments.out)
+    os.chdir(directory)
+    for option, value in (("--games", arguments.games), \
+                          ("--processes", arguments.processes), \
+                          ("--max-ticks", arguments.max_ticks)):
+        if value < 1:
+            parser.error("%s must be at least 1, not %d" % (option, value))
+    try:
+        grid = parse_grid(arguments.vary)
+        load_bot(arguments.bot)
+    except (ValueError, ImportError, AttributeError) as error:
+        parser.error(str(error))
+
+    jobs = []
+    for number in range(len(grid)):
+        for game in range(arguments.games):
+            jobs.append((number, grid[number], "%s/%d" % (arguments.seed,
+                         game), arguments.bot, arguments.max_ticks,
+                         not arguments.classic))
+
+    # Hand the games out in small chunks so every process stays busy
+    start = time.perf_counter()
+    results = []
+    for number in range(len(grid)):
+        results.append([])
+    chunk_size = max(1, len(jobs) // (arguments.processes * 8))
+    pool = multiprocessing.Pool(arguments.processes, start_worker,
+                                (directory,))
+    try:
+        for number, game in pool.imap_unordered(play_game, jobs, chunk_size):
+            results[number].append(game)
+    finally:
+        pool.close()
+        pool.join()
+    elapsed = time.perf_counter() - start
+
+    summaries = []
+    for number in range(len(grid)):
+        results[number].sort(key=lambda game: game["seed"])
+        summaries.append(summarize(grid[number], results[number]))
+    print_report(summaries)
+    print("%d games in %.1f s on %d processes" % (len(jobs), elapsed,
+                                                  arguments.processes))
+
+    if arguments.out != None:
+        report = {"bot": arguments.bot, "seed": arguments.seed,
+                  "max_ticks": arguments.max_ticks,
+                  "streaming": not arguments.classic,
+                  "seconds": elapsed, "combinations": summaries,
+                  "games": results}
+        output = open(arguments.out, "w")
+        json.dump(report, output, indent=2)
+        output.write("\n")
+        output.close()
+    return 0
+
+# Run the tournament when run as a program
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,19 @@
 #import sys
 from cx_Freeze import setup, Executable
+import myArchive, packAssets
 
+# Pack the assets into one archive shipped next to the executable (the game
+# reads every asset from it, so the build needs no Images/ or Sounds/)
+packAssets.pack()
 
 executables = [
-    Executable('CloudJumper.py'
+    Executable('CloudJumper.py')
+    ]
 
 setup(
     name='Cloud Jumper',
       version='0.1.6',
       description='Doodle Jump clone',
+      options={'build_exe': {'include_files': [myArchive.ARCHIVE]}},
       executables=executables
-      )
\ No newline at end of file
+      )